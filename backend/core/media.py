@@ -0,0 +1,149 @@
+"""
+Entrega dos arquivos de mídia (uploads).
+
+O Django valida o caminho e define os cabeçalhos de cache; conforme
+`MEDIA_SERVE_MODE`, os bytes saem:
+
+- `django`: do próprio worker, com suporte a Range e If-Modified-Since
+  (desenvolvimento);
+- `x-accel-redirect`: do nginx, via `X-Accel-Redirect` para a location interna
+  `MEDIA_ACCEL_PREFIX` (que aponta para `MEDIA_ROOT`);
+- `x-sendfile`: do Apache/lighttpd, via `X-Sendfile` com o caminho absoluto.
+
+Nos dois últimos o servidor web trata Range e os condicionais. Arquivos
+endereçados por conteúdo (e suas versões) nunca mudam de bytes, então são
+enviados com cache de um ano e `immutable`.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# images/aa/bb/<sha256>.ext e renditions/images/aa/bb/<sha256>/<tamanho>.ext
+CONTENT_ADDRESSED = re.compile(
+    r'^(renditions/)?images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(\.\w+$|/\w+\.\w+$)'
+)
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def cache_control(path):
+    if CONTENT_ADDRESSED.match(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+
+
+def resolve(path):
+    """Caminho absoluto do arquivo, ou 404 para caminhos fora de MEDIA_ROOT ou ocultos."""
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return fullpath
+
+
+def parse_range(header, size):
+    """(início, fim) de um único intervalo `bytes=`; None para ignorar; ValueError se inválido."""
+    match = RANGE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def _serve_from_django(request, fullpath, stat):
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    try:
+        byte_range = parse_range(request.headers.get('Range'), stat.st_size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return response
+
+    file = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = StreamingHttpResponse(
+            FileRange(file, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+class FileRange:
+    """Itera `length` bytes de `file` em blocos; fecha o arquivo com a resposta."""
+
+    def __init__(self, file, length, block_size=64 * 1024):
+        self.file = file
+        self.length = length
+        self.block_size = block_size
+
+    def __iter__(self):
+        remaining = self.length
+        while remaining > 0:
+            block = self.file.read(min(self.block_size, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+    def close(self):
+        self.file.close()
+
+
+@require_safe
+def serve_media(request, path):
+    fullpath = resolve(path)
+    mode = settings.MEDIA_SERVE_MODE
+
+    if mode == 'django':
+        response = _serve_from_django(request, fullpath, os.stat(fullpath))
+    else:
+        content_type, _ = mimetypes.guess_type(fullpath)
+        response = HttpResponse(content_type=content_type or 'application/octet-stream')
+        if mode == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        elif mode == 'x-sendfile':
+            response['X-Sendfile'] = fullpath
+        else:
+            raise Http404
+    response['Cache-Control'] = cache_control(path)
+    return response
@@ -2,6 +2,7 @@
 Django settings for core project.
 """
 
+import sys
 from pathlib import Path
 from decouple import config
 
@@ -48,6 +49,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'properties.middleware.CustomDomainMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -80,6 +82,16 @@ DATABASES = {
     )
 }
 
+# Limiar do operador `%>` (pg_trgm) usado na busca pública de propriedades.
+# Aplicado na abertura da conexão para que a query use o índice GIN sem SET extra.
+PROPERTY_SEARCH_SIMILARITY = config('PROPERTY_SEARCH_SIMILARITY', default=0.4, cast=float)
+# Acrescentado a `options` vindas da DATABASE_URL (ex: search_path), sem sobrescrevê-las
+_database_options = DATABASES['default'].setdefault('OPTIONS', {})
+_database_options['options'] = ' '.join(filter(None, [
+    _database_options.get('options', ''),
+    f'-c pg_trgm.word_similarity_threshold={PROPERTY_SEARCH_SIMILARITY}',
+]))
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -153,11 +165,60 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='noreply@hyfen.com.br'
 # Celery Configuration
 CELERY_BROKER_URL = config('REDIS_URL', default='redis://redis:6379/0')
 CELERY_RESULT_BACKEND = config('REDIS_URL', default='redis://redis:6379/0')
+# Nos testes as tasks rodam na hora, sem broker
+CELERY_TASK_ALWAYS_EAGER = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+# Cache (Redis; memória local nos testes)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': config('REDIS_URL', default='redis://redis:6379/0'),
+        'KEY_PREFIX': 'hyfen',
+    }
+}
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Tempo (segundos) das respostas cacheadas dos endpoints públicos
+PUBLIC_CACHE_TIMEOUT = config('PUBLIC_CACHE_TIMEOUT', default=300, cast=int)
+
+# Cache em memória (por processo) de domínio personalizado -> propriedade.
+# O TTL limita quanto tempo os outros processos servem um mapeamento antigo.
+CUSTOM_DOMAIN_CACHE_SIZE = config('CUSTOM_DOMAIN_CACHE_SIZE', default=1024, cast=int)
+CUSTOM_DOMAIN_CACHE_TTL = config('CUSTOM_DOMAIN_CACHE_TTL', default=300, cast=int)
+CUSTOM_DOMAIN_NEGATIVE_TTL = config('CUSTOM_DOMAIN_NEGATIVE_TTL', default=60, cast=int)
 
 # Media files (uploads)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Entrega da mídia (ver core/media.py): 'django', 'x-accel-redirect' (nginx),
+# 'x-sendfile' (Apache/lighttpd) ou 'none' (servidor web lê MEDIA_ROOT direto)
+MEDIA_SERVE_MODE = config('MEDIA_SERVE_MODE', default='django' if DEBUG else 'none')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+# Arquivos que não são endereçados por conteúdo (ex: logos)
+MEDIA_CACHE_MAX_AGE = config('MEDIA_CACHE_MAX_AGE', default=3600, cast=int)
+
+# Upload de imagens em partes (properties/uploads.py): arquivos temporários,
+# limites e validade das sessões sem atividade (em horas)
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=str(BASE_DIR / 'uploads_tmp'))
+CHUNKED_UPLOAD_MAX_CHUNK = config('CHUNKED_UPLOAD_MAX_CHUNK', default=8 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=100 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_TTL = config('CHUNKED_UPLOAD_TTL', default=24, cast=int)
+
+# Validade (minutos) da pré-reserva feita no checkout (properties/bookings.py)
+BOOKING_HOLD_MINUTES = config('BOOKING_HOLD_MINUTES', default=15, cast=int)
+
+# Arquivos de SEO (sitemap e snapshots) gerados por `generate_seo_files`,
+# servidos como estáticos pelo servidor web
+SEO_ROOT = config('SEO_ROOT', default=str(BASE_DIR / 'seo'))
+PUBLIC_SITE_URL = config('PUBLIC_SITE_URL', default='http://localhost:3000')
+PUBLIC_MEDIA_URL = config('PUBLIC_MEDIA_URL', default='http://localhost:8000/media/')
+
 # drf-spectacular Settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Hyfen API',
@@ -3,7 +3,7 @@ Admin configuration for properties app.
 """
 from django.contrib import admin
 from .models import Property, Accommodation
-from .models import Property, Accommodation, Image, PropertyAccess
+from .models import Property, Accommodation, Booking, Image, PriceRule, PropertyAccess
 
 
 class AccommodationInline(admin.TabularInline):
@@ -25,7 +25,7 @@ class PropertyAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ("Informações Básicas", {"fields": ("owner", "name", "description")}),
-        ("Endereço", {"fields": ("address", "city", "state", "zip_code", "country")}),
+        ("Endereço", {"fields": ("address", "city", "state", "zip_code", "country", "latitude", "longitude")}),
         ("Contato", {"fields": ("phone", "email", "website")}),
         ("Status", {"fields": ("is_active", "deleted_at")}),
     )
@@ -52,6 +52,21 @@ class AccommodationAdmin(admin.ModelAdmin):
     readonly_fields = ["deleted_at"]
 
 
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ['guest_name', 'accommodation', 'period', 'status', 'total', 'expires_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['guest_name', 'guest_email', 'accommodation__name', 'accommodation__property__name']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'property', 'accommodation', 'period', 'weekdays', 'multiplier']
+    search_fields = ['name', 'property__name', 'accommodation__name']
+    readonly_fields = ['created_at', 'updated_at']
+
+
 @admin.register(Image)
 class ImageAdmin(admin.ModelAdmin):
     list_display = ['id', 'property', 'accommodation', 'caption', 'order', 'created_at']
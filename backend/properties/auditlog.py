@@ -10,3 +10,28 @@ auditlog.register(Property)
 auditlog.register(Accommodation)
 auditlog.register(PropertyAccess)
 auditlog.register(Image)
+
+
+def log_bulk_create(instances, actor=None):
+    """
+    `bulk_create` não dispara os signals do auditlog: grava as entradas de
+    criação de `instances` num único INSERT.
+    """
+    from auditlog.cid import get_cid
+    from auditlog.diff import model_instance_diff
+    from auditlog.models import LogEntry
+    from django.contrib.contenttypes.models import ContentType
+
+    cid = get_cid()
+    LogEntry.objects.bulk_create([
+        LogEntry(
+            content_type=ContentType.objects.get_for_model(instance),
+            object_pk=str(instance.pk),
+            object_repr=str(instance),
+            action=LogEntry.Action.CREATE,
+            changes=model_instance_diff(None, instance),
+            actor=actor,
+            cid=cid,
+        )
+        for instance in instances
+    ])
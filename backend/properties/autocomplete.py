@@ -0,0 +1,102 @@
+"""
+Autocomplete da busca pública (nomes de propriedades e cidades).
+
+- Nomes: prefixo do nome normalizado, atendido pelo índice B-tree
+  `listing_name_prefix_idx` já na ordem da resposta — com o LIMIT, o custo
+  independe do tamanho da tabela.
+- Cidades: são poucas (alguns milhares), então ficam em memória, ordenadas por
+  cada palavra do nome, e a busca é um `bisect`. O índice é reconstruído quando
+  a versão da listagem pública muda (ver `properties/cache.py`).
+"""
+import bisect
+import threading
+import unicodedata
+
+from .cache import public_list_version
+from .models import PropertyListing
+from .search import name_prefix_expression, normalize_term
+
+MIN_QUERY_LENGTH = 2
+
+
+def normalize(text):
+    """Equivalente em Python de `immutable_unaccent(lower(text))`."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class CityIndex:
+    """Índice de prefixos (por palavra) das cidades com propriedades ativas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys = []
+        self._entries = []
+
+    def _rebuild(self, version):
+        pairs = sorted(
+            PropertyListing.objects.order_by().values_list('city', 'state').distinct()
+        )
+        entries = []
+        for city, state in pairs:
+            words = normalize(city).split()
+            for position in range(len(words)):
+                entries.append((' '.join(words[position:]), position, city, state))
+        entries.sort()
+        self._keys = [entry[0] for entry in entries]
+        self._entries = entries
+        self._version = version
+
+    def search(self, term, limit):
+        version = public_list_version()
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._rebuild(version)
+
+        prefix = normalize(term).strip()
+        keys, entries = self._keys, self._entries
+        start = bisect.bisect_left(keys, prefix)
+        results = []
+        seen = set()
+        for index in range(start, len(keys)):
+            if not keys[index].startswith(prefix):
+                break
+            _, _, city, state = entries[index]
+            if (city, state) not in seen:
+                seen.add((city, state))
+                results.append({'city': city, 'state': state})
+                if len(results) == limit:
+                    break
+        return results
+
+
+city_index = CityIndex()
+
+
+def autocomplete(term, limit):
+    """Sugestões para `term`: até `limit` propriedades e `limit` cidades."""
+    term = term.strip()
+    if len(term) < MIN_QUERY_LENGTH:
+        return {'properties': [], 'cities': []}
+
+    properties = PropertyListing.objects.alias(
+        name_prefix=name_prefix_expression(),
+    ).filter(
+        name_prefix__startswith=normalize_term(term),
+    ).order_by('name_prefix').values('property_id', 'slug', 'name', 'city', 'state')[:limit]
+
+    return {
+        'properties': [
+            {
+                'id': row['property_id'],
+                'slug': row['slug'],
+                'name': row['name'],
+                'city': row['city'],
+                'state': row['state'],
+            }
+            for row in properties
+        ],
+        'cities': city_index.search(term, limit),
+    }
@@ -0,0 +1,110 @@
+"""
+Disponibilidade das acomodações.
+
+Noites ocupadas são guardadas como intervalos `daterange` [entrada, saída) —
+uma linha por bloqueio, não uma por noite — com índice GiST em
+(acomodação, período). "Está livre?" vira um `NOT EXISTS (... period && stay)`:
+
+- uma acomodação: `is_available()`;
+- várias de uma vez (ex: 500 resultados de busca): `available_ids()` ou
+  `free_filter()` dentro de outra query. É um único anti-join que passa pelo
+  índice uma vez por acomodação candidata, sem laço por noite nem por
+  acomodação no Python.
+
+`occupancy_querysets()` lista as tabelas que ocupam noites (bloqueios e
+reservas ativas); qualquer tabela com `accommodation` e `period` (daterange)
+pode entrar ali.
+"""
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Accommodation, AvailabilityBlock, Booking
+
+# Estadia mais longa aceita numa consulta
+MAX_NIGHTS = 365
+# Até quantos dias à frente de hoje se consulta (e cota) uma estadia
+MAX_DAYS_AHEAD = 730
+
+
+def active_bookings():
+    """Reservas confirmadas e pré-reservas ainda válidas."""
+    return Booking.objects.filter(
+        # Repete a condição da exclusion constraint para usar o índice parcial dela
+        Q(status=Booking.Status.CONFIRMED) | Q(status=Booking.Status.HOLD, expires_at__gt=timezone.now()),
+        status__in=Booking.ACTIVE,
+    )
+
+
+def occupancy_querysets():
+    """Querysets das linhas que ocupam noites (campos `accommodation` e `period`)."""
+    return [AvailabilityBlock.objects.all(), active_bookings()]
+
+
+def stay(check_in, check_out):
+    """`daterange` das noites de uma estadia: da entrada até a noite anterior à saída."""
+    return DateRange(check_in, check_out, '[)')
+
+
+def occupied(period, accommodation=OuterRef('pk')):
+    """Condição "alguma ocupação de `accommodation` cruza `period`"."""
+    condition = None
+    for queryset in occupancy_querysets():
+        exists = Exists(queryset.filter(accommodation=accommodation, period__overlap=period))
+        condition = exists if condition is None else condition | exists
+    return condition
+
+
+def free_filter(check_in, check_out, accommodation=OuterRef('pk')):
+    """Filtro para um queryset de `Accommodation` (ou `OuterRef` para outra tabela)."""
+    return ~occupied(stay(check_in, check_out), accommodation)
+
+
+def matching_accommodations(guests=1, check_in=None, check_out=None, property=OuterRef('pk')):
+    """
+    Acomodações ativas de `property` que comportam `guests` hóspedes e, com as
+    datas, estão livres na estadia. Para `Exists`/`ArraySubquery` na busca
+    pública: índice (propriedade, hóspedes) e o anti-join de `free_filter`.
+    """
+    accommodations = Accommodation.objects.filter(property=property, is_active=True, max_guests__gte=guests)
+    if check_in and check_out:
+        accommodations = accommodations.filter(free_filter(check_in, check_out))
+    return accommodations
+
+
+def is_available(accommodation_id, check_in, check_out):
+    return Accommodation.objects.filter(
+        free_filter(check_in, check_out), pk=accommodation_id, is_active=True
+    ).exists()
+
+
+def available_ids(accommodation_ids, check_in, check_out):
+    """Quais de `accommodation_ids` estão livres na estadia, numa consulta."""
+    return set(
+        Accommodation.objects.filter(
+            free_filter(check_in, check_out), pk__in=accommodation_ids, is_active=True
+        ).values_list('pk', flat=True)
+    )
+
+
+def busy_periods(accommodation_id, start, end):
+    """
+    Noites ocupadas entre `start` e `end` como [(entrada, saída), ...], com os
+    intervalos que se encostam ou se cruzam unidos (para o calendário).
+    """
+    window = stay(start, end)
+    querysets = [
+        queryset.filter(accommodation=accommodation_id, period__overlap=window).values_list('period', flat=True)
+        for queryset in occupancy_querysets()
+    ]
+    periods = querysets[0].union(*querysets[1:], all=True) if len(querysets) > 1 else querysets[0]
+
+    merged = []
+    for period in sorted(periods, key=lambda period: period.lower):
+        lower, upper = max(period.lower, start), min(period.upper, end)
+        if merged and lower <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], upper)
+        else:
+            merged.append([lower, upper])
+    return [tuple(period) for period in merged]
+
@@ -0,0 +1,104 @@
+"""
+Reservas.
+
+Nenhum lock na acomodação: a exclusion constraint `booking_no_overlap` decide
+entre reservas concorrentes. Reservas sem noites em comum são gravadas em
+paralelo; de duas que se cruzam, a segunda espera o commit da primeira e
+falha com violação da constraint, que vira `Unavailable`.
+
+O checkout cria uma pré-reserva (`hold`) válida por `BOOKING_HOLD_MINUTES`;
+`confirm` a efetiva se ainda estiver no prazo. Pré-reservas vencidas deixam de
+ocupar noites na hora (ver `availability.active_bookings`), mas continuam na
+constraint até virarem EXPIRED: `hold` marca as que estão no caminho e
+`expire_holds` (comando `expire_booking_holds`) marca o restante.
+
+Bloqueios (`AvailabilityBlock`) ficam em outra tabela, fora da constraint:
+são conferidos antes da inserção.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .availability import stay
+from .models import AvailabilityBlock, Booking
+from .pricing import QuoteEngine
+
+
+class BookingError(Exception):
+    pass
+
+
+class Unavailable(BookingError):
+    def __init__(self, message="Acomodação indisponível nessas datas"):
+        super().__init__(message)
+
+
+class HoldExpired(BookingError):
+    def __init__(self, message="Pré-reserva expirada ou inexistente"):
+        super().__init__(message)
+
+
+def _violated_constraint(error):
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def hold(accommodation, check_in, check_out, guests=1, **guest):
+    """
+    Cria a pré-reserva de `accommodation` para a estadia, com o total cotado
+    agora. `guest`: `guest_name`, `guest_email` e `guest_phone`.
+    """
+    period = stay(check_in, check_out)
+    [quote] = QuoteEngine([accommodation]).quote([(accommodation.pk, check_in, check_out, guests)])
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            # Pré-reservas vencidas nessas noites ainda contam para a constraint
+            Booking.objects.filter(
+                accommodation=accommodation,
+                period__overlap=period,
+                status=Booking.Status.HOLD,
+                expires_at__lte=now,
+            ).update(status=Booking.Status.EXPIRED, updated_at=now)
+            if AvailabilityBlock.objects.filter(accommodation=accommodation, period__overlap=period).exists():
+                raise Unavailable()
+            return Booking.objects.create(
+                accommodation=accommodation,
+                period=period,
+                guests=guests,
+                total=quote.total,
+                expires_at=now + timedelta(minutes=settings.BOOKING_HOLD_MINUTES),
+                **guest,
+            )
+    except IntegrityError as error:
+        if _violated_constraint(error) == 'booking_no_overlap':
+            raise Unavailable() from error
+        raise
+
+
+def confirm(booking_id):
+    """Efetiva a pré-reserva (ex: depois do pagamento), se ainda estiver no prazo."""
+    confirmed = Booking.objects.filter(
+        pk=booking_id, status=Booking.Status.HOLD, expires_at__gt=timezone.now()
+    ).update(status=Booking.Status.CONFIRMED, expires_at=None, updated_at=timezone.now())
+    if not confirmed:
+        raise HoldExpired()
+
+
+def cancel(booking_id):
+    """Libera as noites. Retorna False se a reserva já não estava ativa."""
+    return bool(
+        Booking.objects.filter(pk=booking_id, status__in=Booking.ACTIVE).update(
+            status=Booking.Status.CANCELLED, expires_at=None, updated_at=timezone.now()
+        )
+    )
+
+
+def expire_holds():
+    """Marca como EXPIRED as pré-reservas vencidas. Retorna quantas."""
+    now = timezone.now()
+    return Booking.objects.filter(status=Booking.Status.HOLD, expires_at__lte=now).update(
+        status=Booking.Status.EXPIRED, updated_at=now
+    )
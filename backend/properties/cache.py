@@ -0,0 +1,123 @@
+"""
+Cache das respostas dos endpoints públicos de propriedades.
+
+As chaves carregam uma versão: a listagem tem uma versão global e cada landing
+page uma versão por slug. Invalidar é trocar a versão (ver `signals.py`), então
+um recálculo que termine depois da invalidação grava numa chave já obsoleta e
+nunca volta a ser servido.
+"""
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+LIST_VERSION_KEY = 'public:list:version'
+
+# Single-flight: quanto tempo um recálculo pode segurar a trava e de quanto em
+# quanto tempo quem espera consulta o cache de novo
+LOCK_TIMEOUT = 10
+LOCK_POLL_INTERVAL = 0.05
+
+
+def _property_version_key(slug):
+    return f'public:property:{slug}:version'
+
+
+def _get_version(version_key):
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return version
+
+
+def _request_hash(request):
+    # A URI completa entra na chave: os payloads têm links absolutos (imagens, next/previous)
+    return hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+
+
+def public_list_version():
+    """Versão atual da listagem pública; muda a cada invalidação."""
+    return _get_version(LIST_VERSION_KEY)
+
+
+def public_list_key(request):
+    return f'public:list:{_get_version(LIST_VERSION_KEY)}:{_request_hash(request)}'
+
+
+# Parâmetros que mudam só a página, não o conjunto filtrado
+PAGINATION_PARAMS = {'page', 'page_size', 'cursor', 'pagination', 'count', 'facets'}
+
+
+def public_facets_key(request):
+    """Facetas dependem só do filtro: a mesma entrada serve todas as páginas."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name not in PAGINATION_PARAMS
+        for value in values
+    )
+    digest = hashlib.md5(repr(params).encode('utf-8')).hexdigest()
+    return f'public:facets:{_get_version(LIST_VERSION_KEY)}:{digest}'
+
+
+def public_autocomplete_key(term, limit):
+    digest = hashlib.md5(term.lower().encode('utf-8')).hexdigest()
+    return f'public:autocomplete:{_get_version(LIST_VERSION_KEY)}:{limit}:{digest}'
+
+
+def public_property_key(slug, request):
+    version = _get_version(_property_version_key(slug))
+    return f'public:property:{slug}:{version}:{_request_hash(request)}'
+
+
+def public_property_validators_key(slug):
+    """ETag/Last-Modified da landing page: mesma versão do payload, sem depender da URI."""
+    return f'public:property:{slug}:{_get_version(_property_version_key(slug))}:validators'
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Retorna o valor cacheado em `key` ou calcula com `compute()`.
+
+    Falhas simultâneas para a mesma chave são colapsadas: só quem obtém a trava
+    (`cache.add`) calcula, os demais aguardam o resultado. Se a espera passar de
+    `LOCK_TIMEOUT`, calculam por conta própria.
+    """
+    if timeout is None:
+        timeout = settings.PUBLIC_CACHE_TIMEOUT
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            # O recálculo falhou (ex: 404); não adianta esperar
+            break
+    return compute()
+
+
+def invalidate_public_properties(*slugs):
+    """Invalida a listagem pública e as landing pages dos slugs informados."""
+    keys = {LIST_VERSION_KEY: uuid.uuid4().hex}
+    for slug in slugs:
+        if slug:
+            keys[_property_version_key(slug)] = uuid.uuid4().hex
+    cache.set_many(keys, None)
@@ -0,0 +1,172 @@
+"""
+Armazenamento endereçado por conteúdo e detecção de imagens repetidas.
+
+Uploads novos são gravados em `images/<aa>/<bb>/<sha256>.<ext>`: bytes idênticos
+viram um único arquivo (e, como as renditions são nomeadas a partir do
+original, um único conjunto de versões). Um arquivo compartilhado só pode ser
+apagado quando nenhuma `Image` o referencia.
+
+Quase-duplicatas (mesma foto recomprimida, redimensionada...) são detectadas
+pelo dHash de 64 bits: imagens com distância de Hamming até
+`NEAR_DUPLICATE_DISTANCE` são consideradas a mesma foto.
+"""
+import hashlib
+import os
+
+from django.db.models import F, Q
+from django.db.models.lookups import Exact
+from PIL import Image as PILImage
+
+CHUNK_SIZE = 1024 * 1024
+NEAR_DUPLICATE_DISTANCE = 6
+
+# O dHash é guardado num BigIntegerField (int64 com sinal). Com mais faixas
+# que NEAR_DUPLICATE_DISTANCE, duas quase-duplicatas sempre têm uma faixa igual.
+HASH_BITS = 64
+BANDS = 8
+BAND_BITS = HASH_BITS // BANDS
+
+
+def content_hash(file):
+    """SHA-256 (hex) do conteúdo de `file`, lido em blocos."""
+    digest = hashlib.sha256()
+    position = file.tell()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(position)
+    return digest.hexdigest()
+
+
+# Formato detectado pelo Pillow -> extensão gravada. Nunca a do nome enviado:
+# um PNG válido chamado `x.html` seria servido como HTML pelo core/media.py
+EXTENSIONS = {'JPEG': '.jpg', 'MPO': '.jpg', 'PNG': '.png', 'GIF': '.gif', 'WEBP': '.webp'}
+
+
+def image_extension(file):
+    """Extensão do formato de imagem de `file` (vazia se o Pillow não reconhecer)."""
+    position = file.tell()
+    file.seek(0)
+    try:
+        with PILImage.open(file) as image:
+            detected = image.format
+    except OSError:
+        return ''
+    finally:
+        file.seek(position)
+    if detected in EXTENSIONS:
+        return EXTENSIONS[detected]
+    registered = PILImage.registered_extensions()
+    return next((extension for extension in sorted(registered) if registered[extension] == detected), '')
+
+
+def content_name(digest, extension):
+    return f'images/{digest[:2]}/{digest[2:4]}/{digest}{extension}'
+
+
+def store_content_addressed(field_file):
+    """
+    Grava o upload pendente de `field_file` no caminho do seu SHA-256.
+
+    Se o conteúdo já existe no storage, nada é gravado: o campo só passa a
+    apontar para o arquivo existente, cujo mtime é renovado para a coleta de
+    lixo (media_gc.py) não tratá-lo como órfão antigo. Retorna o hash.
+    """
+    digest = content_hash(field_file)
+    name = content_name(digest, image_extension(field_file))
+    storage = field_file.storage
+    if not (storage.exists(name) and _touch(storage, name)):
+        name = storage.save(name, field_file.file)
+    field_file.name = name
+    field_file._committed = True
+    return digest
+
+
+def _touch(storage, name):
+    """Renova o mtime de `name`; False se o arquivo sumiu (ex.: foi para a quarentena)."""
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        # Storage remoto: a coleta só percorre o MEDIA_ROOT local
+        return True
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def dhash(image):
+    """
+    Hash perceptual (diferença horizontal) de 64 bits, como int64 com sinal.
+
+    Cada bit diz se um pixel é mais claro que o vizinho da direita numa redução
+    9x8 em tons de cinza.
+    """
+    pixels = list(image.convert('L').resize((9, 8), PILImage.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for column in range(8):
+            left = pixels[row * 9 + column]
+            right = pixels[row * 9 + column + 1]
+            value = (value << 1) | (left > right)
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def hamming(a, b):
+    return ((a ^ b) & ((1 << HASH_BITS) - 1)).bit_count()
+
+
+def _bands(value):
+    value &= (1 << HASH_BITS) - 1
+    mask = (1 << BAND_BITS) - 1
+    return [(band, (value >> (band * BAND_BITS)) & mask) for band in range(BANDS)]
+
+
+def band_filter(field, value):
+    """
+    Filtro SQL "alguma faixa de `field` igual à de `value`", para que só os
+    candidatos a quase-duplicata saiam do banco. No bigint o deslocamento é
+    aritmético, mas os bits mascarados são os mesmos do hash sem sinal.
+    """
+    mask = (1 << BAND_BITS) - 1
+    condition = Q()
+    for band, bits in _bands(value):
+        condition |= Q(Exact(F(field).bitrightshift(band * BAND_BITS).bitand(mask), bits))
+    return condition
+
+
+class HammingIndex:
+    """
+    Busca de hashes próximos por faixas (bands).
+
+    O hash é dividido em `BANDS` faixas de `BAND_BITS` bits; dois hashes com
+    distância menor que `BANDS` têm pelo menos uma faixa idêntica, então só os
+    que compartilham alguma faixa são comparados. Para distâncias maiores a
+    busca cai para a comparação direta.
+    """
+
+    def __init__(self, items=()):
+        self._items = []
+        self._buckets = {}
+        for key, value in items:
+            self.add(key, value)
+
+    def add(self, key, value):
+        self._items.append((key, value))
+        for band in _bands(value):
+            self._buckets.setdefault(band, []).append((key, value))
+
+    def candidates(self, value, max_distance=NEAR_DUPLICATE_DISTANCE):
+        """Itens que podem estar a até `max_distance` de `value`."""
+        if max_distance < BANDS:
+            return {item for band in _bands(value) for item in self._buckets.get(band, ())}
+        return self._items
+
+    def search(self, value, max_distance=NEAR_DUPLICATE_DISTANCE):
+        """Chaves com distância até `max_distance`, da mais próxima para a mais distante."""
+        matches = [
+            (distance, key) for key, other in self.candidates(value, max_distance)
+            if (distance := hamming(value, other)) <= max_distance
+        ]
+        return [key for distance, key in sorted(matches, key=lambda match: match[0])]
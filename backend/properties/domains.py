@@ -0,0 +1,97 @@
+"""
+Resolução de domínios personalizados (`Property.custom_domain`) para slugs.
+
+O mapeamento `host -> slug` fica num cache LRU em memória, por processo, com
+TTL. Hosts desconhecidos também são cacheados (como `None`, com TTL menor), então
+em regime só o primeiro acesso de cada host vai ao banco.
+
+Os signals invalidam as entradas do processo que salvou a propriedade; nos
+demais processos a mudança aparece quando o TTL expira.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.functions import Lower
+
+from .models import Property
+
+_MISSING = object()
+
+
+def normalize_host(host):
+    """Host sem porta, em minúsculas e sem o ponto final."""
+    host = (host or '').strip().lower()
+    if host.startswith('['):
+        # IPv6 literal: nunca é um domínio personalizado
+        return ''
+    return host.rsplit(':', 1)[0].rstrip('.')
+
+
+class DomainCache:
+    """LRU com TTL (e TTL próprio para resultados negativos)."""
+
+    def __init__(self, max_size, ttl, negative_ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        """Slug cacheado, `None` para host sabidamente desconhecido ou `_MISSING`."""
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return _MISSING
+            slug, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[host]
+                return _MISSING
+            self._entries.move_to_end(host)
+            return slug
+
+    def set(self, host, slug):
+        ttl = self.ttl if slug is not None else self.negative_ttl
+        with self._lock:
+            self._entries[host] = (slug, time.monotonic() + ttl)
+            self._entries.move_to_end(host)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *hosts):
+        with self._lock:
+            for host in hosts:
+                self._entries.pop(host, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+domain_cache = DomainCache(
+    max_size=settings.CUSTOM_DOMAIN_CACHE_SIZE,
+    ttl=settings.CUSTOM_DOMAIN_CACHE_TTL,
+    negative_ttl=settings.CUSTOM_DOMAIN_NEGATIVE_TTL,
+)
+
+
+def resolve_host(host):
+    """Slug da propriedade ativa cujo domínio personalizado é `host`, ou None."""
+    host = normalize_host(host)
+    if not host:
+        return None
+
+    slug = domain_cache.get(host)
+    if slug is _MISSING:
+        # Filtro igual ao da restrição única parcial `property_custom_domain_unique`
+        slug = Property.objects.exclude(custom_domain='').annotate(
+            domain=Lower('custom_domain'),
+        ).filter(domain=host, is_active=True).values_list('slug', flat=True).first()
+        domain_cache.set(host, slug)
+    return slug
+
+
+def invalidate_domains(*domains):
+    domain_cache.invalidate(*{normalize_host(domain) for domain in domains if domain})
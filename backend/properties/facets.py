@@ -0,0 +1,97 @@
+"""
+Facetas da listagem pública (estado, cidade, tipo de acomodação, capacidade e preço).
+
+Todas as contagens saem de uma única query com `GROUPING SETS` sobre o filtro
+atual: cada faceta é um conjunto de agrupamento e conta propriedades distintas.
+"""
+from django.db import connection
+
+from .models import Accommodation, PropertyListing
+
+# Faixas (mínimo, máximo) inclusivas; None = sem limite
+GUEST_RANGES = [(1, 2), (3, 4), (5, 6), (7, None)]
+PRICE_RANGES = [(None, 200), (200, 300), (300, 500), (500, 1000), (1000, None)]
+
+# GROUPING(state, city, accommodation_type, guests_bucket, price_bucket):
+# cada bit ligado é uma coluna fora do conjunto de agrupamento
+GROUPING_MASKS = {
+    0b01111: 'state',
+    0b00111: 'city',
+    0b11011: 'accommodation_type',
+    0b11101: 'max_guests',
+    0b11110: 'base_price',
+}
+
+
+def _bucket_case(column, ranges, upper_exclusive):
+    """CASE que devolve o índice da faixa de `column` (faixas em ordem crescente)."""
+    whens = []
+    params = []
+    for index, (low, high) in enumerate(ranges):
+        if high is None:
+            whens.append(f'WHEN {column} IS NOT NULL THEN {index}')
+        else:
+            operator = '<' if upper_exclusive else '<='
+            whens.append(f'WHEN {column} {operator} %s THEN {index}')
+            params.append(high)
+    return f"CASE {' '.join(whens)} END", params
+
+
+def compute_facets(listing_queryset):
+    """
+    Facetas para as propriedades de `listing_queryset` (um queryset de PropertyListing).
+
+    Preços usam faixas semiabertas `[mínimo, máximo)`; capacidade, faixas fechadas.
+    """
+    ids_sql, ids_params = listing_queryset.order_by().values('pk').query.sql_with_params()
+    guests_case, guests_params = _bucket_case('a.max_guests', GUEST_RANGES, upper_exclusive=False)
+    price_case, price_params = _bucket_case('a.base_price', PRICE_RANGES, upper_exclusive=True)
+
+    sql = f"""
+        WITH filtered AS (
+            SELECT l.property_id, l.state, l.city, a.accommodation_type,
+                   {guests_case} AS guests_bucket,
+                   {price_case} AS price_bucket
+            FROM {PropertyListing._meta.db_table} l
+            LEFT JOIN {Accommodation._meta.db_table} a
+                   ON a.property_id = l.property_id AND a.is_active
+            WHERE l.property_id IN ({ids_sql})
+        )
+        SELECT GROUPING(state, city, accommodation_type, guests_bucket, price_bucket),
+               state, city, accommodation_type, guests_bucket, price_bucket,
+               COUNT(DISTINCT property_id)
+        FROM filtered
+        GROUP BY GROUPING SETS (
+            (state), (state, city), (accommodation_type), (guests_bucket), (price_bucket)
+        )
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*guests_params, *price_params, *ids_params])
+        rows = cursor.fetchall()
+
+    type_labels = dict(Accommodation.ACCOMMODATION_TYPES)
+    facets = {name: [] for name in GROUPING_MASKS.values()}
+    for mask, state, city, accommodation_type, guests_bucket, price_bucket, count in rows:
+        facet = GROUPING_MASKS.get(mask)
+        if facet == 'state':
+            facets[facet].append({'value': state, 'count': count})
+        elif facet == 'city':
+            facets[facet].append({'value': city, 'state': state, 'count': count})
+        elif facet == 'accommodation_type' and accommodation_type is not None:
+            facets[facet].append({
+                'value': accommodation_type,
+                'label': type_labels.get(accommodation_type, accommodation_type),
+                'count': count,
+            })
+        elif facet == 'max_guests' and guests_bucket is not None:
+            low, high = GUEST_RANGES[guests_bucket]
+            facets[facet].append({'min': low, 'max': high, 'count': count})
+        elif facet == 'base_price' and price_bucket is not None:
+            low, high = PRICE_RANGES[price_bucket]
+            facets[facet].append({'min': low, 'max': high, 'count': count})
+
+    for name in ('state', 'city', 'accommodation_type'):
+        facets[name].sort(key=lambda bucket: (-bucket['count'], bucket['value']))
+    for name in ('max_guests', 'base_price'):
+        facets[name].sort(key=lambda bucket: bucket['min'] or 0)
+    return facets
@@ -0,0 +1,78 @@
+"""
+Busca geográfica da listagem pública (raio e retângulo do mapa).
+
+O filtro grosso é `point(longitude, latitude) <@ box(...)`, atendido pelo índice
+GiST `listing_geo_idx`; a distância exata (metros, `earthdistance`) só é calculada
+para as linhas que passaram pelo índice.
+"""
+import math
+
+from django.db import models
+from django.db.models import Func, Value
+
+KM_PER_DEGREE = 111.32
+
+
+class GeoPoint(Func):
+    """`point(x, y)` do PostgreSQL; com (longitude, latitude) é a expressão indexada."""
+    function = 'point'
+    output_field = models.Field()
+
+
+class Box(Func):
+    function = 'box'
+    output_field = models.Field()
+
+
+class WithinBox(Func):
+    """`ponto <@ box`, usável direto em `filter()`."""
+    template = '%(expressions)s'
+    arg_joiner = ' <@ '
+    output_field = models.BooleanField()
+
+
+class LlToEarth(Func):
+    function = 'll_to_earth'
+    output_field = models.Field()
+
+
+class EarthDistance(Func):
+    """Distância em metros sobre a superfície da Terra (extensão earthdistance)."""
+    function = 'earth_distance'
+    output_field = models.FloatField()
+
+
+def listing_point():
+    return GeoPoint('longitude', 'latitude')
+
+
+def _box(west, south, east, north):
+    return Box(
+        GeoPoint(Value(float(west)), Value(float(south))),
+        GeoPoint(Value(float(east)), Value(float(north))),
+    )
+
+
+def within_bbox(queryset, west, south, east, north):
+    """Propriedades dentro do retângulo (longitude/latitude em graus)."""
+    return queryset.filter(WithinBox(listing_point(), _box(west, south, east, north)))
+
+
+def near(queryset, latitude, longitude, radius_km):
+    """
+    Propriedades a até `radius_km` do ponto, da mais próxima para a mais distante.
+
+    Anota `distance` (metros).
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    center = LlToEarth(Value(float(latitude)), Value(float(longitude)))
+    return within_bbox(
+        queryset,
+        longitude - delta_lng,
+        max(latitude - delta_lat, -90),
+        longitude + delta_lng,
+        min(latitude + delta_lat, 90),
+    ).annotate(
+        distance=EarthDistance(center, LlToEarth('latitude', 'longitude')),
+    ).filter(distance__lte=radius_km * 1000).order_by('distance', '-created_at')
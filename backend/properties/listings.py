@@ -0,0 +1,78 @@
+"""
+Manutenção do read model `PropertyListing` (listagem pública).
+"""
+from django.db import models
+from django.db.models import Count, Max, Min, OuterRef, Subquery
+
+from .models import Image, Property, PropertyListing
+
+# Campos atualizados no upsert (todos exceto a chave)
+LISTING_FIELDS = [
+    'name', 'slug', 'description', 'city', 'state', 'country', 'latitude',
+    'longitude', 'logo', 'primary_color', 'cover_image', 'cover_renditions',
+    'accommodations_count', 'min_price', 'max_price', 'search_vector',
+    'created_at', 'updated_at',
+]
+
+
+def refresh_listings(property_ids):
+    """
+    Recalcula as linhas de `PropertyListing` das propriedades informadas.
+
+    Propriedades ativas são inseridas/atualizadas com um único
+    `INSERT ... ON CONFLICT`; inativas ou removidas saem do read model.
+    """
+    property_ids = list(property_ids)
+    if not property_ids:
+        return
+
+    cover = Image.objects.filter(property=OuterRef('pk')).order_by('order', '-created_at')
+    active = models.Q(accommodations__is_active=True)
+
+    rows = Property.objects.filter(pk__in=property_ids, is_active=True).order_by().annotate(
+        cover=Subquery(cover.values('image')[:1]),
+        cover_renditions=Subquery(cover.values('renditions')[:1]),
+        active_accommodations=Count('accommodations', filter=active),
+        lowest_price=Min('accommodations__base_price', filter=active),
+        highest_price=Max('accommodations__base_price', filter=active),
+    ).values(
+        'pk', 'name', 'slug', 'description', 'city', 'state', 'country',
+        'latitude', 'longitude', 'logo', 'primary_color', 'search_vector',
+        'created_at', 'cover', 'cover_renditions', 'active_accommodations',
+        'lowest_price', 'highest_price',
+    )
+
+    listings = [
+        PropertyListing(
+            property_id=row['pk'],
+            name=row['name'],
+            slug=row['slug'],
+            description=row['description'],
+            city=row['city'],
+            state=row['state'],
+            country=row['country'],
+            latitude=row['latitude'],
+            longitude=row['longitude'],
+            logo=row['logo'],
+            primary_color=row['primary_color'],
+            cover_image=row['cover'],
+            cover_renditions=row['cover_renditions'] or {},
+            accommodations_count=row['active_accommodations'],
+            min_price=row['lowest_price'],
+            max_price=row['highest_price'],
+            search_vector=row['search_vector'],
+            created_at=row['created_at'],
+        )
+        for row in rows
+    ]
+    if listings:
+        PropertyListing.objects.bulk_create(
+            listings,
+            update_conflicts=True,
+            unique_fields=['property'],
+            update_fields=LISTING_FIELDS,
+        )
+
+    PropertyListing.objects.filter(property_id__in=property_ids).exclude(
+        property_id__in=[listing.property_id for listing in listings]
+    ).delete()
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from properties.uploads import cleanup
+
+
+class Command(BaseCommand):
+    help = 'Remove sessões de upload em partes abandonadas e seus arquivos temporários'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            default=settings.CHUNKED_UPLOAD_TTL,
+            help='Idade mínima (sem atividade) das sessões removidas (padrão: CHUNKED_UPLOAD_TTL)'
+        )
+
+    def handle(self, *args, **options):
+        sessions, files = cleanup(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f'{sessions} sessões e {files} arquivos temporários removidos'
+        ))
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from properties.media_gc import MediaCollector
+
+
+class Command(BaseCommand):
+    help = 'Move arquivos de mídia órfãos para a quarentena e apaga os que passaram do prazo (incremental)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Arquivos comparados com o banco por lote (padrão: 500)'
+        )
+        parser.add_argument(
+            '--max-files',
+            type=int,
+            help='Arquivos percorridos nesta execução; a próxima continua do cursor'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Pausa (segundos) entre os lotes (padrão: 0.1)'
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=int,
+            default=24,
+            help='Idade mínima de um arquivo para ser considerado órfão (padrão: 24)'
+        )
+        parser.add_argument(
+            '--grace-days',
+            type=int,
+            default=7,
+            help='Dias na quarentena antes de apagar (padrão: 7)'
+        )
+        parser.add_argument(
+            '--deleted-days',
+            type=int,
+            default=30,
+            help='Apaga as versões de propriedades excluídas há mais dias que isso (padrão: 30)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Só conta, sem mover ou apagar nada'
+        )
+
+    def handle(self, *args, **options):
+        collector = MediaCollector(
+            batch_size=options['batch_size'],
+            min_age=timedelta(hours=options['min_age_hours']),
+            grace=timedelta(days=options['grace_days']),
+            deleted_after=timedelta(days=options['deleted_days']),
+            max_files=options['max_files'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+        stats = collector.run()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['scanned']} arquivos verificados: {stats['quarantined']} em quarentena, "
+            f"{stats['deleted']} apagados, {stats['restored']} restaurados, "
+            f"{stats['purged_renditions']} conjuntos de versões removidos"
+        ))
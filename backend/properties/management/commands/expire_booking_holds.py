@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from properties.bookings import expire_holds
+
+
+class Command(BaseCommand):
+    help = 'Marca como expiradas as pré-reservas vencidas'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'{expire_holds()} pré-reservas expiradas'))
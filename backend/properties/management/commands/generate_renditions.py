@@ -0,0 +1,94 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+from properties.cache import invalidate_public_properties
+from properties.listings import refresh_listings
+from properties.models import Image, Property
+from properties.renditions import LOGO_SIZES, RENDITION_SIZES, is_current, process_image
+
+
+def process(source, sizes):
+    # Roda no processo do pool: só arquivos, sem banco
+    try:
+        return source, process_image(source, sizes), None
+    except Exception as error:
+        return source, None, error
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera as versões redimensionadas (WebP/JPEG) e os metadados (dimensões, '
+        'cor dominante, placeholder) de imagens e logos que ainda não os têm'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Processos gerando imagens em paralelo (padrão: 4)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regera também as que já estão atualizadas'
+        )
+
+    def handle(self, *args, **options):
+        force = options['force']
+        images = defaultdict(list)
+        queryset = Image.objects.select_related('accommodation').only(
+            'image', 'renditions', 'placeholder', 'property_id', 'accommodation__property_id'
+        )
+        for image in queryset.iterator():
+            if image.image and (force or not image.placeholder or not is_current(image.image, image.renditions)):
+                images[image.image.name].append(image)
+        logos = defaultdict(list)
+        queryset = Property.objects.exclude(logo='').exclude(logo__isnull=True).only('logo', 'logo_renditions', 'slug')
+        for prop in queryset.iterator():
+            if force or not is_current(prop.logo, prop.logo_renditions):
+                logos[prop.logo.name].append(prop)
+
+        # Conexões abertas não podem ser herdadas pelos processos do pool
+        connections.close_all()
+
+        processed = failed = 0
+        property_ids = set()  # capa da listagem pública
+        touched_ids = set()
+        slugs = set()
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(process, name, tuple(RENDITION_SIZES)): images for name in images}
+            futures.update({pool.submit(process, name, LOGO_SIZES): logos for name in logos})
+            for future in as_completed(futures):
+                source, result, error = future.result()
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'  {source}: {error}')
+                    continue
+
+                now = timezone.now()
+                if futures[future] is images:
+                    Image.objects.filter(pk__in=[image.pk for image in images[source]], image=source).update(
+                        **result, updated_at=now
+                    )
+                    for image in images[source]:
+                        if image.property_id:
+                            property_ids.add(image.property_id)
+                        touched_ids.add(image.property_id or image.accommodation.property_id)
+                else:
+                    Property.objects.filter(pk__in=[prop.pk for prop in logos[source]], logo=source).update(
+                        logo_renditions=result['renditions'], updated_at=now
+                    )
+                    slugs.update(prop.slug for prop in logos[source])
+                processed += 1
+
+        refresh_listings(property_ids)
+        slugs.update(Property.objects.filter(pk__in=touched_ids).values_list('slug', flat=True))
+        invalidate_public_properties(*slugs)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Arquivos processados: {processed} (falhas: {failed})'
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from properties.seo import SeoGenerator
+
+
+class Command(BaseCommand):
+    help = 'Gera o sitemap e os snapshots de SEO das propriedades públicas (incremental)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Renderiza todos os snapshots, ignorando a última execução'
+        )
+        parser.add_argument(
+            '--output',
+            help='Diretório de saída (padrão: settings.SEO_ROOT)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Linhas lidas do banco por lote (padrão: 2000)'
+        )
+
+    def handle(self, *args, **options):
+        generator = SeoGenerator(root=options['output'], batch_size=options['batch_size'])
+        stats = generator.run(full=options['full'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Arquivos de SEO em {generator.root}: {stats['snapshots']} snapshots gravados, "
+            f"{stats['removed']} removidos, {stats['sitemaps']} sitemaps atualizados"
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from properties.listings import refresh_listings
+from properties.models import Property, PropertyListing
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o read model da listagem pública (PropertyListing)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Propriedades recalculadas por lote (padrão: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        property_ids = Property.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+        batch = []
+        total = 0
+        for property_id in property_ids.iterator(chunk_size=batch_size):
+            batch.append(property_id)
+            if len(batch) == batch_size:
+                refresh_listings(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            refresh_listings(batch)
+            total += len(batch)
+
+        removed, _ = PropertyListing.objects.exclude(property__is_active=True).delete()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Listagens reconstruídas: {total} (removidas: {removed})'
+        ))
@@ -2,7 +2,6 @@ import random
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from properties.models import Property, Accommodation, Image, PropertyAccess
-from django.utils.text import slugify
 
 User = get_user_model()
 
@@ -182,15 +181,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS('Seeding Completed Successfully!'))
 
     def create_property_for_user(self, user, data):
-        # Create Property
-        prop_slug = slugify(data['name'])
-        # Ensure unique slug
-        original_slug = prop_slug
-        counter = 1
-        while Property.objects.filter(slug=prop_slug).exists():
-            prop_slug = f"{original_slug}-{counter}"
-            counter += 1
-
+        # Create Property (slug gerado em Property.save)
         if Property.objects.filter(name=data['name'], owner=user).exists():
             self.stdout.write(f"Property {data['name']} already exists for {user.username}")
             return
@@ -199,7 +190,6 @@ class Command(BaseCommand):
             owner=user,
             name=data['name'],
             description=data['description'],
-            slug=prop_slug,
             address="Chapada dos Guimarães, MT",
             city="Chapada dos Guimarães",
             state="MT",
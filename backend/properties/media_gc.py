@@ -0,0 +1,333 @@
+"""
+Coleta de lixo dos arquivos de mídia.
+
+Remover uma `Image`, trocar o logo ou excluir (soft delete) uma propriedade não
+apaga arquivos: como os originais são endereçados por conteúdo (ver
+content.py), o mesmo arquivo e suas versões podem estar em uso por outro
+registro. Esta coleta percorre `MEDIA_ROOT` e decide pelo banco:
+
+1. os arquivos são lidos em ordem, diretório por diretório, e comparados com
+   os caminhos referenciados em lotes (uma consulta por lote ao índice de
+   `Image.sha256`; os caminhos que não são endereçados por conteúdo são
+   lidos do banco uma única vez por execução, ver `References`);
+2. órfãos mais antigos que `min_age` (uploads ainda sem registro commitado
+   são mais novos que isso) vão para a quarentena `.gc/quarantine/`;
+3. os que voltaram a ser referenciados (ex.: um upload idêntico chegou
+   enquanto eram movidos) voltam para o lugar na execução seguinte, qualquer
+   que seja a idade; os demais são apagados depois de `grace` na quarentena;
+4. versões (renditions) de propriedades excluídas há mais de `deleted_after`
+   são apagadas quando nenhuma imagem ativa usa o mesmo arquivo.
+
+O cursor (último caminho visto) fica em `.gc/state.json`, então uma execução
+limitada por `max_files` continua de onde a anterior parou; `pause` entre os
+lotes limita a carga no disco e no banco.
+"""
+import json
+import os
+import posixpath
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Image, Property
+from .renditions import delete_renditions
+
+GC_DIR = '.gc'
+QUARANTINE_DIR = f'{GC_DIR}/quarantine'
+STATE_FILE = f'{GC_DIR}/state.json'
+RENDITIONS_PREFIX = 'renditions/'
+
+# Campos que guardam caminhos de arquivos (os de PropertyListing são cópias)
+FILE_FIELDS = [(Image, 'image'), (Property, 'logo')]
+
+# images/aa/bb/<sha256>(.ext): resolvido pelo índice de Image.sha256
+CONTENT_ADDRESSED = re.compile(r'^images/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(\.\w+)?$')
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _modified_before(path, cutoff):
+    # os.stat e não DirEntry.stat(), que guarda o resultado da primeira chamada
+    try:
+        return os.stat(path).st_mtime < cutoff
+    except FileNotFoundError:
+        return False
+
+
+def _split_by_hash(names):
+    hashes, others = set(), []
+    for name in names:
+        match = CONTENT_ADDRESSED.match(name)
+        if match:
+            hashes.add(match.group(1))
+        else:
+            others.append(name)
+    return hashes, others
+
+
+class References:
+    """
+    Quais caminhos (relativos a MEDIA_ROOT) ainda estão em uso.
+
+    Originais endereçados por conteúdo são resolvidos em lotes pelo índice de
+    `Image.sha256`. Os demais (logos, imagens anteriores ao endereçamento) não
+    têm índice que atenda `image__in` nem o caminho sem extensão: em vez de uma
+    varredura da tabela por lote, os nomes são lidos numa única passada, na
+    primeira vez que aparecem, e reaproveitados pelo resto da execução.
+    """
+
+    def __init__(self):
+        self._names = None
+        self._stems = None
+
+    def other_names(self):
+        if self._names is None:
+            self._names = set()
+            for model, field in FILE_FIELDS:
+                names = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''})
+                self._names.update(
+                    name for name in names.values_list(field, flat=True).iterator()
+                    if not CONTENT_ADDRESSED.match(name)
+                )
+        return self._names
+
+    def other_stems(self):
+        if self._stems is None:
+            self._stems = {posixpath.splitext(name)[0] for name in self.other_names()}
+        return self._stems
+
+    def used_names(self, names):
+        """Subconjunto de `names` referenciado por algum registro."""
+        hashes, others = _split_by_hash(names)
+        used = set()
+        if hashes:
+            used.update(Image.objects.filter(sha256__in=hashes).values_list('image', flat=True))
+        if others:
+            used.update(self.other_names().intersection(others))
+        return used & set(names)
+
+    def used_stems(self, stems):
+        """Subconjunto de `stems` (caminho sem extensão) de arquivos referenciados."""
+        hashes, others = _split_by_hash(stems)
+        used = set()
+        if hashes:
+            names = Image.objects.filter(sha256__in=hashes).values_list('image', flat=True)
+            used.update(posixpath.splitext(name)[0] for name in names)
+        if others:
+            used.update(self.other_stems().intersection(others))
+        return used & set(stems)
+
+    def referenced_paths(self, paths):
+        """
+        Subconjunto de `paths` ainda em uso: originais referenciados e versões
+        de um original referenciado.
+        """
+        originals, renditions = [], defaultdict(list)
+        for path in paths:
+            if path.startswith(RENDITIONS_PREFIX):
+                stem = posixpath.dirname(path[len(RENDITIONS_PREFIX):])
+                renditions[stem].append(path)
+            else:
+                originals.append(path)
+
+        referenced = self.used_names(originals) if originals else set()
+        if renditions:
+            for stem in self.used_stems(list(renditions)):
+                referenced.update(renditions[stem])
+        return referenced
+
+
+class MediaCollector:
+    """Uma execução da coleta; `run()` retorna as contagens."""
+
+    def __init__(
+        self,
+        root=None,
+        batch_size=500,
+        min_age=timedelta(hours=24),
+        grace=timedelta(days=7),
+        deleted_after=timedelta(days=30),
+        max_files=None,
+        pause=0.0,
+        dry_run=False,
+    ):
+        self.root = Path(root or settings.MEDIA_ROOT)
+        self.quarantine = self.root / QUARANTINE_DIR
+        self.batch_size = batch_size
+        self.min_age = min_age
+        self.grace = grace
+        self.deleted_after = deleted_after
+        self.max_files = max_files
+        self.pause = pause
+        self.dry_run = dry_run
+        self.references = References()
+        self.stats = Counter()
+
+    # Percurso
+
+    def walk(self, directory, prefix='', after=''):
+        """
+        `(caminho relativo, DirEntry)` dos arquivos em ordem lexicográfica do
+        caminho, só os maiores que `after`. Diretórios ocultos são ignorados e
+        subárvores inteiras antes do cursor nem são listadas.
+        """
+        try:
+            with os.scandir(directory) as entries:
+                entries = [
+                    (entry.name + '/' if entry.is_dir(follow_symlinks=False) else entry.name, entry)
+                    for entry in entries if not entry.name.startswith('.')
+                ]
+        except FileNotFoundError:
+            return
+        entries.sort(key=lambda item: item[0])
+
+        for key, entry in entries:
+            path = prefix + key
+            if key.endswith('/'):
+                if path < after and not after.startswith(path):
+                    continue
+                yield from self.walk(entry.path, path, after)
+            elif path > after and entry.is_file(follow_symlinks=False):
+                yield path, entry
+
+    # Estado
+
+    def load_state(self):
+        try:
+            return json.loads((self.root / STATE_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save_state(self, state):
+        if self.dry_run:
+            return
+        path = self.root / STATE_FILE
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, path)
+
+    # Etapas
+
+    def run(self):
+        state = self.load_state()
+        cursor = state.get('cursor', '')
+        scanned = 0
+
+        size = min(self.batch_size, self.max_files or self.batch_size)
+        for batch in _batches(self.walk(self.root, after=cursor), size):
+            self.collect(batch)
+            cursor = batch[-1][0]
+            scanned += len(batch)
+            self.save_state({**state, 'cursor': cursor})
+            if self.max_files and scanned >= self.max_files:
+                break
+            time.sleep(self.pause)
+        else:
+            # Percurso completo: a próxima execução recomeça do início
+            self.save_state({'cursor': '', 'finished_at': timezone.now().isoformat()})
+
+        self.purge_quarantine()
+        self.purge_deleted_properties()
+        return self.stats
+
+    def collect(self, batch):
+        """Move para a quarentena os arquivos antigos do lote que ninguém referencia."""
+        self.stats['scanned'] += len(batch)
+        cutoff = time.time() - self.min_age.total_seconds()
+        old = [path for path, entry in batch if _modified_before(entry, cutoff)]
+        if not old:
+            return
+        referenced = self.references.referenced_paths(old)
+        for path in old:
+            # Reaproveitado por um upload (mtime renovado) depois da listagem
+            if path not in referenced and _modified_before(self.root / path, cutoff):
+                self.stats['quarantined'] += 1
+                if not self.dry_run:
+                    self._move(self.root / path, self.quarantine / path)
+
+    def purge_quarantine(self):
+        """Restaura o que voltou a ser usado; apaga o que passou do prazo na quarentena."""
+        cutoff = time.time() - self.grace.total_seconds()
+        for batch in _batches(self.walk(self.quarantine), self.batch_size):
+            referenced = self.references.referenced_paths([path for path, _ in batch])
+            for path, entry in batch:
+                source, original = self.quarantine / path, self.root / path
+                if path in referenced and not original.exists():
+                    self.stats['restored'] += 1
+                    if not self.dry_run:
+                        self._move(source, original)
+                    continue
+                if not _modified_before(entry, cutoff):
+                    continue
+                # Órfão, ou referenciado mas já regravado no lugar original
+                self.stats['deleted'] += 1
+                if not self.dry_run:
+                    source.unlink(missing_ok=True)
+                    self._prune(source.parent, self.quarantine)
+            time.sleep(self.pause)
+
+    def purge_deleted_properties(self):
+        """Apaga as versões das imagens e logos de propriedades excluídas há muito tempo."""
+        if self.deleted_after is None:
+            return
+        cutoff = timezone.now() - self.deleted_after
+        deleted = Q(property__deleted_at__lt=cutoff) | Q(accommodation__property__deleted_at__lt=cutoff)
+
+        stale = Image.objects.filter(deleted).exclude(renditions={}).order_by('image')
+        names = stale.values_list('image', flat=True).distinct()
+        for batch in _batches(names.iterator(), self.batch_size):
+            # Arquivo compartilhado com uma imagem ativa: as versões continuam em uso
+            live = set(
+                Image.objects.filter(image__in=batch).exclude(deleted).values_list('image', flat=True)
+            )
+            dead = [name for name in batch if name not in live]
+            self.stats['purged_renditions'] += len(dead)
+            if self.dry_run or not dead:
+                continue
+            for renditions in stale.filter(image__in=dead).values_list('renditions', flat=True):
+                delete_renditions(renditions)
+            Image.objects.filter(image__in=dead).update(renditions={})
+            time.sleep(self.pause)
+
+        logos = Property.objects.filter(deleted_at__lt=cutoff).exclude(logo_renditions={})
+        for prop in logos.only('logo_renditions').iterator():
+            self.stats['purged_renditions'] += 1
+            if not self.dry_run:
+                delete_renditions(prop.logo_renditions)
+                Property.objects.filter(pk=prop.pk).update(logo_renditions={})
+
+    # Arquivos
+
+    def _move(self, source, destination):
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, destination)
+        # Na quarentena o mtime marca a entrada (início do prazo)
+        os.utime(destination)
+        self._prune(source.parent, self.root)
+
+    @staticmethod
+    def _prune(directory, stop):
+        """Remove diretórios que ficaram vazios, subindo até `stop` (exclusive)."""
+        directory = Path(directory)
+        while directory != stop and stop in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                return
+            directory = directory.parent
@@ -0,0 +1,37 @@
+"""
+Middleware de domínios personalizados (white-label).
+"""
+from .domains import resolve_host
+from .views import PropertyPublicView
+
+
+class CustomDomainMiddleware:
+    """
+    Atende a landing page das propriedades com domínio personalizado.
+
+    Requisições GET/HEAD para a raiz (`/`) de um host cadastrado em
+    `Property.custom_domain` recebem o mesmo payload de
+    `/api/v1/public/properties/<slug>/`, inclusive cache e GET condicional.
+    Os demais hosts e caminhos seguem o roteamento normal, sem consultar o
+    cache de domínios.
+
+    O host passa antes por `request.get_host()`, então os domínios precisam
+    estar cobertos por `ALLOWED_HOSTS`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path_info != '/' or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+
+        slug = resolve_host(request.get_host())
+        if slug:
+            response = PropertyPublicView.as_view()(request, slug=slug)
+            if hasattr(response, 'render'):
+                # Fora do handler ninguém renderiza a Response do DRF
+                response.render()
+            return response
+
+        return self.get_response(request)
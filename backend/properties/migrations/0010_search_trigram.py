@@ -0,0 +1,40 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:13
+
+import django.contrib.postgres.indexes
+import properties.search
+from django.contrib.postgres.operations import (
+    AddIndexConcurrently,
+    TrigramExtension,
+    UnaccentExtension,
+)
+from django.db import migrations, models
+
+
+# unaccent() é STABLE; o wrapper fixa o dicionário para poder ser indexado.
+CREATE_IMMUTABLE_UNACCENT = """
+CREATE OR REPLACE FUNCTION immutable_unaccent(text)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+"""
+
+DROP_IMMUTABLE_UNACCENT = "DROP FUNCTION IF EXISTS immutable_unaccent(text);"
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0009_install_unaccent'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        TrigramExtension(),
+        migrations.RunSQL(CREATE_IMMUTABLE_UNACCENT, DROP_IMMUTABLE_UNACCENT),
+        AddIndexConcurrently(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(properties.search.SearchDocument('name', 'city'), name='gin_trgm_ops'), condition=models.Q(('is_active', True)), name='property_search_trgm_idx'),
+        ),
+    ]
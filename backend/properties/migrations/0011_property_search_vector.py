@@ -0,0 +1,79 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:02
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+# Configuração `portuguese` com unaccent antes do stemmer
+CREATE_SEARCH_CONFIG = """
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = pg_catalog.portuguese);
+        ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+    END IF;
+END
+$$;
+"""
+
+DROP_SEARCH_CONFIG = "DROP TEXT SEARCH CONFIGURATION IF EXISTS portuguese_unaccent;"
+
+SEARCH_CONFIG = 'portuguese_unaccent'
+
+
+def populate_search_vector(apps, schema_editor):
+    """
+    Preenche o search_vector das propriedades existentes.
+
+    A expressão fica copiada aqui (e não importada de properties/search.py)
+    para a migration calcular sempre o mesmo vetor, mesmo que o código mude.
+    """
+    Property = apps.get_model('properties', 'Property')
+    Accommodation = apps.get_model('properties', 'Accommodation')
+    accommodation_names = Accommodation.objects.filter(
+        property=OuterRef('pk'), is_active=True
+    ).order_by().values('property').annotate(
+        names=StringAgg('name', delimiter=' ')
+    ).values('names')
+    Property.objects.update(search_vector=(
+        SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('city', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG) +
+        SearchVector(
+            Subquery(accommodation_names, output_field=models.TextField()),
+            weight='D',
+            config=SEARCH_CONFIG,
+        )
+    ))
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0010_search_trigram'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH_CONFIG, DROP_SEARCH_CONFIG),
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            populate_search_vector,
+            reverse_code=migrations.RunPython.noop
+        ),
+        AddIndexConcurrently(
+            model_name='property',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='property_search_vector_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:15
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0011_property_search_vector'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='property_public_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+import properties.search
+from django.db import migrations, models
+
+
+# Carga inicial do read model (o mesmo cálculo de properties.listings.refresh_listings)
+POPULATE_LISTINGS = """
+INSERT INTO properties_propertylisting (
+    property_id, name, slug, description, city, state, country, logo,
+    primary_color, cover_image, accommodations_count, min_price, max_price,
+    search_vector, created_at, updated_at
+)
+SELECT
+    p.id, p.name, p.slug, p.description, p.city, p.state, p.country, p.logo,
+    p.primary_color,
+    (SELECT i.image FROM properties_image i
+      WHERE i.property_id = p.id
+      ORDER BY i."order", i.created_at DESC LIMIT 1),
+    COUNT(a.id) FILTER (WHERE a.is_active),
+    MIN(a.base_price) FILTER (WHERE a.is_active),
+    MAX(a.base_price) FILTER (WHERE a.is_active),
+    p.search_vector, p.created_at, NOW()
+FROM properties_property p
+LEFT JOIN properties_accommodation a ON a.property_id = p.id
+WHERE p.is_active
+GROUP BY p.id;
+"""
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_property_public_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyListing',
+            fields=[
+                ('property', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='listing', serialize=False, to='properties.property', verbose_name='Propriedade')),
+                ('name', models.CharField(max_length=200, verbose_name='Nome')),
+                ('slug', models.SlugField(max_length=100, verbose_name='Slug (URL)')),
+                ('description', models.TextField(blank=True, verbose_name='Descrição')),
+                ('city', models.CharField(max_length=100, verbose_name='Cidade')),
+                ('state', models.CharField(max_length=100, verbose_name='Estado')),
+                ('country', models.CharField(max_length=100, verbose_name='País')),
+                ('logo', models.ImageField(blank=True, null=True, upload_to='', verbose_name='Logo')),
+                ('primary_color', models.CharField(blank=True, max_length=7, verbose_name='Cor Primária')),
+                ('cover_image', models.ImageField(blank=True, null=True, upload_to='', verbose_name='Imagem de capa')),
+                ('accommodations_count', models.PositiveIntegerField(default=0, verbose_name='Acomodações ativas')),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Menor preço')),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Maior preço')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('created_at', models.DateTimeField(verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Listagem Pública',
+                'verbose_name_plural': 'Listagens Públicas',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.RunSQL(POPULATE_LISTINGS, migrations.RunSQL.noop),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_search_trgm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_search_vector_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_public_keyset_idx',
+        ),
+        migrations.AddIndex(
+            model_name='propertylisting',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(properties.search.SearchDocument('name', 'city'), name='gin_trgm_ops'), name='listing_search_trgm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertylisting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='listing_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertylisting',
+            index=models.Index(fields=['-created_at', '-property'], name='listing_keyset_idx'),
+        ),
+    ]
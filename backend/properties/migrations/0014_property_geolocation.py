@@ -0,0 +1,44 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:22
+
+import django.contrib.postgres.indexes
+import django.core.validators
+import properties.geo
+from django.contrib.postgres.operations import CreateExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_property_listing'),
+    ]
+
+    operations = [
+        # earth_distance()/ll_to_earth() usados em properties/geo.py
+        CreateExtension('cube'),
+        CreateExtension('earthdistance'),
+        migrations.AddField(
+            model_name='property',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)], verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)], verbose_name='Longitude'),
+        ),
+        migrations.AddField(
+            model_name='propertylisting',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, verbose_name='Latitude'),
+        ),
+        migrations.AddField(
+            model_name='propertylisting',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, verbose_name='Longitude'),
+        ),
+        migrations.AddIndex(
+            model_name='propertylisting',
+            index=django.contrib.postgres.indexes.GistIndex(properties.geo.GeoPoint('longitude', 'latitude'), name='listing_geo_idx'),
+        ),
+    ]
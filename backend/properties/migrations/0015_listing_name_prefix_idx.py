@@ -0,0 +1,22 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:24
+
+import django.db.models.functions.comparison
+import properties.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0014_property_geolocation'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='propertylisting',
+            index=models.Index(django.db.models.functions.comparison.Collate(properties.search.SearchDocument('name'), 'C'), name='listing_name_prefix_idx'),
+        ),
+    ]
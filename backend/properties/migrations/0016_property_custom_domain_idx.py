@@ -0,0 +1,23 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:26
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0015_listing_name_prefix_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='property',
+            index=models.Index(django.db.models.functions.text.Lower('custom_domain'), condition=models.Q(('custom_domain', ''), _negated=True), name='property_custom_domain_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:29
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0016_property_custom_domain_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='propertylisting',
+            index=models.Index(fields=['updated_at'], name='listing_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0017_listing_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='image',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versões'),
+        ),
+        migrations.AddField(
+            model_name='property',
+            name='logo_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versões do logo'),
+        ),
+        migrations.AddField(
+            model_name='propertylisting',
+            name='cover_renditions',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Versões da capa'),
+        ),
+    ]
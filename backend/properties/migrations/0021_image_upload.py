@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:37
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0020_image_content_hashes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('caption', models.CharField(blank=True, max_length=200, verbose_name='Legenda')),
+                ('order', models.PositiveIntegerField(default=0, verbose_name='Ordem')),
+                ('filename', models.CharField(max_length=255, verbose_name='Nome do arquivo')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamanho (bytes)')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 esperado')),
+                ('received', models.PositiveBigIntegerField(default=0, verbose_name='Bytes recebidos')),
+                ('status', models.CharField(choices=[('PENDING', 'Em andamento'), ('COMPLETE', 'Concluído')], default='PENDING', max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('accommodation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to='properties.accommodation', verbose_name='Acomodação')),
+                ('image', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='properties.image', verbose_name='Imagem criada')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to='properties.property', verbose_name='Propriedade')),
+            ],
+            options={
+                'verbose_name': 'Upload de Imagem',
+                'verbose_name_plural': 'Uploads de Imagens',
+                'indexes': [models.Index(fields=['updated_at'], name='image_upload_gc_idx')],
+            },
+        ),
+    ]
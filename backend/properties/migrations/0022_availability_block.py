@@ -0,0 +1,38 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:44
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+import uuid
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0021_image_upload'),
+    ]
+
+    operations = [
+        # `accommodation =` (uuid) na exclusion constraint GiST
+        BtreeGistExtension(),
+        migrations.CreateModel(
+            name='AvailabilityBlock',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', django.contrib.postgres.fields.ranges.DateRangeField(verbose_name='Noites')),
+                ('reason', models.CharField(choices=[('BLOCKED', 'Bloqueado'), ('MAINTENANCE', 'Manutenção'), ('EXTERNAL', 'Reserva externa')], default='BLOCKED', max_length=20, verbose_name='Motivo')),
+                ('note', models.CharField(blank=True, max_length=200, verbose_name='Observação')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('accommodation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='availability_blocks', to='properties.accommodation', verbose_name='Acomodação')),
+            ],
+            options={
+                'verbose_name': 'Bloqueio de Agenda',
+                'verbose_name_plural': 'Bloqueios de Agenda',
+                'ordering': ['period'],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('accommodation', '='), ('period', '&&')], name='availability_block_no_overlap'), models.CheckConstraint(condition=models.Q(('period__isempty', False), ('period__lower_inf', False), ('period__upper_inf', False)), name='availability_block_bounded_period')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:46
+
+import django.contrib.postgres.fields.ranges
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0022_availability_block'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, verbose_name='Nome')),
+                ('period', django.contrib.postgres.fields.ranges.DateRangeField(blank=True, null=True, verbose_name='Noites')),
+                ('weekdays', models.PositiveSmallIntegerField(default=127, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(127)], verbose_name='Dias da semana (bits, segunda = 1)')),
+                ('multiplier', models.DecimalField(decimal_places=3, max_digits=5, validators=[django.core.validators.MinValueValidator(0)], verbose_name='Multiplicador')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('accommodation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='properties.accommodation', verbose_name='Acomodação')),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='properties.property', verbose_name='Propriedade')),
+            ],
+            options={
+                'verbose_name': 'Regra de Preço',
+                'verbose_name_plural': 'Regras de Preço',
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
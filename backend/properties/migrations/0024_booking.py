@@ -0,0 +1,41 @@
+# Generated by Django 5.2.9 on 2026-10-18 15:50
+
+import django.contrib.postgres.constraints
+import django.contrib.postgres.fields.ranges
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0023_price_rule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('period', django.contrib.postgres.fields.ranges.DateRangeField(verbose_name='Noites')),
+                ('guests', models.PositiveIntegerField(default=1, verbose_name='Hóspedes')),
+                ('guest_name', models.CharField(max_length=200, verbose_name='Nome do hóspede')),
+                ('guest_email', models.EmailField(max_length=254, verbose_name='Email do hóspede')),
+                ('guest_phone', models.CharField(blank=True, max_length=20, verbose_name='Telefone do hóspede')),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='Total')),
+                ('status', models.CharField(choices=[('HOLD', 'Pré-reserva'), ('CONFIRMED', 'Confirmada'), ('CANCELLED', 'Cancelada'), ('EXPIRED', 'Expirada')], default='HOLD', max_length=20, verbose_name='Status')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name='Pré-reserva válida até')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('accommodation', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='bookings', to='properties.accommodation', verbose_name='Acomodação')),
+            ],
+            options={
+                'verbose_name': 'Reserva',
+                'verbose_name_plural': 'Reservas',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'HOLD')), fields=['expires_at'], name='booking_hold_expiry_idx')],
+                'constraints': [django.contrib.postgres.constraints.ExclusionConstraint(condition=models.Q(('status__in', ['HOLD', 'CONFIRMED'])), expressions=[('accommodation', '='), ('period', '&&')], name='booking_no_overlap'), models.CheckConstraint(condition=models.Q(('period__isempty', False), ('period__lower_inf', False), ('period__upper_inf', False)), name='booking_bounded_period'), models.CheckConstraint(condition=models.Q(models.Q(('status', 'HOLD'), _negated=True), ('expires_at__isnull', False), _connector='OR'), name='booking_hold_expires')],
+            },
+        ),
+    ]
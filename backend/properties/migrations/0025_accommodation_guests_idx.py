@@ -0,0 +1,20 @@
+# Generated by Django 5.2.9 on 2026-10-18 18:05
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY não roda dentro de transação
+    atomic = False
+
+    dependencies = [
+        ('properties', '0024_booking'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='accommodation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['property', 'max_guests'], name='accommodation_guests_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.9 on 2026-10-18 16:12
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def release_duplicate_domains(apps, schema_editor):
+    """
+    Antes da restrição única: propriedades excluídas liberam o domínio e cada
+    domínio fica com a propriedade que o cadastrou primeiro; as demais (que o
+    tomavam por serem mais novas) perdem.
+    """
+    Property = apps.get_model('properties', 'Property')
+    Property.objects.filter(deleted_at__isnull=False).exclude(custom_domain='').update(custom_domain='')
+    claims = Property.objects.exclude(custom_domain='').annotate(
+        domain=Lower('custom_domain'),
+    ).order_by('domain', 'created_at', 'pk').values_list('pk', 'domain')
+    seen, duplicates = set(), []
+    for pk, domain in claims.iterator():
+        if domain in seen:
+            duplicates.append(pk)
+        seen.add(domain)
+    Property.objects.filter(pk__in=duplicates).update(custom_domain='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0025_accommodation_guests_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(release_duplicate_domains, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='property',
+            name='property_custom_domain_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='property',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('custom_domain'), condition=models.Q(('custom_domain', ''), _negated=True), name='property_custom_domain_unique'),
+        ),
+    ]
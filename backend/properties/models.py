@@ -2,10 +2,22 @@
 Models for the properties app.
 """
 import uuid
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.contrib.postgres.search import SearchVectorField
+from django.db import IntegrityError, models, transaction
+from django.db.models.functions import Lower
 from django.conf import settings
 from django.utils import timezone
 
+from .geo import GeoPoint
+from .content import store_content_addressed
+from .renditions import read_dimensions
+from .search import SearchDocument, name_prefix_expression
+from .slugs import base_slug, next_free_slug, taken_slugs
+
 
 class Property(models.Model):
     """Property model for managing accommodations."""
@@ -36,6 +48,18 @@ class Property(models.Model):
     state = models.CharField(max_length=100, verbose_name="Estado")
     zip_code = models.CharField(max_length=20, verbose_name="CEP")
     country = models.CharField(max_length=100, default="Brasil", verbose_name="País")
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+        verbose_name="Latitude"
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+        verbose_name="Longitude"
+    )
     
     # Contact
     phone = models.CharField(max_length=20, blank=True, verbose_name="Telefone")
@@ -52,11 +76,16 @@ class Property(models.Model):
     # Customization
     logo = models.ImageField(upload_to='logos/', blank=True, null=True, verbose_name="Logo")
     primary_color = models.CharField(max_length=7, blank=True, default="#6366f1", verbose_name="Cor Primária")
+    # Tamanhos gerados a partir do logo (ver properties/renditions.py)
+    logo_renditions = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Versões do logo")
     
     # Soft delete
     is_active = models.BooleanField(default=True, verbose_name="Ativo")
     deleted_at = models.DateTimeField(null=True, blank=True, verbose_name="Deletado em")
     
+    # Full-text search (mantido pelos signals, copiado para PropertyListing)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
@@ -65,31 +94,60 @@ class Property(models.Model):
         verbose_name = "Propriedade"
         verbose_name_plural = "Propriedades"
         ordering = ["-created_at"]
+        constraints = [
+            # Um domínio aponta para uma única propriedade; o índice único também
+            # atende a resolução de domínio personalizado (ver properties/domains.py)
+            models.UniqueConstraint(
+                Lower('custom_domain'),
+                condition=~models.Q(custom_domain=''),
+                name='property_custom_domain_unique',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.city}/{self.state}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Slug carregado do banco: se mudar, o cache da URL antiga também é invalidado
+        instance._loaded_slug = instance.__dict__.get('slug')
+        instance._loaded_custom_domain = instance.__dict__.get('custom_domain')
+        return instance
+    
+    SLUG_ATTEMPTS = 5
+    
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name if not provided"""
-        if not self.slug:
-            from django.utils.text import slugify
-            base_slug = slugify(self.name)
-            slug = base_slug
-            counter = 1
-            
-            # Ensure unique slug
-            while Property.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            
-            self.slug = slug
+        """
+        Auto-generate slug from name if not provided.
         
-        super().save(*args, **kwargs)
+        Os slugs ocupados vêm de uma única query (ver `properties/slugs.py`). Se
+        outra transação gravar o mesmo slug antes, o índice único rejeita o
+        INSERT e um novo slug é escolhido.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        
+        max_length = self._meta.get_field('slug').max_length
+        base = base_slug(self.name, max_length)
+        for attempt in range(self.SLUG_ATTEMPTS):
+            taken = taken_slugs(Property, [base], exclude_pk=self.pk)[base]
+            self.slug = next_free_slug(base, taken)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                slug_taken = Property.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                self.slug = ''
+                if not slug_taken or attempt == self.SLUG_ATTEMPTS - 1:
+                    raise
     
     def soft_delete(self):
         """Soft delete the property and all its accommodations."""
         self.is_active = False
         self.deleted_at = timezone.now()
+        # Libera o domínio personalizado (único) para outra propriedade
+        self.custom_domain = ''
         self.save()
         # Soft delete all accommodations
         self.accommodations.update(is_active=False, deleted_at=timezone.now())
@@ -155,6 +213,14 @@ class Accommodation(models.Model):
         verbose_name = "Acomodação"
         verbose_name_plural = "Acomodações"
         ordering = ["-created_at"]
+        indexes = [
+            # Busca pública por hóspedes (ver availability.matching_accommodations)
+            models.Index(
+                fields=["property", "max_guests"],
+                condition=models.Q(is_active=True),
+                name="accommodation_guests_idx",
+            ),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.property.name})"
@@ -166,6 +232,203 @@ class Accommodation(models.Model):
         self.save()
 
 
+class AvailabilityBlock(models.Model):
+    """
+    Noites indisponíveis de uma acomodação (bloqueio do proprietário, manutenção,
+    reserva feita fora da plataforma).
+    
+    Um intervalo por linha, não uma linha por noite: `period` é o `daterange`
+    [entrada, saída) das noites bloqueadas. A exclusion constraint impede
+    bloqueios sobrepostos na mesma acomodação, e o índice GiST dela atende as
+    consultas de disponibilidade (ver properties/availability.py).
+    """
+    
+    class Reason(models.TextChoices):
+        BLOCKED = "BLOCKED", "Bloqueado"
+        MAINTENANCE = "MAINTENANCE", "Manutenção"
+        EXTERNAL = "EXTERNAL", "Reserva externa"
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    accommodation = models.ForeignKey(
+        Accommodation,
+        on_delete=models.CASCADE,
+        related_name="availability_blocks",
+        verbose_name="Acomodação"
+    )
+    period = DateRangeField(verbose_name="Noites")
+    reason = models.CharField(
+        max_length=20,
+        choices=Reason.choices,
+        default=Reason.BLOCKED,
+        verbose_name="Motivo"
+    )
+    note = models.CharField(max_length=200, blank=True, verbose_name="Observação")
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Bloqueio de Agenda"
+        verbose_name_plural = "Bloqueios de Agenda"
+        ordering = ["period"]
+        constraints = [
+            ExclusionConstraint(
+                name="availability_block_no_overlap",
+                expressions=[
+                    ("accommodation", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+            ),
+            models.CheckConstraint(
+                condition=models.Q(period__isempty=False, period__lower_inf=False, period__upper_inf=False),
+                name="availability_block_bounded_period",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.accommodation_id}: {self.period.lower} - {self.period.upper}"
+
+
+class Booking(models.Model):
+    """
+    Reserva de uma acomodação.
+    
+    O checkout cria uma pré-reserva (HOLD) que vale até `expires_at`; o
+    pagamento a confirma. A exclusion constraint (parcial: só HOLD e
+    CONFIRMED) impede duas reservas com noites em comum na mesma acomodação
+    sem lock na acomodação: inserções concorrentes que não se cruzam seguem em
+    paralelo e, das que se cruzam, só uma é gravada (ver properties/bookings.py).
+    
+    Uma pré-reserva vencida continua HOLD até ser marcada EXPIRED (por quem
+    tentar reservar as mesmas noites ou por `expire_booking_holds`), mas já
+    não ocupa noites nas consultas de disponibilidade.
+    """
+    
+    class Status(models.TextChoices):
+        HOLD = "HOLD", "Pré-reserva"
+        CONFIRMED = "CONFIRMED", "Confirmada"
+        CANCELLED = "CANCELLED", "Cancelada"
+        EXPIRED = "EXPIRED", "Expirada"
+    
+    # Status que ocupam noites (condição da constraint)
+    ACTIVE = [Status.HOLD, Status.CONFIRMED]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    accommodation = models.ForeignKey(
+        Accommodation,
+        on_delete=models.PROTECT,
+        related_name="bookings",
+        verbose_name="Acomodação"
+    )
+    period = DateRangeField(verbose_name="Noites")
+    guests = models.PositiveIntegerField(default=1, verbose_name="Hóspedes")
+    guest_name = models.CharField(max_length=200, verbose_name="Nome do hóspede")
+    guest_email = models.EmailField(verbose_name="Email do hóspede")
+    guest_phone = models.CharField(max_length=20, blank=True, verbose_name="Telefone do hóspede")
+    total = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Total")
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.HOLD,
+        verbose_name="Status"
+    )
+    expires_at = models.DateTimeField(null=True, blank=True, verbose_name="Pré-reserva válida até")
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Reserva"
+        verbose_name_plural = "Reservas"
+        ordering = ["-created_at"]
+        constraints = [
+            ExclusionConstraint(
+                name="booking_no_overlap",
+                expressions=[
+                    ("accommodation", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+                condition=models.Q(status__in=["HOLD", "CONFIRMED"]),
+            ),
+            models.CheckConstraint(
+                condition=models.Q(period__isempty=False, period__lower_inf=False, period__upper_inf=False),
+                name="booking_bounded_period",
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(status="HOLD") | models.Q(expires_at__isnull=False),
+                name="booking_hold_expires",
+            ),
+        ]
+        indexes = [
+            # Pré-reservas vencidas (expire_booking_holds)
+            models.Index(
+                fields=["expires_at"],
+                condition=models.Q(status="HOLD"),
+                name="booking_hold_expiry_idx",
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.guest_name}: {self.period.lower} - {self.period.upper}"
+
+
+class PriceRule(models.Model):
+    """
+    Ajuste do preço por noite: temporada, feriado, fim de semana...
+    
+    Vale para uma acomodação ou, sem `accommodation`, para todas as da
+    propriedade; nas noites dentro de `period` (sempre, se vazio) cujo dia da
+    semana está em `weekdays`. O preço de uma noite é o `base_price` vezes o
+    `multiplier` de cada regra que vale nela (ver properties/pricing.py).
+    """
+    
+    # Bits de `weekdays`, na ordem de date.weekday()
+    WEEKDAYS = ["Segunda", "Terça", "Quarta", "Quinta", "Sexta", "Sábado", "Domingo"]
+    ALL_WEEKDAYS = 0b1111111
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name="price_rules",
+        verbose_name="Propriedade"
+    )
+    accommodation = models.ForeignKey(
+        Accommodation,
+        on_delete=models.CASCADE,
+        related_name="price_rules",
+        null=True,
+        blank=True,
+        verbose_name="Acomodação"
+    )
+    name = models.CharField(max_length=100, verbose_name="Nome")
+    period = DateRangeField(null=True, blank=True, verbose_name="Noites")
+    weekdays = models.PositiveSmallIntegerField(
+        default=ALL_WEEKDAYS,
+        validators=[MinValueValidator(1), MaxValueValidator(ALL_WEEKDAYS)],
+        verbose_name="Dias da semana (bits, segunda = 1)"
+    )
+    multiplier = models.DecimalField(
+        max_digits=5,
+        decimal_places=3,
+        validators=[MinValueValidator(0)],
+        verbose_name="Multiplicador"
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Regra de Preço"
+        verbose_name_plural = "Regras de Preço"
+        ordering = ["created_at"]
+    
+    def __str__(self):
+        return f"{self.name} (x{self.multiplier})"
+
 class Image(models.Model):
     """Model for property and accommodation images."""
     
@@ -193,6 +456,29 @@ class Image(models.Model):
     image = models.ImageField(upload_to='properties/%Y/%m/', verbose_name="Imagem")
     caption = models.CharField(max_length=200, blank=True, verbose_name="Legenda")
     order = models.PositiveIntegerField(default=0, verbose_name="Ordem")
+    # Tamanhos gerados a partir do arquivo (ver properties/renditions.py)
+    renditions = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Versões")
+    
+    # Metadados do arquivo: dimensões e tamanho no upload, cor e placeholder
+    # junto com as versões
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Largura")
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False, verbose_name="Altura")
+    file_size = models.PositiveBigIntegerField(null=True, blank=True, editable=False, verbose_name="Tamanho (bytes)")
+    dominant_color = models.CharField(max_length=7, blank=True, editable=False, verbose_name="Cor dominante")
+    placeholder = models.TextField(blank=True, editable=False, verbose_name="Placeholder (LQIP)")
+    
+    # Conteúdo (ver properties/content.py): SHA-256 dos bytes e hash perceptual
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, editable=False, verbose_name="SHA-256")
+    dhash = models.BigIntegerField(null=True, blank=True, editable=False, verbose_name="Hash perceptual (dHash)")
+    similar_to = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name="Parecida com"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
@@ -203,6 +489,43 @@ class Image(models.Model):
         verbose_name_plural = "Imagens"
         ordering = ['order', '-created_at']
     
+    # Copiados de outra Image com o mesmo arquivo, em vez de processar de novo
+    DERIVED_FIELDS = ['renditions', 'dominant_color', 'placeholder', 'dhash']
+    
+    def save(self, *args, **kwargs):
+        """
+        Arquivo recém-enviado: lê dimensões e tamanho do upload, sem decodificar,
+        e grava no caminho do SHA-256. Se o arquivo já existia, reaproveita as
+        versões e metadados de quem já o processou.
+        """
+        if self.image and not self.image._committed:
+            self.store_upload()
+            self.copy_derived(Image.processed_files([self]).get(self.image.name))
+        super().save(*args, **kwargs)
+    
+    def store_upload(self):
+        """Lê dimensões e tamanho do upload pendente e o grava no caminho do SHA-256."""
+        self.file_size = self.image.size
+        self.width, self.height = read_dimensions(self.image)
+        self.sha256 = store_content_addressed(self.image)
+        self.similar_to = None
+    
+    def copy_derived(self, processed=None):
+        """Copia `DERIVED_FIELDS` de `processed` ou limpa para a task gerar de novo."""
+        if processed is None:
+            processed = {'renditions': {}, 'dominant_color': '', 'placeholder': '', 'dhash': None}
+        for field in self.DERIVED_FIELDS:
+            setattr(self, field, processed[field])
+    
+    @classmethod
+    def processed_files(cls, images):
+        """`{arquivo: DERIVED_FIELDS}` dos arquivos de `images` que já têm versões geradas."""
+        rows = cls.objects.filter(
+            sha256__in={image.sha256 for image in images},
+            image__in={image.image.name for image in images},
+        ).exclude(placeholder='').values('image', *cls.DERIVED_FIELDS)
+        return {row['image']: row for row in rows}
+    
     def __str__(self):
         if self.property:
             return f"Imagem de {self.property.name}"
@@ -211,6 +534,73 @@ class Image(models.Model):
         return f"Imagem {self.id}"
 
 
+class PropertyListing(models.Model):
+    """
+    Read model da listagem pública: uma linha achatada por propriedade ativa.
+    
+    Mantido por `properties.listings.refresh_listings` (via signals) e
+    reconstruído com `manage.py rebuild_property_listings`. Não editar diretamente.
+    """
+    
+    property = models.OneToOneField(
+        Property,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="listing",
+        verbose_name="Propriedade"
+    )
+    
+    # Cópia dos campos exibidos no card
+    name = models.CharField(max_length=200, verbose_name="Nome")
+    slug = models.SlugField(max_length=100, verbose_name="Slug (URL)")
+    description = models.TextField(blank=True, verbose_name="Descrição")
+    city = models.CharField(max_length=100, verbose_name="Cidade")
+    state = models.CharField(max_length=100, verbose_name="Estado")
+    country = models.CharField(max_length=100, verbose_name="País")
+    latitude = models.FloatField(null=True, blank=True, verbose_name="Latitude")
+    longitude = models.FloatField(null=True, blank=True, verbose_name="Longitude")
+    logo = models.ImageField(blank=True, null=True, verbose_name="Logo")
+    primary_color = models.CharField(max_length=7, blank=True, verbose_name="Cor Primária")
+    
+    # Agregados
+    cover_image = models.ImageField(blank=True, null=True, verbose_name="Imagem de capa")
+    cover_renditions = models.JSONField(default=dict, blank=True, verbose_name="Versões da capa")
+    accommodations_count = models.PositiveIntegerField(default=0, verbose_name="Acomodações ativas")
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Menor preço")
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Maior preço")
+    
+    # Busca
+    search_vector = SearchVectorField(null=True, editable=False)
+    
+    # Timestamps
+    created_at = models.DateTimeField(verbose_name="Criado em")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    class Meta:
+        verbose_name = "Listagem Pública"
+        verbose_name_plural = "Listagens Públicas"
+        ordering = ["-created_at"]
+        indexes = [
+            # Busca com tolerância a erros de digitação (ver properties/search.py)
+            GinIndex(
+                OpClass(SearchDocument('name', 'city'), name='gin_trgm_ops'),
+                name='listing_search_trgm_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='listing_search_vector_idx'),
+            # Paginação keyset (ver properties/pagination.py)
+            models.Index(fields=['-created_at', '-property'], name='listing_keyset_idx'),
+            # Busca por raio/retângulo do mapa (ver properties/geo.py)
+            GistIndex(GeoPoint('longitude', 'latitude'), name='listing_geo_idx'),
+            # Autocomplete por prefixo do nome (ver properties/autocomplete.py)
+            models.Index(name_prefix_expression(), name='listing_name_prefix_idx'),
+            # Geração incremental dos arquivos de SEO (ver properties/seo.py)
+            models.Index(fields=['updated_at'], name='listing_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} - {self.city}/{self.state}"
+
+
 class PropertyAccess(models.Model):
     """
     Controla o acesso de usuários a propriedades com papéis específicos.
@@ -253,3 +643,81 @@ class PropertyAccess(models.Model):
     
     def __str__(self):
         return f"{self.user.email} - {self.property.name} ({self.get_role_display()})"
+
+
+class ImageUpload(models.Model):
+    """
+    Sessão de upload em partes (retomável) de uma imagem.
+    
+    Os bytes vão para um arquivo temporário em `settings.CHUNKED_UPLOAD_DIR`;
+    ao finalizar, o arquivo vira uma `Image` e a sessão é marcada como
+    concluída. Sessões abandonadas são removidas por
+    `manage.py cleanup_image_uploads` (ver properties/uploads.py).
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Em andamento'
+        COMPLETE = 'COMPLETE', 'Concluído'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name='Usuário'
+    )
+    
+    # Destino da imagem (um dos dois), como em Image
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        null=True,
+        blank=True,
+        verbose_name='Propriedade'
+    )
+    accommodation = models.ForeignKey(
+        Accommodation,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        null=True,
+        blank=True,
+        verbose_name='Acomodação'
+    )
+    caption = models.CharField(max_length=200, blank=True, verbose_name='Legenda')
+    order = models.PositiveIntegerField(default=0, verbose_name='Ordem')
+    
+    # Arquivo
+    filename = models.CharField(max_length=255, verbose_name='Nome do arquivo')
+    size = models.PositiveBigIntegerField(verbose_name='Tamanho (bytes)')
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256 esperado')
+    received = models.PositiveBigIntegerField(default=0, verbose_name='Bytes recebidos')
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Status'
+    )
+    image = models.ForeignKey(
+        Image,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Imagem criada'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Upload de Imagem'
+        verbose_name_plural = 'Uploads de Imagens'
+        indexes = [
+            # Coleta das sessões abandonadas
+            models.Index(fields=['updated_at'], name='image_upload_gc_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
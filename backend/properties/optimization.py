@@ -0,0 +1,153 @@
+"""
+Planejamento automático de consultas a partir dos serializers.
+
+`QueryOptimizationMixin` inspeciona os campos do serializer da view (inclusive
+serializers aninhados e caminhos `source='a.b'`) e aplica `select_related`,
+`prefetch_related` e as anotações declaradas em `Meta.annotations`, de modo que
+uma listagem execute um número constante de queries, qualquer que seja o
+tamanho da página.
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+def related_count(model, relation, **filters):
+    """
+    Contagem de uma relação reversa como subquery correlacionada.
+
+    Ao contrário de `Count('relacao')`, não faz JOIN: várias contagens na mesma
+    query não multiplicam as linhas umas das outras.
+    """
+    remote_field = model._meta.get_field(relation).field
+    counts = remote_field.model.objects.filter(
+        **{remote_field.name: OuterRef('pk')}, **filters
+    ).order_by().values(remote_field.name).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+@dataclass
+class QueryPlan:
+    select_related: set = field(default_factory=set)
+    prefetch_related: dict = field(default_factory=dict)  # lookup -> QueryPlan | None
+    annotations: dict = field(default_factory=dict)
+
+    def is_empty(self):
+        return not (self.select_related or self.prefetch_related or self.annotations)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        for lookup, nested in sorted(self.prefetch_related.items()):
+            if nested is None or nested.is_empty():
+                queryset = queryset.prefetch_related(lookup)
+            else:
+                related_model = _resolve_model(queryset.model, lookup)
+                queryset = queryset.prefetch_related(
+                    Prefetch(lookup, queryset=nested.apply(related_model._default_manager.all()))
+                )
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset
+
+
+def _resolve_model(model, lookup):
+    for name in lookup.split('__'):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def _unwrap(serializer_field):
+    """Retorna (serializer aninhado ou None, é-muitos)."""
+    if isinstance(serializer_field, serializers.ListSerializer):
+        return serializer_field.child, True
+    if isinstance(serializer_field, ManyRelatedField):
+        return None, True
+    if isinstance(serializer_field, serializers.BaseSerializer):
+        return serializer_field, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def get_query_plan(serializer_class):
+    """Plano de consulta (cacheado por classe) para o model do serializer."""
+    return _build_plan(serializer_class(), serializer_class.Meta.model)
+
+
+def _build_plan(serializer, model):
+    plan = QueryPlan()
+    declared = getattr(getattr(serializer, 'Meta', None), 'annotations', {})
+
+    for name, serializer_field in serializer.fields.items():
+        if serializer_field.write_only:
+            continue
+        if name in declared:
+            plan.annotations[name] = declared[name]
+            continue
+        if serializer_field.source == '*':
+            continue
+
+        nested, many = _unwrap(serializer_field)
+        path = []
+        current = model
+        prefetch_from = None
+        for attr in serializer_field.source.split('.'):
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                break  # propriedade ou método Python
+            if not model_field.is_relation:
+                break
+            path.append(attr)
+            if prefetch_from is None and (model_field.one_to_many or model_field.many_to_many):
+                prefetch_from = len(path)
+            current = model_field.related_model
+        else:
+            if not path:
+                continue
+            lookup = '__'.join(path)
+            # FK exibida só pela chave (PrimaryKeyRelatedField): `<fk>_id` já basta
+            if (isinstance(serializer_field, RelatedField) and len(path) == 1
+                    and prefetch_from is None
+                    and serializer_field.use_pk_only_optimization()):
+                continue
+            nested_plan = _build_plan(nested, current) if nested is not None else None
+            if prefetch_from is not None or many:
+                plan.prefetch_related[lookup] = nested_plan
+            else:
+                plan.select_related.add(lookup)
+                if nested_plan is not None:
+                    # Relações do aninhado seguem pelo mesmo JOIN/prefetch
+                    plan.select_related.update(f'{lookup}__{sub}' for sub in nested_plan.select_related)
+                    for sub, sub_plan in nested_plan.prefetch_related.items():
+                        plan.prefetch_related[f'{lookup}__{sub}'] = sub_plan
+            continue
+
+        # O caminho termina em atributo Python: relações percorridas até ali
+        # ainda precisam ser carregadas
+        if path:
+            lookup = '__'.join(path)
+            if prefetch_from is not None:
+                plan.prefetch_related.setdefault(lookup, None)
+            else:
+                plan.select_related.add(lookup)
+
+    return plan
+
+
+class QueryOptimizationMixin:
+    """
+    Mixin para views genéricas/viewsets: aplica o plano derivado de
+    `get_serializer_class()` em `filter_queryset()`, o gancho por onde passam
+    `list()` e `get_object()`. Assim as views continuam sobrescrevendo
+    `get_queryset()` só com os filtros de acesso.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return get_query_plan(self.get_serializer_class()).apply(queryset)
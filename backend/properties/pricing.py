@@ -0,0 +1,211 @@
+"""
+Cotação de estadias.
+
+Total = soma dos preços das noites + taxa de limpeza. O preço de uma noite é o
+`base_price` da acomodação vezes o multiplicador de cada `PriceRule` que vale
+nela (temporada, dia da semana).
+
+Para cotar muitas combinações (acomodações x datas x hóspedes) de uma vez:
+
+1. as regras são lidas numa consulta e compiladas por propriedade
+   (`compile_rules`), com período e dias da semana já em forma de comparação;
+2. as estadias pedidas para cada acomodação são agrupadas em janelas (estadias
+   a menos de `WINDOW_GAP_DAYS` uma da outra ficam na mesma), e cada janela
+   ganha uma tabela de preços por noite, em centavos, guardada como soma
+   acumulada (`PriceTable`). Estadias distantes não geram uma tabela com
+   todas as noites entre elas. Centavos são inteiros: as somas são exatas,
+   sem float, e o arredondamento (meio para cima) acontece uma vez por noite;
+3. cada cotação é `acumulado[saída] - acumulado[entrada]`, O(1) qualquer que
+   seja o número de noites. Sem regras, nem a tabela é montada.
+
+São duas consultas no total (acomodações e regras), para qualquer quantidade
+de combinações.
+"""
+import uuid
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import NamedTuple
+
+from .models import Accommodation, PriceRule
+
+CENT = Decimal('0.01')
+
+# Estadias separadas por até tantos dias dividem a mesma tabela de preços
+WINDOW_GAP_DAYS = 31
+
+
+def to_cents(value):
+    return int((value / CENT).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return (Decimal(cents) * CENT).quantize(CENT)
+
+
+class CompiledRule(NamedTuple):
+    accommodation_id: object
+    lower: date
+    upper: date
+    weekdays: int
+    multiplier: Decimal
+
+    def applies_to(self, accommodation_id):
+        return self.accommodation_id is None or self.accommodation_id == accommodation_id
+
+
+def compile_rules(rules):
+    """`{property_id: [CompiledRule, ...]}`; período vazio vira (date.min, date.max)."""
+    compiled = defaultdict(list)
+    for rule in rules:
+        lower = rule.period.lower if rule.period and rule.period.lower else date.min
+        upper = rule.period.upper if rule.period and rule.period.upper else date.max
+        compiled[rule.property_id].append(
+            CompiledRule(rule.accommodation_id, lower, upper, rule.weekdays, rule.multiplier)
+        )
+    return compiled
+
+
+class PriceTable:
+    """Preços das noites de `start` até a véspera de `end`, como soma acumulada em centavos."""
+
+    def __init__(self, accommodation, rules, start, end):
+        self.start = start
+        self.base_cents = to_cents(accommodation.base_price)
+        rules = [rule for rule in rules if rule.applies_to(accommodation.pk)]
+        self.prefix = None
+        if not rules:
+            return
+
+        days = (end - start).days
+        multipliers = [Decimal(1)] * days
+        for rule in rules:
+            first = max((rule.lower - start).days, 0)
+            last = min((rule.upper - start).days, days)
+            for offset in range(first, last):
+                if rule.weekdays >> (start + timedelta(days=offset)).weekday() & 1:
+                    multipliers[offset] *= rule.multiplier
+
+        prefix = [0]
+        for multiplier in multipliers:
+            prefix.append(prefix[-1] + to_cents(accommodation.base_price * multiplier))
+        self.prefix = prefix
+
+    def total_cents(self, check_in, check_out):
+        first, last = (check_in - self.start).days, (check_out - self.start).days
+        if self.prefix is None:
+            return self.base_cents * (last - first)
+        return self.prefix[last] - self.prefix[first]
+
+
+def windows(stays, gap=WINDOW_GAP_DAYS):
+    """Une os intervalos (entrada, saída) de `stays` que se cruzam ou distam até `gap` dias."""
+    merged = []
+    for check_in, check_out in sorted(stays):
+        if merged and (check_in - merged[-1][1]).days <= gap:
+            merged[-1][1] = max(merged[-1][1], check_out)
+        else:
+            merged.append([check_in, check_out])
+    return [tuple(window) for window in merged]
+
+
+@dataclass(frozen=True)
+class Quote:
+    accommodation_id: object
+    check_in: date
+    check_out: date
+    guests: int
+    nights: int
+    nightly_total: Decimal
+    cleaning_fee: Decimal
+    total: Decimal
+    fits: bool
+
+
+class QuoteEngine:
+    """Cotações de um conjunto de acomodações já carregadas (com `property_id`)."""
+
+    def __init__(self, accommodations):
+        self.accommodations = {accommodation.pk: accommodation for accommodation in accommodations}
+        property_ids = {accommodation.property_id for accommodation in self.accommodations.values()}
+        self.rules = compile_rules(PriceRule.objects.filter(property_id__in=property_ids)) if property_ids else {}
+
+    def quote(self, requests):
+        """
+        `requests`: (accommodation_id, check_in, check_out, guests). Retorna um
+        `Quote` por pedido, na mesma ordem (None se a acomodação não existe).
+        """
+        requests = list(requests)
+        stays = defaultdict(set)
+        for accommodation_id, check_in, check_out, _ in requests:
+            if accommodation_id in self.accommodations:
+                stays[accommodation_id].add((check_in, check_out))
+        # {accommodation_id: (entradas das janelas, tabelas)}, para busca binária
+        tables = {}
+        for accommodation_id, accommodation_stays in stays.items():
+            accommodation = self.accommodations[accommodation_id]
+            rules = self.rules.get(accommodation.property_id, ())
+            accommodation_windows = windows(accommodation_stays)
+            tables[accommodation_id] = (
+                [start for start, _ in accommodation_windows],
+                [PriceTable(accommodation, rules, start, end) for start, end in accommodation_windows],
+            )
+
+        quotes = []
+        for accommodation_id, check_in, check_out, guests in requests:
+            if accommodation_id not in tables:
+                quotes.append(None)
+                continue
+            starts, accommodation_tables = tables[accommodation_id]
+            table = accommodation_tables[bisect_right(starts, check_in) - 1]
+            accommodation = self.accommodations[accommodation_id]
+            nightly = table.total_cents(check_in, check_out)
+            cleaning = to_cents(accommodation.cleaning_fee)
+            quotes.append(Quote(
+                accommodation_id=accommodation_id,
+                check_in=check_in,
+                check_out=check_out,
+                guests=guests,
+                nights=(check_out - check_in).days,
+                nightly_total=from_cents(nightly),
+                cleaning_fee=from_cents(cleaning),
+                total=from_cents(nightly + cleaning),
+                fits=guests <= accommodation.max_guests,
+            ))
+        return quotes
+
+
+QUOTE_FIELDS = ['pk', 'property', 'base_price', 'cleaning_fee', 'max_guests']
+
+
+def quote_many(requests):
+    """Cota `requests` (ver `QuoteEngine.quote`) com duas consultas."""
+    requests = list(requests)
+    accommodations = Accommodation.objects.filter(
+        pk__in={request[0] for request in requests}, is_active=True, property__is_active=True
+    ).only(*QUOTE_FIELDS)
+    return QuoteEngine(accommodations).quote(requests)
+
+
+def quote_listings(listings, check_in, check_out, guests=1):
+    """
+    `{id da acomodação (str): total}` das acomodações que a busca pública já
+    trouxe em `matching_accommodations`, sem consultá-las de novo (só as regras).
+    """
+    accommodations = [
+        Accommodation(
+            pk=uuid.UUID(item['id']),
+            property_id=listing.pk,
+            base_price=Decimal(str(item['base_price'])),
+            cleaning_fee=Decimal(str(item['cleaning_fee'])),
+            max_guests=item['max_guests'],
+        )
+        for listing in listings
+        for item in getattr(listing, 'matching_accommodations', None) or ()
+    ]
+    quotes = QuoteEngine(accommodations).quote(
+        (accommodation.pk, check_in, check_out, guests) for accommodation in accommodations
+    )
+    return {str(quote.accommodation_id): quote.total for quote in quotes}
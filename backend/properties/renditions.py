@@ -0,0 +1,177 @@
+"""
+Versões redimensionadas (renditions) das imagens enviadas.
+
+Cada imagem gera os tamanhos de `RENDITION_SIZES` em WebP e JPEG, gravados ao
+lado do original em `renditions/<caminho do original sem extensão>/`. O mapa
+resultante fica num JSONField do model (`Image.renditions`,
+`Property.logo_renditions`) com a chave `source`: o arquivo de origem. Se o
+arquivo for trocado, o mapa antigo deixa de valer até a nova geração.
+
+Na mesma leitura são calculados os dados que dispensam abrir o arquivo depois:
+dimensões, tamanho em bytes, cor dominante e um placeholder minúsculo (LQIP,
+data URI WebP) para exibir enquanto a imagem carrega.
+
+`process_image` só lê e grava arquivos (não toca no banco), então pode rodar
+em outro processo: é usada pelas tasks do Celery (`properties/tasks.py`) e pelo
+pool de processos de `manage.py generate_renditions`.
+"""
+import base64
+import io
+import posixpath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PILImage, ImageOps
+
+from .content import content_hash, dhash
+
+# Maior lado (px) de cada tamanho
+RENDITION_SIZES = {
+    'thumb': 320,
+    'card': 800,
+    'hero': 1920,
+}
+LOGO_SIZES = ('thumb', 'card')
+
+FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+
+# Placeholder: lado maior em px e qualidade do WebP embutido
+PLACEHOLDER_SIZE = 16
+PLACEHOLDER_QUALITY = 40
+
+# Orientações EXIF que giram a imagem em 90°
+ROTATED_ORIENTATIONS = {5, 6, 7, 8}
+EXIF_ORIENTATION = 0x0112
+
+
+def _oriented_size(image):
+    width, height = image.size
+    if image.getexif().get(EXIF_ORIENTATION) in ROTATED_ORIENTATIONS:
+        return height, width
+    return width, height
+
+
+def read_dimensions(file):
+    """(largura, altura) como exibida, lendo só o cabeçalho; (None, None) se não for imagem."""
+    position = file.tell()
+    try:
+        return _oriented_size(PILImage.open(file))
+    except OSError:
+        return None, None
+    finally:
+        file.seek(position)
+
+
+def rendition_name(source, size, extension):
+    stem = posixpath.splitext(source)[0]
+    return f'renditions/{stem}/{size}.{extension}'
+
+
+def _open(source, storage, longest_side):
+    """Imagem decodificada (já orientada) e as dimensões do original."""
+    with storage.open(source, 'rb') as file:
+        image = PILImage.open(file)
+        size = _oriented_size(image)
+        # JPEG: o decoder já reduz a imagem (1/2, 1/4, 1/8) na leitura, então
+        # uma foto de 24 MP não é descompactada inteira para gerar 1920px
+        image.draft(None, (longest_side, longest_side))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image, size
+
+
+def dominant_color(image):
+    """Cor mais frequente (#rrggbb) numa redução de 64px com 8 cores."""
+    sample = _flatten(image)
+    sample.thumbnail((64, 64))
+    palette = sample.quantize(colors=8)
+    _, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def placeholder(image):
+    """Data URI WebP de até 16px, para desfocar no cliente enquanto carrega."""
+    tiny = _flatten(image)
+    tiny.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+    buffer = io.BytesIO()
+    tiny.save(buffer, format='WEBP', quality=PLACEHOLDER_QUALITY)
+    return 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def _flatten(image):
+    """RGB para JPEG; transparência vira fundo branco."""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = PILImage.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _save(storage, name, image, options):
+    buffer = io.BytesIO()
+    image.save(buffer, **options)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def _storage_hash(storage, source):
+    with storage.open(source, 'rb') as file:
+        return content_hash(file)
+
+
+def process_image(source, sizes=tuple(RENDITION_SIZES), storage=None):
+    """
+    Gera os tamanhos `sizes` de `source` (nome no storage) e descreve a imagem.
+
+    Retorna `renditions` (o mapa), `width`, `height`, `file_size`,
+    `dominant_color`, `placeholder`, `sha256` e `dhash`. Tamanhos maiores que o original não são
+    ampliados.
+    """
+    storage = storage or default_storage
+    largest = max(RENDITION_SIZES[size] for size in sizes)
+    original, (width, height) = _open(source, storage, largest)
+    has_alpha = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+    # WebP mantém a transparência; o JPEG é achatado em cada tamanho
+    base = original.convert('RGBA') if has_alpha else original.convert('RGB')
+
+    renditions = {'source': source}
+    for size in sizes:
+        longest_side = RENDITION_SIZES[size]
+        resized = base.copy()
+        resized.thumbnail((longest_side, longest_side), PILImage.LANCZOS)
+        renditions[size] = {
+            'width': resized.width,
+            'height': resized.height,
+            'webp': _save(storage, rendition_name(source, size, 'webp'), resized, FORMATS['webp']),
+            'jpeg': _save(storage, rendition_name(source, size, 'jpeg'), _flatten(resized), FORMATS['jpeg']),
+        }
+    return {
+        'renditions': renditions,
+        'width': width,
+        'height': height,
+        'file_size': storage.size(source),
+        'dominant_color': dominant_color(base),
+        'placeholder': placeholder(base),
+        'sha256': _storage_hash(storage, source),
+        'dhash': dhash(base),
+    }
+
+
+def delete_renditions(renditions, storage=None):
+    storage = storage or default_storage
+    for size in RENDITION_SIZES:
+        for extension in FORMATS:
+            name = (renditions or {}).get(size, {}).get(extension)
+            if name:
+                storage.delete(name)
+
+
+def is_current(field_file, renditions):
+    return bool(field_file) and (renditions or {}).get('source') == field_file.name
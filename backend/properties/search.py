@@ -0,0 +1,109 @@
+"""
+Busca pública de propriedades.
+
+Expressões compartilhadas entre os índices declarados em `models.py` e as
+queries das views. O índice só é usado pelo PostgreSQL quando a expressão da
+query é idêntica à expressão indexada, por isso as duas vêm daqui.
+"""
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db import models
+from django.db.models import F, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Collate
+
+# Configuração de busca textual criada na migration 0011 (portuguese + unaccent)
+SEARCH_CONFIG = 'portuguese_unaccent'
+
+
+class SearchDocument(Func):
+    """
+    Texto normalizado (minúsculas, sem acento) com os campos separados por espaço.
+
+    Usa `immutable_unaccent(text)`, criada na migration 0010: o `unaccent()` do
+    PostgreSQL é STABLE e não pode ser usado em índices.
+    """
+    template = "immutable_unaccent(lower(%(expressions)s))"
+    arg_joiner = " || ' ' || "
+    output_field = models.TextField()
+
+
+def normalize_term(term):
+    """Normaliza o termo buscado do mesmo jeito que o documento indexado."""
+    return SearchDocument(Value(term))
+
+
+def name_prefix_expression():
+    """
+    Nome normalizado com collation "C", indexado em `listing_name_prefix_idx`.
+
+    Com collation "C" o mesmo B-tree atende `LIKE 'prefixo%'` e o `ORDER BY`,
+    então o autocomplete lê só as primeiras entradas do intervalo.
+    """
+    return Collate(SearchDocument('name'), 'C')
+
+
+def trigram_search(queryset, term):
+    """
+    Filtra e ordena por similaridade de trigramas sobre nome e cidade.
+
+    Usa o operador `%>` (word_similarity) e `LIKE`, ambos atendidos pelo índice
+    GIN `listing_search_trgm_idx` (da tabela de PropertyListing). O limiar vem de
+    `pg_trgm.word_similarity_threshold`, configurado na conexão
+    (`PROPERTY_SEARCH_SIMILARITY` em settings).
+    """
+    query = normalize_term(term)
+    return queryset.annotate(
+        search_document=SearchDocument('name', 'city'),
+    ).filter(
+        models.Q(search_document__contains=query) |
+        models.Q(search_document__trigram_word_similar=query)
+    ).annotate(
+        search_rank=TrigramWordSimilarity(query, 'search_document'),
+    ).order_by('-search_rank', '-created_at')
+
+
+def property_search_vector(accommodation_model):
+    """
+    Expressão do `search_vector` ponderado de uma propriedade.
+
+    Pesos: nome (A) > cidade (B) > descrição (C) > nomes das acomodações ativas (D).
+    Recebe o model de acomodação para funcionar também com models históricos
+    dentro de migrations.
+    """
+    accommodation_names = accommodation_model.objects.filter(
+        property=OuterRef('pk'), is_active=True
+    ).order_by().values('property').annotate(
+        names=StringAgg('name', delimiter=' ')
+    ).values('names')
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('city', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='C', config=SEARCH_CONFIG) +
+        SearchVector(
+            Subquery(accommodation_names, output_field=models.TextField()),
+            weight='D',
+            config=SEARCH_CONFIG,
+        )
+    )
+
+
+def refresh_search_vector(queryset, accommodation_model):
+    """Recalcula o `search_vector` das propriedades do queryset em um único UPDATE."""
+    return queryset.update(search_vector=property_search_vector(accommodation_model))
+
+
+def fulltext_search(queryset, term):
+    """
+    Busca textual ranqueada sobre o `search_vector` armazenado (índice GIN).
+
+    Aceita a sintaxe de buscadores (`"frase exata"`, `-termo`, `or`).
+    """
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query),
+    ).order_by('-search_rank', '-created_at')
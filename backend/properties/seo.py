@@ -0,0 +1,192 @@
+"""
+Arquivos estáticos de SEO: sitemap fatiado e snapshots JSON por propriedade.
+
+Gerados a partir do read model `PropertyListing` pelo comando
+`generate_seo_files`, para que crawlers sejam atendidos pelo servidor web sem
+passar pelo Django:
+
+    SEO_ROOT/sitemap.xml                 índice dos sitemaps
+    SEO_ROOT/sitemaps/sitemap-<n>.xml    até 50.000 URLs cada
+    SEO_ROOT/properties/<slug>.json      título, descrição, capa e updated_at
+
+A geração é incremental: só as propriedades com `updated_at` posterior à última
+execução têm o snapshot renderizado de novo, e arquivos cujo conteúdo não mudou
+não são regravados (o mtime fica estável para o cache HTTP).
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import PropertyListing
+
+SITEMAP_MAX_URLS = 50000
+DESCRIPTION_LENGTH = 160
+STATE_FILE = 'state.json'
+
+# Margem para transações que gravaram `updated_at` antes da última execução,
+# mas só fizeram commit depois dela
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def site_url(path):
+    return f"{settings.PUBLIC_SITE_URL.rstrip('/')}/{path}"
+
+
+def property_url(slug):
+    return site_url(f'public/{slug}')
+
+
+def media_url(name):
+    return f"{settings.PUBLIC_MEDIA_URL.rstrip('/')}/{name}" if name else None
+
+
+def write_if_changed(path, content):
+    """Grava `content` de forma atômica; retorna False se o arquivo já era igual."""
+    data = content.encode('utf-8')
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def snapshot(listing):
+    description = ' '.join(listing['description'].split())
+    if len(description) > DESCRIPTION_LENGTH:
+        description = description[:DESCRIPTION_LENGTH - 1].rstrip() + '…'
+    return {
+        'slug': listing['slug'],
+        'url': property_url(listing['slug']),
+        'title': f"{listing['name']} - {listing['city']}/{listing['state']}",
+        'description': description,
+        'image': media_url(listing['cover_image']),
+        'updated_at': listing['updated_at'].isoformat(),
+    }
+
+
+class SeoGenerator:
+    """Gera (ou atualiza) os arquivos de SEO em `root`."""
+
+    def __init__(self, root=None, batch_size=2000):
+        self.root = Path(root or settings.SEO_ROOT)
+        self.batch_size = batch_size
+        self.snapshots_dir = self.root / 'properties'
+        self.sitemaps_dir = self.root / 'sitemaps'
+
+    def _load_state(self):
+        try:
+            return json.loads((self.root / STATE_FILE).read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def run(self, full=False):
+        started_at = timezone.now()
+        state = {} if full else self._load_state()
+        since = state.get('watermark')
+
+        stats = {'snapshots': 0, 'removed': 0, 'sitemaps': 0}
+        stats['snapshots'] = self.render_snapshots(
+            since and datetime.fromisoformat(since) - WATERMARK_OVERLAP
+        )
+        slugs, stats['sitemaps'] = self.render_sitemaps()
+        stats['removed'] = self.remove_stale_snapshots(slugs)
+
+        write_if_changed(
+            self.root / STATE_FILE, json.dumps({'watermark': started_at.isoformat()})
+        )
+        return stats
+
+    def render_snapshots(self, since=None):
+        """Snapshots das propriedades alteradas desde `since` (todas, se None)."""
+        listings = PropertyListing.objects.order_by()
+        if since is not None:
+            listings = listings.filter(updated_at__gt=since)
+        rows = listings.values(
+            'slug', 'name', 'description', 'city', 'state', 'cover_image', 'updated_at'
+        )
+
+        written = 0
+        for row in rows.iterator(chunk_size=self.batch_size):
+            content = json.dumps(snapshot(row), ensure_ascii=False, separators=(',', ':'))
+            written += write_if_changed(self.snapshots_dir / f"{row['slug']}.json", content)
+        return written
+
+    def render_sitemaps(self):
+        """
+        Reescreve os sitemaps cujo conteúdo mudou e o índice.
+
+        A ordem (`created_at`, id) mantém as fatias estáveis: uma propriedade
+        nova só altera a última. Retorna os slugs publicados e os arquivos gravados.
+        """
+        rows = PropertyListing.objects.order_by('created_at', 'property').values_list('slug', 'updated_at')
+
+        slugs = set()
+        names = []
+        written = 0
+        urls = []
+        for slug, updated_at in rows.iterator(chunk_size=self.batch_size):
+            slugs.add(slug)
+            urls.append(
+                f'<url><loc>{escape(property_url(slug))}</loc>'
+                f'<lastmod>{updated_at.date().isoformat()}</lastmod></url>'
+            )
+            if len(urls) == SITEMAP_MAX_URLS:
+                written += self._write_sitemap(names, urls)
+                urls = []
+        if urls or not names:
+            written += self._write_sitemap(names, urls)
+
+        # Fatias que sobraram de uma execução com mais propriedades
+        for path in self.sitemaps_dir.glob('sitemap-*.xml'):
+            if path.name not in names:
+                path.unlink()
+
+        entries = ''.join(
+            f"<sitemap><loc>{escape(site_url(f'sitemaps/{name}'))}</loc></sitemap>\n" for name in names
+        )
+        index = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<sitemapindex xmlns="{SITEMAP_NS}">\n{entries}</sitemapindex>\n'
+        )
+        written += write_if_changed(self.root / 'sitemap.xml', index)
+        return slugs, written
+
+    def _write_sitemap(self, names, urls):
+        names.append(f'sitemap-{len(names) + 1}.xml')
+        entries = ''.join(f'{url}\n' for url in urls)
+        content = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<urlset xmlns="{SITEMAP_NS}">\n{entries}</urlset>\n'
+        )
+        return write_if_changed(self.sitemaps_dir / names[-1], content)
+
+    def remove_stale_snapshots(self, slugs):
+        """Remove snapshots de propriedades inativas, removidas ou com slug trocado."""
+        if not self.snapshots_dir.exists():
+            return 0
+        removed = 0
+        with os.scandir(self.snapshots_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.name[:-len('.json')] not in slugs:
+                    os.unlink(entry.path)
+                    removed += 1
+        return removed
@@ -1,10 +1,64 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Property, Accommodation, Image
+from .availability import MAX_DAYS_AHEAD, MAX_NIGHTS, active_bookings, stay
+from .models import (
+    Property,
+    Accommodation,
+    AvailabilityBlock,
+    Booking,
+    Image,
+    ImageUpload,
+    PriceRule,
+    PropertyListing,
+)
 from accounts.serializers import UserSerializer
+from .optimization import related_count
+from .renditions import FORMATS, RENDITION_SIZES, is_current
+
+
+class RenditionsField(serializers.Field):
+    """
+    Mapa `{tamanho: {webp, jpeg, width, height}}` com URLs absolutas.
+
+    Vazio enquanto as renditions do arquivo atual não foram geradas: o cliente
+    usa a URL do original.
+    """
+
+    def __init__(self, image_field, renditions_field, **kwargs):
+        self.image_field = image_field
+        self.renditions_field = renditions_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        field_file = getattr(instance, self.image_field)
+        renditions = getattr(instance, self.renditions_field)
+        if not is_current(field_file, renditions):
+            return {}
+
+        request = self.context.get('request')
+        storage = field_file.storage
+        result = {}
+        for size in RENDITION_SIZES:
+            if size not in renditions:
+                continue
+            entry = renditions[size]
+            urls = {extension: storage.url(entry[extension]) for extension in FORMATS}
+            if request is not None:
+                urls = {extension: request.build_absolute_uri(url) for extension, url in urls.items()}
+            result[size] = {'width': entry['width'], 'height': entry['height'], **urls}
+        return result
 
 
 class ImageSerializer(serializers.ModelSerializer):
     """Serializer para imagens"""
+    renditions = RenditionsField('image', 'renditions')
     
     class Meta:
         model = Image
@@ -24,37 +78,118 @@ class ImageSerializer(serializers.ModelSerializer):
         return data
 
 
+class ImageFromHashSerializer(serializers.ModelSerializer):
+    """Serializer para criar imagem a partir de um arquivo já enviado (pelo SHA-256)"""
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', write_only=True)
+    
+    class Meta:
+        model = Image
+        fields = ['sha256', 'property', 'accommodation', 'caption', 'order']
+    
+    validate = ImageSerializer.validate
+
+
+class ImageReorderSerializer(serializers.Serializer):
+    """Nova ordem completa (`image_ids`) ou uma imagem movida para a posição `order`"""
+    image_ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    image = serializers.UUIDField(required=False)
+    order = serializers.IntegerField(min_value=0, required=False)
+    
+    def validate(self, data):
+        if 'image_ids' in data:
+            if len(set(data['image_ids'])) != len(data['image_ids']):
+                raise serializers.ValidationError("image_ids contém imagens repetidas")
+        elif 'image' not in data or 'order' not in data:
+            raise serializers.ValidationError("Informe image_ids ou image e order")
+        return data
+
+
+class ImageBulkUploadSerializer(serializers.Serializer):
+    """Serializer para enviar várias imagens de uma vez para o mesmo destino"""
+    MAX_FILES = 50
+    
+    property = serializers.PrimaryKeyRelatedField(queryset=Property.objects.all(), required=False)
+    accommodation = serializers.PrimaryKeyRelatedField(
+        queryset=Accommodation.objects.select_related('property'), required=False
+    )
+    images = serializers.ListField(child=serializers.ImageField(), allow_empty=False, max_length=MAX_FILES)
+    captions = serializers.ListField(
+        child=serializers.CharField(max_length=200, allow_blank=True), required=False, default=list
+    )
+    
+    def validate(self, data):
+        data = ImageSerializer.validate(self, data)
+        if len(data['captions']) > len(data['images']):
+            raise serializers.ValidationError("Há mais legendas do que imagens")
+        return data
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    """Serializer da sessão de upload em partes (ver properties/uploads.py)"""
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$', required=False, allow_blank=True)
+    
+    class Meta:
+        model = ImageUpload
+        fields = ['id', 'property', 'accommodation', 'caption', 'order', 'filename',
+                  'size', 'sha256', 'received', 'status', 'image', 'created_at']
+        read_only_fields = ['id', 'received', 'status', 'image', 'created_at']
+    
+    def validate_size(self, value):
+        if not 0 < value <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"O arquivo deve ter até {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes"
+            )
+        return value
+    
+    validate = ImageSerializer.validate
+
+
 class PropertyListSerializer(serializers.ModelSerializer):
     """Serializer para listagem de propriedades"""
-    accommodations_count = serializers.SerializerMethodField()
-    images_count = serializers.SerializerMethodField()
+    accommodations_count = serializers.IntegerField(read_only=True)
+    images_count = serializers.IntegerField(read_only=True)
+    logo_renditions = RenditionsField('logo', 'logo_renditions')
     
     class Meta:
         model = Property
         fields = ['id', 'name', 'slug', 'city', 'state', 'country', 'is_active', 
-                  'created_at', 'accommodations_count', 'images_count', 'logo']
+                  'created_at', 'accommodations_count', 'images_count', 'logo',
+                  'logo_renditions']
         read_only_fields = ['id', 'created_at']
-    
-    def get_accommodations_count(self, obj):
-        return obj.accommodations.filter(is_active=True).count()
-    
-    def get_images_count(self, obj):
-        return obj.images.count()
+        # Aplicadas pelo QueryOptimizationMixin (ver properties/optimization.py)
+        annotations = {
+            'accommodations_count': related_count(Property, 'accommodations', is_active=True),
+            'images_count': related_count(Property, 'images'),
+        }
 
 
 class PropertyDetailSerializer(serializers.ModelSerializer):
     """Serializer detalhado para propriedade"""
     owner = UserSerializer(read_only=True)
-    accommodations_count = serializers.SerializerMethodField()
+    accommodations_count = serializers.IntegerField(read_only=True)
     images = ImageSerializer(many=True, read_only=True)
+    logo_renditions = RenditionsField('logo', 'logo_renditions')
     
     class Meta:
         model = Property
-        fields = '__all__'
+        exclude = ['search_vector']
         read_only_fields = ['id', 'owner', 'created_at', 'updated_at', 'deleted_at']
+        annotations = {
+            'accommodations_count': related_count(Property, 'accommodations', is_active=True),
+        }
     
-    def get_accommodations_count(self, obj):
-        return obj.accommodations.filter(is_active=True).count()
+    def validate_custom_domain(self, value):
+        """Domínio já usado por outra propriedade (sem diferenciar maiúsculas)"""
+        if value:
+            # Mesma expressão da restrição única `property_custom_domain_unique`
+            taken = Property.objects.exclude(custom_domain='').annotate(
+                domain=Lower('custom_domain'),
+            ).filter(domain=value.lower())
+            if self.instance is not None:
+                taken = taken.exclude(pk=self.instance.pk)
+            if taken.exists():
+                raise serializers.ValidationError("Este domínio já está em uso por outra propriedade")
+        return value
 
 
 class PropertyCreateSerializer(serializers.ModelSerializer):
@@ -62,7 +197,9 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Property
-        exclude = ['owner', 'deleted_at', 'is_active']
+        exclude = ['owner', 'deleted_at', 'is_active', 'search_vector', 'logo_renditions']
+    
+    validate_custom_domain = PropertyDetailSerializer.validate_custom_domain
         
     def validate_zip_code(self, value):
         """Validar formato do CEP"""
@@ -81,32 +218,85 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
 
 class PropertyPublicSerializer(serializers.ModelSerializer):
     """Serializer público (sem dados sensíveis do owner)"""
-    accommodations_count = serializers.SerializerMethodField()
+    accommodations_count = serializers.IntegerField(read_only=True)
     images = ImageSerializer(many=True, read_only=True)
+    logo_renditions = RenditionsField('logo', 'logo_renditions')
     
     class Meta:
         model = Property
         fields = ['id', 'name', 'slug', 'description', 'address', 'city', 'state', 
                   'country', 'phone', 'website', 'accommodations_count', 
-                  'logo', 'primary_color', 'images', 'instagram', 'facebook',
-                  'youtube', 'tiktok', 'whatsapp']
+                  'logo', 'logo_renditions', 'primary_color', 'images', 'instagram',
+                  'facebook', 'youtube', 'tiktok', 'whatsapp']
+        annotations = {
+            'accommodations_count': related_count(Property, 'accommodations', is_active=True),
+        }
+
+
+class MatchingAccommodationSerializer(serializers.Serializer):
+    """Acomodação que atende a busca pública (item de `matching_accommodations`)"""
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    accommodation_type = serializers.CharField()
+    max_guests = serializers.IntegerField()
+    base_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    quote = serializers.SerializerMethodField()
+    
+    def get_quote(self, item):
+        """Total da estadia pedida, se houver datas"""
+        total = self.context.get('quotes', {}).get(item['id'])
+        return str(total) if total is not None else None
+
+
+class PropertyListingSerializer(serializers.ModelSerializer):
+    """Serializer da listagem pública (read model, sem consultas extras)"""
+    id = serializers.UUIDField(source='pk', read_only=True)
+    distance_km = serializers.SerializerMethodField()
+    quote_from = serializers.SerializerMethodField()
+    accommodations = serializers.SerializerMethodField()
+    cover_renditions = RenditionsField('cover_image', 'cover_renditions')
     
-    def get_accommodations_count(self, obj):
-        return obj.accommodations.filter(is_active=True).count()
+    class Meta:
+        model = PropertyListing
+        fields = ['id', 'name', 'slug', 'description', 'city', 'state', 'country',
+                  'latitude', 'longitude', 'logo', 'primary_color', 'cover_image',
+                  'cover_renditions', 'accommodations_count', 'min_price', 'max_price',
+                  'distance_km', 'quote_from', 'accommodations']
+    
+    def get_distance_km(self, obj):
+        """Preenchido só na busca por raio (`near`)"""
+        distance = getattr(obj, 'distance', None)
+        return round(distance / 1000, 2) if distance is not None else None
+    
+    def get_quote_from(self, obj):
+        """Menor total da estadia pedida (`check_in`/`check_out`) entre as acomodações que atendem"""
+        quotes = self.context.get('quotes', {})
+        totals = [
+            quotes[item['id']] for item in getattr(obj, 'matching_accommodations', None) or ()
+            if item['id'] in quotes
+        ]
+        return str(min(totals)) if totals else None
+    
+    def get_accommodations(self, obj):
+        """Preenchido só na busca por hóspedes ou datas: as que atendem, da mais barata à mais cara"""
+        items = getattr(obj, 'matching_accommodations', None)
+        if items is None:
+            return None
+        return MatchingAccommodationSerializer(items, many=True, context=self.context).data
 
 
 class AccommodationListSerializer(serializers.ModelSerializer):
     """Serializer para listagem de acomodações"""
     property_name = serializers.CharField(source='property.name', read_only=True)
-    images_count = serializers.SerializerMethodField()
+    images_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Accommodation
         fields = ['id', 'name', 'accommodation_type', 'max_guests', 
                   'base_price', 'is_active', 'property_name', 'images_count']
-    
-    def get_images_count(self, obj):
-        return obj.images.count()
+        annotations = {
+            'images_count': related_count(Accommodation, 'images'),
+        }
 
 
 class AccommodationDetailSerializer(serializers.ModelSerializer):
@@ -138,6 +328,183 @@ class AccommodationCreateSerializer(serializers.ModelSerializer):
         return value
 
 
+class StaySerializer(serializers.Serializer):
+    """Datas de entrada e saída de uma consulta de disponibilidade"""
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    
+    # Só datas de hoje até MAX_DAYS_AHEAD: a cotação monta uma tabela com as
+    # noites pedidas, e consultas públicas não podem pedir séculos
+    within_horizon = True
+    
+    def validate(self, data):
+        nights = (data['check_out'] - data['check_in']).days
+        if nights < 1:
+            raise serializers.ValidationError("check_out deve ser depois de check_in")
+        if nights > MAX_NIGHTS:
+            raise serializers.ValidationError(f"A estadia pode ter no máximo {MAX_NIGHTS} noites")
+        if not self.within_horizon:
+            return data
+        today = timezone.localdate()
+        if data['check_in'] < today:
+            raise serializers.ValidationError("check_in não pode estar no passado")
+        if data['check_out'] > today + timedelta(days=MAX_DAYS_AHEAD):
+            raise serializers.ValidationError(f"check_out pode estar no máximo {MAX_DAYS_AHEAD} dias à frente")
+        return data
+
+
+class PeriodSerializer(StaySerializer):
+    """Como `StaySerializer`, sem o limite de datas (agenda do proprietário)"""
+    within_horizon = False
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    """Combinações a cotar: cada acomodação x cada estadia x cada número de hóspedes"""
+    MAX_QUOTES = 1000
+    
+    accommodations = serializers.ListField(child=serializers.UUIDField(), allow_empty=False, max_length=200)
+    stays = serializers.ListField(child=StaySerializer(), allow_empty=False, max_length=20)
+    guests = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, default=[1], max_length=10
+    )
+    
+    def validate(self, data):
+        combinations = len(data['accommodations']) * len(data['stays']) * len(data['guests'])
+        if combinations > self.MAX_QUOTES:
+            raise serializers.ValidationError(f"No máximo {self.MAX_QUOTES} cotações por requisição")
+        return data
+
+
+class QuoteSerializer(serializers.Serializer):
+    """Cotação de uma estadia (ver properties/pricing.py)"""
+    accommodation = serializers.UUIDField(source='accommodation_id')
+    check_in = serializers.DateField()
+    check_out = serializers.DateField()
+    guests = serializers.IntegerField()
+    nights = serializers.IntegerField()
+    nightly_total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    cleaning_fee = serializers.DecimalField(max_digits=12, decimal_places=2)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    fits = serializers.BooleanField()
+
+
+class CalendarSerializer(serializers.Serializer):
+    """Janela do calendário de disponibilidade (padrão: hoje e os próximos 90 dias)"""
+    DEFAULT_DAYS = 90
+    
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    
+    def validate(self, data):
+        data.setdefault('start', timezone.localdate())
+        data.setdefault('end', data['start'] + timedelta(days=self.DEFAULT_DAYS))
+        PeriodSerializer(data={'check_in': data['start'], 'check_out': data['end']}).is_valid(raise_exception=True)
+        return data
+
+
+class AvailabilityBlockSerializer(serializers.ModelSerializer):
+    """Serializer para bloqueios de agenda (noites de `start` até a véspera de `end`)"""
+    start = serializers.DateField(source='period.lower')
+    end = serializers.DateField(source='period.upper')
+    
+    class Meta:
+        model = AvailabilityBlock
+        fields = ['id', 'accommodation', 'start', 'end', 'reason', 'note', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate(self, data):
+        period = data.pop('period', None) or {}
+        start = period.get('lower', self.instance and self.instance.period.lower)
+        end = period.get('upper', self.instance and self.instance.period.upper)
+        PeriodSerializer(data={'check_in': start, 'check_out': end}).is_valid(raise_exception=True)
+        data['period'] = stay(start, end)
+        
+        accommodation = data.get('accommodation') or self.instance.accommodation
+        overlapping = AvailabilityBlock.objects.filter(
+            accommodation=accommodation, period__overlap=data['period']
+        )
+        if self.instance:
+            overlapping = overlapping.exclude(pk=self.instance.pk)
+        if overlapping.exists():
+            raise serializers.ValidationError("Já existe um bloqueio nessas datas")
+        if active_bookings().filter(accommodation=accommodation, period__overlap=data['period']).exists():
+            raise serializers.ValidationError("Já existe uma reserva nessas datas")
+        return data
+    
+    def save(self, **kwargs):
+        # Dois bloqueios simultâneos nas mesmas datas: a constraint decide
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError("Já existe um bloqueio nessas datas")
+
+
+class BookingSerializer(serializers.ModelSerializer):
+    """Serializer de leitura para reservas"""
+    check_in = serializers.DateField(source='period.lower', read_only=True)
+    check_out = serializers.DateField(source='period.upper', read_only=True)
+    
+    class Meta:
+        model = Booking
+        fields = [
+            'id', 'accommodation', 'check_in', 'check_out', 'guests', 'guest_name', 'guest_email',
+            'guest_phone', 'total', 'status', 'expires_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
+class BookingHoldSerializer(StaySerializer):
+    """Dados do checkout para criar a pré-reserva"""
+    accommodation = serializers.PrimaryKeyRelatedField(
+        queryset=Accommodation.objects.filter(is_active=True, property__is_active=True)
+    )
+    guests = serializers.IntegerField(min_value=1, default=1)
+    guest_name = serializers.CharField(max_length=200)
+    guest_email = serializers.EmailField()
+    guest_phone = serializers.CharField(max_length=20, required=False, default='')
+    
+    def validate(self, data):
+        data = super().validate(data)
+        if data['guests'] > data['accommodation'].max_guests:
+            raise serializers.ValidationError({'guests': "Acomodação não comporta esse número de hóspedes"})
+        return data
+
+
+class PriceRuleSerializer(serializers.ModelSerializer):
+    """
+    Serializer para regras de preço. `start`/`end` delimitam as noites (`end`
+    exclusivo); sem eles a regra vale sempre. `weekdays` é uma máscara de bits
+    com segunda = 1, terça = 2, ..., domingo = 64.
+    """
+    start = serializers.DateField(source='period.lower', required=False, allow_null=True)
+    end = serializers.DateField(source='period.upper', required=False, allow_null=True)
+    
+    class Meta:
+        model = PriceRule
+        fields = ['id', 'property', 'accommodation', 'name', 'start', 'end', 'weekdays', 'multiplier', 'created_at']
+        read_only_fields = ['id', 'created_at']
+    
+    def validate(self, data):
+        if 'period' in data or not self.instance:
+            period = data.pop('period', None) or {}
+            start, end = period.get('lower'), period.get('upper')
+            if start and end:
+                if end <= start:
+                    raise serializers.ValidationError("O fim deve ser depois do início")
+                data['period'] = stay(start, end)
+            elif start or end:
+                raise serializers.ValidationError("Informe início e fim, ou nenhum dos dois")
+            else:
+                data['period'] = None
+        
+        property = data.get('property') or self.instance.property
+        accommodation = data.get('accommodation', self.instance and self.instance.accommodation)
+        if accommodation and accommodation.property_id != property.pk:
+            raise serializers.ValidationError({'accommodation': "Acomodação de outra propriedade"})
+        return data
+
+
 # Manter compatibilidade com código existente
 class AccommodationSerializer(AccommodationDetailSerializer):
     """Serializer para acomodações (compatibilidade)"""
@@ -1,6 +1,22 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Property, PropertyAccess
+from .cache import invalidate_public_properties
+from .domains import invalidate_domains
+from .listings import refresh_listings
+from .models import Property, Accommodation, AvailabilityBlock, Image, PriceRule, PropertyAccess
+from .renditions import is_current
+from .search import refresh_search_vector
+from .tasks import generate_image_renditions, generate_logo_renditions
+
+# Campos que compõem o search_vector da propriedade
+PROPERTY_SEARCH_FIELDS = {'name', 'city', 'description'}
+
+
+def invalidate_public_cache_on_commit(*slugs):
+    """Invalida o cache público depois do commit, quando a mudança já é visível."""
+    transaction.on_commit(lambda: invalidate_public_properties(*slugs))
 
 
 @receiver(post_save, sender=Property)
@@ -15,3 +31,117 @@ def create_owner_access(sender, instance, created, **kwargs):
             property=instance,
             role=PropertyAccess.Role.OWNER
         )
+
+
+@receiver(post_save, sender=Property)
+def update_property_search_vector(sender, instance, update_fields=None, **kwargs):
+    """Atualiza o search_vector quando nome, cidade ou descrição podem ter mudado."""
+    if update_fields is not None and not PROPERTY_SEARCH_FIELDS & set(update_fields):
+        return
+    refresh_search_vector(Property.objects.filter(pk=instance.pk), Accommodation)
+
+
+@receiver(post_save, sender=Accommodation)
+@receiver(post_delete, sender=Accommodation)
+def update_accommodation_search_vector(sender, instance, **kwargs):
+    """Os nomes das acomodações ativas entram no search_vector da propriedade."""
+    refresh_search_vector(Property.objects.filter(pk=instance.property_id), Accommodation)
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_property_cache(sender, instance, **kwargs):
+    invalidate_public_cache_on_commit(instance.slug, getattr(instance, '_loaded_slug', None))
+
+
+@receiver(post_save, sender=Property)
+@receiver(post_delete, sender=Property)
+def invalidate_custom_domain(sender, instance, **kwargs):
+    """Slug, domínio ou status podem ter mudado: esquece o domínio atual e o anterior."""
+    domains = (instance.custom_domain, getattr(instance, '_loaded_custom_domain', None))
+    if any(domains):
+        transaction.on_commit(lambda: invalidate_domains(*domains))
+
+
+@receiver(post_save, sender=Accommodation)
+@receiver(post_delete, sender=Accommodation)
+def invalidate_accommodation_cache(sender, instance, **kwargs):
+    slugs = Property.objects.filter(pk=instance.property_id).values_list('slug', flat=True)
+    invalidate_public_cache_on_commit(*slugs)
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def invalidate_image_cache(sender, instance, **kwargs):
+    if instance.property_id:
+        slugs = Property.objects.filter(pk=instance.property_id)
+    elif instance.accommodation_id:
+        slugs = Property.objects.filter(accommodations=instance.accommodation_id)
+    else:
+        return
+    invalidate_public_cache_on_commit(*slugs.values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=PriceRule)
+@receiver(post_delete, sender=PriceRule)
+def invalidate_price_rule_cache(sender, instance, **kwargs):
+    """A listagem com `check_in`/`check_out` traz cotações."""
+    slugs = Property.objects.filter(pk=instance.property_id).values_list('slug', flat=True)
+    invalidate_public_cache_on_commit(*slugs)
+
+
+@receiver(post_save, sender=AvailabilityBlock)
+@receiver(post_delete, sender=AvailabilityBlock)
+def invalidate_availability_cache(sender, instance, **kwargs):
+    slugs = Property.objects.filter(accommodations=instance.accommodation_id).values_list('slug', flat=True)
+    invalidate_public_cache_on_commit(*slugs)
+
+
+@receiver(post_delete, sender=Accommodation)
+@receiver(post_delete, sender=Image)
+def touch_property_on_delete(sender, instance, **kwargs):
+    """
+    Remoções não deixam `updated_at` para trás: avança o da propriedade para que
+    o Last-Modified/ETag da landing page mude.
+    """
+    if instance.property_id:
+        Property.objects.filter(pk=instance.property_id).update(updated_at=timezone.now())
+
+
+# Read model da listagem pública. Registrados depois dos receivers do
+# search_vector, que é copiado para PropertyListing.
+
+@receiver(post_save, sender=Property)
+def refresh_property_listing(sender, instance, **kwargs):
+    refresh_listings([instance.pk])
+
+
+@receiver(post_save, sender=Accommodation)
+@receiver(post_delete, sender=Accommodation)
+def refresh_accommodation_listing(sender, instance, **kwargs):
+    refresh_listings([instance.property_id])
+
+
+@receiver(post_save, sender=Image)
+@receiver(post_delete, sender=Image)
+def refresh_image_listing(sender, instance, **kwargs):
+    """Só as imagens da propriedade definem a capa."""
+    if instance.property_id:
+        refresh_listings([instance.property_id])
+
+
+# Versões redimensionadas (ver properties/renditions.py), geradas pelo Celery
+# depois do commit para que a task encontre o registro
+
+@receiver(post_save, sender=Image)
+def enqueue_image_renditions(sender, instance, created, **kwargs):
+    # Imagem nova sempre passa pela task: mesmo reaproveitando as versões de um
+    # arquivo idêntico, ainda é comparada com as fotos da propriedade
+    if instance.image and (created or not is_current(instance.image, instance.renditions)):
+        transaction.on_commit(lambda: generate_image_renditions.delay(instance.pk))
+
+
+@receiver(post_save, sender=Property)
+def enqueue_logo_renditions(sender, instance, **kwargs):
+    if instance.logo and not is_current(instance.logo, instance.logo_renditions):
+        transaction.on_commit(lambda: generate_logo_renditions.delay(instance.pk))
@@ -0,0 +1,77 @@
+"""
+Geração de slugs únicos para propriedades.
+
+Os slugs ocupados de uma base (`base` e `base-<n>`) vêm de uma única query por
+prefixo, atendida pelo índice `varchar_pattern_ops` que o Django cria para o
+campo único `slug`; a expressão regular na mesma condição descarta no banco os
+outros slugs do prefixo (`pousada-do-sol` para a base `pousada`). A escolha do
+sufixo é feita em memória; a corrida com outra transação é resolvida pelo
+índice único (ver `Property.save`).
+"""
+import re
+
+from django.db.models import Q
+from django.utils.text import slugify
+
+# Reserva espaço para o sufixo numérico dentro do max_length do campo
+SUFFIX_RESERVE = 6
+DEFAULT_SLUG = 'propriedade'
+
+
+def base_slug(name, max_length):
+    slug = slugify(name)[:max_length - SUFFIX_RESERVE].strip('-')
+    return slug or DEFAULT_SLUG
+
+
+def taken_slugs(model, bases, exclude_pk=None):
+    """Slugs em uso no formato `base` ou `base-<n>`, para cada base."""
+    bases = set(bases)
+    if not bases:
+        return {}
+
+    patterns = {base: rf'{re.escape(base)}(-\d+)?' for base in bases}
+    prefixes = Q()
+    for base, pattern in patterns.items():
+        prefixes |= Q(slug__startswith=base, slug__regex=f'^{pattern}$')
+    queryset = model.objects.filter(prefixes).order_by()
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+
+    # Uma base pode ser prefixo de outra: cada slug vai para a base que casa
+    taken = {base: set() for base in bases}
+    for slug in queryset.values_list('slug', flat=True):
+        for base, pattern in patterns.items():
+            if re.fullmatch(pattern, slug):
+                taken[base].add(slug)
+    return taken
+
+
+def next_free_slug(base, taken):
+    """`base` ou o primeiro `base-<n>` livre (n a partir de 1)."""
+    if base not in taken:
+        return base
+    counter = 1
+    while f'{base}-{counter}' in taken:
+        counter += 1
+    return f'{base}-{counter}'
+
+
+def assign_slugs(instances):
+    """
+    Preenche o slug das instâncias novas sem slug, numa única query.
+
+    Slugs repetidos dentro do próprio lote também recebem sufixos, então as
+    instâncias podem ir direto para `bulk_create`.
+    """
+    pending = [instance for instance in instances if not instance.slug]
+    if not pending:
+        return instances
+
+    model = type(pending[0])
+    max_length = model._meta.get_field('slug').max_length
+    bases = [base_slug(instance.name, max_length) for instance in pending]
+    taken = taken_slugs(model, bases)
+    for instance, base in zip(pending, bases):
+        instance.slug = next_free_slug(base, taken[base])
+        taken[base].add(instance.slug)
+    return instances
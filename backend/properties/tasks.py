@@ -0,0 +1,102 @@
+"""
+Tasks assíncronas (Celery) do app properties.
+"""
+import logging
+
+from celery import shared_task
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from .cache import invalidate_public_properties
+from .content import HammingIndex, band_filter
+from .listings import refresh_listings
+from .models import Image, Property
+from .renditions import LOGO_SIZES, RENDITION_SIZES, is_current, process_image
+
+logger = logging.getLogger(__name__)
+
+
+def _process(source, sizes=tuple(RENDITION_SIZES)):
+    """Resultado de `process_image` ou None se o arquivo sumiu ou não é uma imagem."""
+    try:
+        return process_image(source, sizes)
+    except (OSError, PILImage.DecompressionBombError) as error:
+        logger.warning('Não foi possível gerar as versões de %s: %s', source, error)
+        return None
+
+
+def flag_similar_image(image, property_id):
+    """
+    Marca `image` como parecida com a imagem mais antiga da mesma propriedade
+    (incluindo as das acomodações) cujo dHash está a poucos bits de distância.
+    """
+    if image.dhash is None:
+        return None
+    earlier = Image.objects.filter(
+        Q(property_id=property_id) | Q(accommodation__property_id=property_id),
+        band_filter('dhash', image.dhash),
+        created_at__lt=image.created_at,
+        dhash__isnull=False,
+    ).order_by('created_at').values_list('pk', 'dhash')
+    matches = HammingIndex(earlier).search(image.dhash)
+    similar_to = matches[0] if matches else None
+    Image.objects.filter(pk=image.pk).update(similar_to=similar_to)
+    return similar_to
+
+
+@shared_task(ignore_result=True)
+def generate_image_renditions(image_id):
+    """
+    Gera as versões e os metadados (cor, placeholder, hashes...) de uma `Image`,
+    procura fotos parecidas na propriedade e atualiza a capa/cache.
+    """
+    image = Image.objects.filter(pk=image_id).select_related('accommodation').first()
+    if image is None or not image.image:
+        return
+    property_id = image.property_id or image.accommodation.property_id
+
+    # Arquivo já processado por outra Image (mesmo conteúdo): só falta comparar
+    if is_current(image.image, image.renditions) and image.placeholder:
+        flag_similar_image(image, property_id)
+        return
+
+    result = _process(image.image.name)
+    if result is None:
+        return
+
+    # Só grava se o arquivo não foi trocado enquanto as versões eram geradas
+    updated = Image.objects.filter(pk=image_id, image=image.image.name).update(
+        **result, updated_at=timezone.now()
+    )
+    if not updated:
+        # As versões geradas ficam: o caminho delas é endereçado por conteúdo
+        # e pode estar em uso por outra Image ou logo com o mesmo arquivo.
+        # Sem referência, a coleta de lixo (media_gc.py) as remove.
+        return
+
+    image.dhash = result['dhash']
+    flag_similar_image(image, property_id)
+    if image.property_id:
+        refresh_listings([property_id])
+    invalidate_public_properties(*Property.objects.filter(pk=property_id).values_list('slug', flat=True))
+
+
+@shared_task(ignore_result=True)
+def generate_logo_renditions(property_id):
+    """Gera as versões do logo de uma `Property`."""
+    prop = Property.objects.filter(pk=property_id).only('logo', 'slug').first()
+    if prop is None or not prop.logo:
+        return
+
+    result = _process(prop.logo.name, LOGO_SIZES)
+    if result is None:
+        return
+
+    updated = Property.objects.filter(pk=property_id, logo=prop.logo.name).update(
+        logo_renditions=result['renditions'], updated_at=timezone.now()
+    )
+    if not updated:
+        # Ver generate_image_renditions: a coleta de lixo cuida das sem uso
+        return
+    invalidate_public_properties(prop.slug)
@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.availability import available_ids, busy_periods, is_available
+from properties.models import Accommodation, AvailabilityBlock, Property
+
+
+class AvailabilityTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.client.force_authenticate(self.user)
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Agenda',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.rooms = [
+            Accommodation.objects.create(property=self.prop, name=f'Quarto {index}', base_price=300)
+            for index in range(5)
+        ]
+        self.first_day = timezone.localdate() + timedelta(days=30)
+        self.block(self.rooms[0], self.day(10), self.day(13))
+        self.block(self.rooms[1], self.day(14), self.day(20))
+
+    def day(self, number):
+        """Day `number` of a reference month starting 30 days from now"""
+        return self.first_day + timedelta(days=number - 1)
+
+    def block(self, room, start, end):
+        return AvailabilityBlock.objects.create(accommodation=room, period=DateRange(start, end))
+
+    def test_range_checks(self):
+        """Check-out day is free; any shared night is not"""
+        self.assertTrue(is_available(self.rooms[0].pk, self.day(13), self.day(15)))
+        self.assertTrue(is_available(self.rooms[0].pk, self.day(8), self.day(10)))
+        self.assertFalse(is_available(self.rooms[0].pk, self.day(12), self.day(14)))
+
+    def test_bulk_check_single_query(self):
+        """Many accommodations are checked with one query"""
+        ids = [room.pk for room in self.rooms]
+        with CaptureQueriesContext(connection) as context:
+            free = available_ids(ids, self.day(12), self.day(15))
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(free, set(ids[2:]))
+
+        response = self.client.get(
+            reverse('accommodation-available'), {'check_in': self.day(12).isoformat(), 'check_out': self.day(15).isoformat()}
+        )
+        self.assertEqual({str(pk) for pk in response.data['available']}, {str(pk) for pk in ids[2:]})
+
+    def test_calendar_merges_adjacent_blocks(self):
+        self.block(self.rooms[0], self.day(13), self.day(16))
+        self.assertEqual(
+            busy_periods(self.rooms[0].pk, self.day(1), self.day(15)),
+            [(self.day(10), self.day(15))]
+        )
+        response = self.client.get(
+            reverse('accommodation-availability', kwargs={'pk': self.rooms[0].pk}),
+            {'start': self.day(1).isoformat(), 'end': self.day(32).isoformat()}
+        )
+        self.assertEqual(response.data['busy'], [{'start': self.day(10), 'end': self.day(16)}])
+
+    def test_overlapping_blocks_rejected(self):
+        """The API and the database both refuse overlapping blocks"""
+        response = self.client.post(reverse('availability-block-list'), {
+            'accommodation': str(self.rooms[0].pk), 'start': self.day(12).isoformat(), 'end': self.day(18).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.block(self.rooms[0], self.day(12), self.day(18))
+
+        response = self.client.post(reverse('availability-block-list'), {
+            'accommodation': str(self.rooms[0].pk), 'start': self.day(13).isoformat(), 'end': self.day(18).isoformat(),
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['end'], self.day(18).isoformat())
+
+    def test_public_search_by_guests_and_dates(self):
+        """Only properties with a free unit for the guests, listing just those units"""
+        cache.clear()
+        family = Accommodation.objects.create(property=self.prop, name='Família', base_price=500, max_guests=4)
+        other = Property.objects.create(owner=self.user, name='Pousada Lotada', city='Chapada', state='MT', is_active=True)
+        full = Accommodation.objects.create(property=other, name='Casa', base_price=400, max_guests=6)
+        self.block(full, self.day(1), self.day(31))
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'guests': 4, 'check_in': self.day(12).isoformat(), 'check_out': self.day(15).isoformat()})
+        self.assertEqual([item['id'] for item in response.data['results']], [str(self.prop.pk)])
+        [match] = response.data['results'][0]['accommodations']
+        self.assertEqual(match['id'], str(family.pk))
+        self.assertEqual(match['quote'], '1500.00')
+        self.assertEqual(response.data['results'][0]['quote_from'], '1500.00')
+
+        response = self.client.get(url, {'guests': 2, 'check_in': self.day(12).isoformat(), 'check_out': self.day(15).isoformat()})
+        ids = {str(room.pk) for room in self.rooms[2:]} | {str(family.pk)}
+        self.assertEqual({item['id'] for item in response.data['results'][0]['accommodations']}, ids)
+        self.assertEqual(response.data['results'][0]['quote_from'], '900.00')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, {'guests': 5, 'pagination': 'cursor'})
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual([item['id'] for item in response.data['results']], [str(other.pk)])
+
+        response = self.client.get(url)
+        self.assertIsNone(response.data['results'][0]['accommodations'])
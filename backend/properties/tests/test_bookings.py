@@ -0,0 +1,146 @@
+import logging
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import Exists, OuterRef
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties import bookings
+from properties.availability import is_available
+from properties.models import Accommodation, Booking, Property
+
+logger = logging.getLogger(__name__)
+
+GUEST = {'guest_name': 'Maria', 'guest_email': 'maria@example.com'}
+
+
+def make_accommodation(username):
+    user = User.objects.create_user(
+        username=username,
+        email=f'{username}@example.com',
+        password='password123',
+        is_owner=True
+    )
+    prop = Property.objects.create(owner=user, name=f'Pousada {username}', city='Chapada', state='MT', is_active=True)
+    return user, Accommodation.objects.create(property=prop, name='Chalé', base_price=200, max_guests=4)
+
+
+class BookingTests(APITestCase):
+    def setUp(self):
+        self.owner, self.room = make_accommodation('owner')
+        self.check_in = timezone.localdate() + timedelta(days=30)
+        self.check_out = self.check_in + timedelta(days=3)
+
+    def hold(self, check_in=None, check_out=None):
+        return bookings.hold(self.room, check_in or self.check_in, check_out or self.check_out, 2, **GUEST)
+
+    def test_overlap_rejected_adjacent_allowed(self):
+        booking = self.hold()
+        self.assertEqual(booking.total, 600)
+        with self.assertRaises(bookings.Unavailable):
+            self.hold(self.check_in + timedelta(days=2), self.check_out + timedelta(days=2))
+        self.hold(self.check_out, self.check_out + timedelta(days=2))
+        self.assertFalse(is_available(self.room.pk, self.check_in, self.check_out))
+
+    def test_expired_hold_frees_nights(self):
+        booking = self.hold()
+        Booking.objects.filter(pk=booking.pk).update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(is_available(self.room.pk, self.check_in, self.check_out))
+        with self.assertRaises(bookings.HoldExpired):
+            bookings.confirm(booking.pk)
+
+        self.hold()
+        booking.refresh_from_db()
+        self.assertEqual(booking.status, Booking.Status.EXPIRED)
+
+    def test_cancel_frees_nights(self):
+        booking = self.hold()
+        bookings.confirm(booking.pk)
+        self.assertTrue(bookings.cancel(booking.pk))
+        self.hold()
+
+    def test_checkout_api(self):
+        url = reverse('public-booking-list')
+        payload = {
+            'accommodation': str(self.room.pk),
+            'check_in': self.check_in.isoformat(),
+            'check_out': self.check_out.isoformat(),
+            'guests': 2,
+            **GUEST,
+        }
+        response = self.client.post(url, payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['status'], Booking.Status.HOLD)
+        self.assertEqual(self.client.post(url, payload).status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.client.post(url, {**payload, 'guests': 5}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(reverse('public-booking-confirm', args=[response.data['id']]))
+        self.assertEqual(response.data['status'], Booking.Status.CONFIRMED)
+        self.assertIsNone(response.data['expires_at'])
+
+        self.client.force_authenticate(self.owner)
+        self.assertEqual(self.client.get(reverse('booking-list')).data['count'], 1)
+
+
+class BookingConcurrencyTests(TransactionTestCase):
+    THREADS = 16
+    ATTEMPTS = 25
+
+    def test_concurrent_holds_never_overlap(self):
+        """Many threads book random stays on one accommodation: no two active bookings share a night"""
+        _, room = make_accommodation('busy')
+        first_night = timezone.localdate() + timedelta(days=1)
+        results = {'booked': 0, 'rejected': 0}
+        lock = threading.Lock()
+        start = threading.Barrier(self.THREADS)
+
+        def worker(seed):
+            generator = random.Random(seed)
+            try:
+                start.wait()
+                for _ in range(self.ATTEMPTS):
+                    check_in = first_night + timedelta(days=generator.randrange(60))
+                    check_out = check_in + timedelta(days=generator.randint(1, 4))
+                    try:
+                        bookings.hold(room, check_in, check_out, 1, **GUEST)
+                        outcome = 'booked'
+                    except bookings.Unavailable:
+                        outcome = 'rejected'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(self.THREADS)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = self.THREADS * self.ATTEMPTS
+        self.assertEqual(results['booked'] + results['rejected'], attempts)
+        self.assertGreater(results['booked'], 0)
+        self.assertGreater(results['rejected'], 0)
+        logger.info(
+            '%d booking attempts in %.2fs (%.0f/s): %d booked, %d rejected',
+            attempts, elapsed, attempts / elapsed, results['booked'], results['rejected'],
+        )
+
+        active = Booking.objects.filter(accommodation=room, status__in=Booking.ACTIVE)
+        self.assertEqual(active.count(), results['booked'])
+        overlapping = active.filter(
+            Exists(active.filter(period__overlap=OuterRef('period')).exclude(pk=OuterRef('pk')))
+        )
+        self.assertFalse(overlapping.exists())
+
+        nights = sum((booking.upper - booking.lower).days for booking in active.values_list('period', flat=True))
+        self.assertLessEqual(nights, 64)
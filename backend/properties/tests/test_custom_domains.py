@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.domains import domain_cache, resolve_host
+from properties.models import Property
+
+
+@override_settings(ALLOWED_HOSTS=['*'])
+class CustomDomainTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        domain_cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prop = Property.objects.create(
+                owner=self.user,
+                name='Pousada Domínio',
+                city='Chapada',
+                state='MT',
+                custom_domain='www.PousadaDominio.com.br',
+                is_active=True
+            )
+
+    def test_custom_domain_serves_public_payload(self):
+        """The root of a custom domain should return the landing page payload"""
+        response = self.client.get('/', HTTP_HOST='www.pousadadominio.com.br:8000')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['slug'], self.prop.slug)
+
+        response = self.client.get('/', HTTP_HOST='desconhecido.com.br')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_resolution_is_cached(self):
+        """Known and unknown hosts should only hit the database once"""
+        self.assertEqual(resolve_host('www.pousadadominio.com.br'), self.prop.slug)
+        self.assertIsNone(resolve_host('desconhecido.com.br'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_host('WWW.pousadadominio.com.br'), self.prop.slug)
+            self.assertIsNone(resolve_host('desconhecido.com.br'))
+
+    def test_cache_invalidated_on_domain_change(self):
+        """Changing the domain should forget both the old and the new host"""
+        self.assertEqual(resolve_host('www.pousadadominio.com.br'), self.prop.slug)
+        self.assertIsNone(resolve_host('pousada.com.br'))
+
+        prop = Property.objects.get(pk=self.prop.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            prop.custom_domain = 'pousada.com.br'
+            prop.save()
+
+        self.assertIsNone(resolve_host('www.pousadadominio.com.br'))
+        self.assertEqual(resolve_host('pousada.com.br'), self.prop.slug)
+
+    def test_domain_cannot_be_claimed_twice(self):
+        """A second owner cannot take over a domain already in use, in any letter case"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse('property-list'), {
+            'name': 'Pousada Intrusa',
+            'address': 'Rua A, 1',
+            'city': 'Chapada',
+            'state': 'MT',
+            'zip_code': '78000000',
+            'custom_domain': 'WWW.pousadadominio.com.br',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('custom_domain', response.data)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Property.objects.create(
+                owner=other, name='Pousada Intrusa', city='Chapada', state='MT',
+                custom_domain='www.pousadadominio.com.br',
+            )
+        self.assertEqual(resolve_host('www.pousadadominio.com.br'), self.prop.slug)
+
+        # O dono continua podendo salvar a propriedade com o próprio domínio
+        self.client.force_authenticate(self.user)
+        response = self.client.patch(
+            reverse('property-detail', kwargs={'pk': self.prop.pk}),
+            {'custom_domain': 'www.pousadadominio.com.br'},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
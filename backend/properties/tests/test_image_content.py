@@ -0,0 +1,123 @@
+import io
+import random
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image as PILImage, ImageDraw
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.content import HammingIndex, band_filter, hamming
+from properties.models import Accommodation, Image, Property
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def photo(quality=90, size=(1200, 800)):
+    picture = PILImage.new('RGB', (1200, 800), (240, 240, 240))
+    draw = ImageDraw.Draw(picture)
+    draw.rectangle((100, 100, 600, 500), fill=(20, 60, 160))
+    draw.ellipse((700, 200, 1100, 700), fill=(200, 40, 40))
+    buffer = io.BytesIO()
+    picture.resize(size).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageContentTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.client.force_authenticate(self.user)
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Fotos',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.suite = Accommodation.objects.create(property=self.prop, name='Suíte', base_price=300)
+
+    def upload(self, content, **target):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(
+                image=SimpleUploadedFile('foto.jpg', content, content_type='image/jpeg'),
+                **(target or {'property': self.prop})
+            )
+        image.refresh_from_db()
+        return image
+
+    def test_identical_uploads_share_file(self):
+        """Same bytes should be stored once and reuse the renditions"""
+        first = self.upload(photo())
+        second = self.upload(photo(), accommodation=self.suite)
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertTrue(first.image.name.startswith(f'images/{first.sha256[:2]}/'))
+        self.assertEqual(second.renditions, first.renditions)
+        self.assertEqual(second.similar_to_id, first.pk)
+
+    def test_near_duplicate_flagged(self):
+        """A recompressed, resized copy should be flagged as similar"""
+        first = self.upload(photo())
+        copy = self.upload(photo(quality=60, size=(900, 600)))
+
+        self.assertNotEqual(first.sha256, copy.sha256)
+        self.assertLessEqual(hamming(first.dhash, copy.dhash), 6)
+        self.assertEqual(copy.similar_to_id, first.pk)
+        self.assertIsNone(first.similar_to_id)
+
+    def test_create_from_known_hash(self):
+        """A hash the user already uploaded can be reused without sending bytes"""
+        first = self.upload(photo())
+        url = reverse('image-from-hash')
+
+        response = self.client.post(url, {'sha256': first.sha256, 'accommodation': str(self.suite.pk)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Image.objects.get(pk=response.data['id']).image.name, first.image.name)
+
+        response = self.client.post(url, {'sha256': '0' * 64, 'property': str(self.prop.pk)})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hamming_index(self):
+        """Band lookup and full scan should find the same close hashes"""
+        index = HammingIndex([('a', 0b1011), ('b', -1), ('c', 0b0101)])
+        self.assertEqual(index.search(0b1010, max_distance=1), ['a'])
+        self.assertEqual(index.search(0b1010, max_distance=6), ['a', 'c'])
+
+    def test_hamming_index_buckets(self):
+        """Near-duplicate search only compares hashes sharing a band, and still finds them"""
+        generator = random.Random(7)
+        items = [(number, generator.getrandbits(64) - (1 << 63)) for number in range(2000)]
+        target = items[123][1]
+        near = target ^ 0b100101100001  # 5 bits flipped
+        index = HammingIndex(items + [('near', near)])
+
+        candidates = index.candidates(target)
+        self.assertLess(len(candidates), len(items) // 10)
+        self.assertIn(('near', near), candidates)
+        self.assertEqual(index.search(target), [123, 'near'])
+        with mock.patch('properties.content.hamming', wraps=hamming) as compare:
+            index.search(target)
+        self.assertEqual(compare.call_count, len(candidates))
+
+        similar = Image.objects.filter(band_filter('dhash', target)).values_list('dhash', flat=True)
+        Image.objects.bulk_create([Image(property=self.prop, dhash=value) for _, value in items[:50]])
+        Image.objects.create(property=self.prop, dhash=near)
+        self.assertIn(near, list(similar))
+        self.assertLess(len(similar), 10)
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.models import Image, Property
+
+
+class ImageReorderTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.client.force_authenticate(self.user)
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Galeria',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.images = [Image.objects.create(property=self.prop, order=index) for index in range(6)]
+
+    def orders(self):
+        return list(Image.objects.filter(property=self.prop).order_by('order').values_list('pk', flat=True))
+
+    def test_full_reorder_single_update(self):
+        """The whole gallery is reordered with one UPDATE"""
+        new_order = [image.pk for image in reversed(self.images)]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                reverse('image-reorder'), {'image_ids': [str(pk) for pk in new_order]}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.orders(), new_order)
+        updates = [query for query in context.captured_queries if query['sql'].startswith('UPDATE "properties_image"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_move_one_image(self):
+        """Moving an image only shifts the images between the old and new positions"""
+        response = self.client.post(
+            reverse('image-reorder'), {'image': str(self.images[4].pk), 'order': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = [self.images[index].pk for index in (0, 4, 1, 2, 3, 5)]
+        self.assertEqual(self.orders(), expected)
+
+        response = self.client.post(
+            reverse('image-reorder'), {'image': str(self.images[4].pk), 'order': 5}, format='json'
+        )
+        expected = [self.images[index].pk for index in (0, 1, 2, 3, 5, 4)]
+        self.assertEqual(self.orders(), expected)
+
+    def test_move_with_default_orders(self):
+        """Uploads without an order all have 0: the gallery is renumbered before moving"""
+        Image.objects.filter(property=self.prop).update(order=0)
+        gallery = sorted(self.images, key=lambda image: image.pk)
+
+        response = self.client.post(
+            reverse('image-reorder'), {'image': str(gallery[0].pk), 'order': 3}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = [gallery[index].pk for index in (1, 2, 3, 0, 4, 5)]
+        self.assertEqual(self.orders(), expected)
+        orders = Image.objects.filter(property=self.prop).order_by('order').values_list('order', flat=True)
+        self.assertEqual(list(orders), list(range(6)))
+
+    def test_reorder_scoped_to_owner(self):
+        """Images of other users are not touched and the request changes nothing"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        foreign = Property.objects.create(owner=other, name='Outra', city='Chapada', state='MT')
+        foreign_image = Image.objects.create(property=foreign, order=7)
+
+        response = self.client.post(reverse('image-reorder'), {
+            'image_ids': [str(self.images[1].pk), str(foreign_image.pk)]
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        foreign_image.refresh_from_db()
+        self.assertEqual(foreign_image.order, 7)
+        self.assertEqual(self.orders(), [image.pk for image in self.images])
@@ -0,0 +1,206 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from auditlog.models import LogEntry
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image as PILImage
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties import uploads
+from properties.models import Image, ImageUpload, Property
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_DIR = tempfile.mkdtemp()
+
+
+def jpeg_bytes(size=(1600, 1200)):
+    buffer = io.BytesIO()
+    PILImage.effect_noise(size, 64).convert('RGB').save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, CHUNKED_UPLOAD_DIR=UPLOAD_DIR, CHUNKED_UPLOAD_MAX_CHUNK=64 * 1024)
+class ImageUploadTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.client.force_authenticate(self.user)
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Upload',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.content = jpeg_bytes()
+
+    def start(self, **extra):
+        payload = {
+            'property': str(self.prop.pk),
+            'filename': 'foto.jpg',
+            'size': len(self.content),
+            'sha256': hashlib.sha256(self.content).hexdigest(),
+            **extra,
+        }
+        response = self.client.post(reverse('image-upload-list'), payload)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+
+    def put_chunk(self, upload_id, start, end, body=None, **headers):
+        body = self.content[start:end + 1] if body is None else body
+        return self.client.put(
+            reverse('image-upload-detail', kwargs={'pk': upload_id}),
+            body,
+            content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.content)}',
+            **headers
+        )
+
+    def test_chunked_upload_resumes_and_creates_image(self):
+        """Chunks are appended in order; a retry after a failure resumes from `received`"""
+        upload_id = self.start()
+        chunk = 64 * 1024
+        total = len(self.content)
+
+        response = self.put_chunk(upload_id, 0, chunk - 1)
+        self.assertEqual(response.data['received'], chunk)
+
+        # Parte corrompida no caminho: rejeitada sem avançar
+        response = self.put_chunk(
+            upload_id, chunk, 2 * chunk - 1, HTTP_X_CHUNK_SHA256=hashlib.sha256(b'x').hexdigest()
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Parte fora de ordem: 409 com o offset correto
+        response = self.put_chunk(upload_id, 2 * chunk, 3 * chunk - 1)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['received'], chunk)
+
+        response = self.client.get(reverse('image-upload-detail', kwargs={'pk': upload_id}))
+        offset = response.data['received']
+        while offset < total:
+            end = min(offset + chunk, total) - 1
+            response = self.put_chunk(upload_id, offset, end)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            offset = response.data['received']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('image-upload-finalize', kwargs={'pk': upload_id}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        image = Image.objects.get(pk=response.data['id'])
+        self.assertEqual(image.sha256, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual((image.width, image.height), (1600, 1200))
+        self.assertEqual(ImageUpload.objects.get(pk=upload_id).status, ImageUpload.Status.COMPLETE)
+        self.assertFalse(uploads.upload_path(ImageUpload(pk=upload_id)).exists())
+
+    def test_stored_extension_follows_content(self):
+        """A JPEG uploaded as .html is stored as .jpg, never under the client's extension"""
+        upload_id = self.start(filename='foto.html')
+        self.put_chunk(upload_id, 0, len(self.content) - 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('image-upload-finalize', kwargs={'pk': upload_id}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        image = Image.objects.get(pk=response.data['id'])
+        self.assertEqual(image.image.name, f'images/{image.sha256[:2]}/{image.sha256[2:4]}/{image.sha256}.jpg')
+
+    def test_finalize_requires_every_byte(self):
+        """An incomplete or foreign session cannot be finalized"""
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, 1023)
+        response = self.client.post(reverse('image-upload-finalize', kwargs={'pk': upload_id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.client.force_authenticate(other)
+        response = self.client.get(reverse('image-upload-detail', kwargs={'pk': upload_id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.post(reverse('image-upload-list'), {
+            'property': str(self.prop.pk), 'filename': 'foto.jpg', 'size': 10,
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cleanup_removes_stale_sessions(self):
+        """Abandoned sessions and their temporary files are collected"""
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, 1023)
+        stale = timezone.now() - timedelta(days=2)
+        ImageUpload.objects.filter(pk=upload_id).update(updated_at=stale)
+        path = uploads.upload_path(ImageUpload.objects.get(pk=upload_id))
+        os.utime(path, (stale.timestamp(), stale.timestamp()))
+
+        self.assertEqual(uploads.cleanup(), (1, 1))
+        self.assertFalse(ImageUpload.objects.filter(pk=upload_id).exists())
+        self.assertFalse(path.exists())
+
+    def test_cleanup_keeps_recent_orphan_files(self):
+        """A .part file written after the live sessions were read is not deleted"""
+        upload_id = self.start()
+        self.put_chunk(upload_id, 0, 1023)
+        path = uploads.upload_path(ImageUpload.objects.get(pk=upload_id))
+        # Simula a sessão ainda invisível para o cleanup (criada depois da consulta)
+        ImageUpload.objects.filter(pk=upload_id).update(status=ImageUpload.Status.COMPLETE)
+
+        self.assertEqual(uploads.cleanup(), (0, 0))
+        self.assertTrue(path.exists())
+
+    def test_bulk_upload(self):
+        """Many files in one request get consecutive order, audit entries and renditions"""
+        Image.objects.create(
+            property=self.prop, order=4,
+            image=SimpleUploadedFile('capa.jpg', jpeg_bytes((400, 300)), content_type='image/jpeg')
+        )
+        files = [
+            SimpleUploadedFile(f'foto{index}.jpg', jpeg_bytes((800, 600)), content_type='image/jpeg')
+            for index in range(3)
+        ]
+        files.append(SimpleUploadedFile('repetida.jpg', files[0].read(), content_type='image/jpeg'))
+        files[0].seek(0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('image-bulk'), {
+                'property': str(self.prop.pk),
+                'images': files,
+                'captions': ['Fachada', 'Piscina'],
+            }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['order'] for item in response.data], [5, 6, 7, 8])
+        self.assertEqual([item['caption'] for item in response.data], ['Fachada', 'Piscina', '', ''])
+
+        created = Image.objects.filter(pk__in=[item['id'] for item in response.data])
+        self.assertEqual(LogEntry.objects.get_for_objects(created).count(), 4)
+        first, *_, repeated = created.order_by('order')
+        self.assertEqual(repeated.image.name, first.image.name)
+        self.assertTrue(all(image.placeholder for image in created))
+
+    def test_bulk_upload_checks_ownership(self):
+        """Bulk uploads to someone else's property are refused"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse('image-bulk'), {
+            'property': str(self.prop.pk),
+            'images': [SimpleUploadedFile('foto.jpg', self.content, content_type='image/jpeg')],
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Image.objects.exists())
@@ -0,0 +1,161 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image as PILImage
+from accounts.models import User
+from properties.media_gc import MediaCollector, References
+from properties.models import Accommodation, Image, Property
+
+MEDIA_ROOT = tempfile.mkdtemp()
+DAY = 24 * 3600
+
+
+def jpeg_upload(color):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', (400, 300), color).save(buffer, 'JPEG')
+    return SimpleUploadedFile('foto.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+def age(root, days=2):
+    """Envelhece todos os arquivos de `root`."""
+    past = time.time() - days * DAY
+    for directory, _, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(directory, name), (past, past))
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaGarbageCollectionTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        self.root = Path(MEDIA_ROOT)
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Arquivos',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+
+    def upload(self, color, **target):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(image=jpeg_upload(color), **(target or {'property': self.prop}))
+        image.refresh_from_db()
+        return image
+
+    def files(self, image):
+        return [image.image.name] + [
+            image.renditions[size][extension] for size in ('thumb', 'card', 'hero') for extension in ('webp', 'jpeg')
+        ]
+
+    def test_orphans_quarantined_then_deleted(self):
+        """Deleted images lose their files; files still shared with another image stay"""
+        kept = self.upload((200, 30, 30))
+        removed = self.upload((30, 200, 30))
+        shared = self.upload((30, 30, 200))
+        suite = Accommodation.objects.create(property=self.prop, name='Suíte', base_price=300)
+        self.upload((30, 30, 200), accommodation=suite)
+        orphan_files = self.files(removed)
+        removed.delete()
+        shared.delete()
+        age(self.root)
+
+        stats = MediaCollector(pause=0).run()
+        self.assertEqual(stats['quarantined'], len(orphan_files))
+        for name in orphan_files:
+            self.assertFalse((self.root / name).exists())
+            self.assertTrue((self.root / '.gc/quarantine' / name).exists())
+        for name in self.files(kept) + self.files(shared):
+            self.assertTrue((self.root / name).exists())
+
+        age(self.root / '.gc/quarantine', days=8)
+        stats = MediaCollector(pause=0).run()
+        self.assertEqual(stats['deleted'], len(orphan_files))
+        self.assertFalse((self.root / '.gc/quarantine/images').exists())
+
+    def test_reused_file_kept_and_restored(self):
+        """Re-uploading an old orphan refreshes it; a referenced file caught in quarantine comes back"""
+        removed = self.upload((30, 200, 30))
+        removed.delete()
+        age(self.root)
+        reused = self.upload((30, 200, 30))
+        self.assertEqual(reused.image.name, removed.image.name)
+
+        stats = MediaCollector(pause=0).run()
+        self.assertEqual(stats['quarantined'], 0)
+
+        # Movido para a quarentena logo antes de o upload idêntico ser registrado
+        name = reused.image.name
+        (self.root / '.gc/quarantine' / name).parent.mkdir(parents=True)
+        os.replace(self.root / name, self.root / '.gc/quarantine' / name)
+        stats = MediaCollector(pause=0).run()
+        self.assertEqual(stats['restored'], 1)
+        self.assertTrue((self.root / name).exists())
+        self.assertFalse((self.root / '.gc/quarantine' / name).exists())
+
+    def test_other_paths_loaded_once(self):
+        """Paths that are not content-addressed are read once per run, not scanned per batch"""
+        Property.objects.filter(pk=self.prop.pk).update(logo='logos/usado.png')
+        references = References()
+        with self.assertNumQueries(2):
+            self.assertEqual(references.referenced_paths(['logos/usado.png', 'logos/velho.png']), {'logos/usado.png'})
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                references.referenced_paths(['renditions/logos/usado/thumb.webp', 'renditions/logos/velho/thumb.webp']),
+                {'renditions/logos/usado/thumb.webp'},
+            )
+
+    def test_resumes_from_cursor(self):
+        """A run limited by max_files continues where the previous one stopped"""
+        self.upload((200, 30, 30))
+        for index in range(3):
+            (self.root / 'logos').mkdir(exist_ok=True)
+            (self.root / 'logos' / f'old{index}.png').write_bytes(b'png')
+        age(self.root)
+
+        first = MediaCollector(max_files=2, pause=0).run()
+        second = MediaCollector(pause=0).run()
+        self.assertEqual(first['scanned'], 2)
+        self.assertEqual(first['scanned'] + second['scanned'], 10)
+        self.assertEqual(first['quarantined'] + second['quarantined'], 3)
+
+    def test_purge_renditions_of_deleted_properties(self):
+        """Renditions of long-deleted properties go away unless an active image shares the file"""
+        other = Property.objects.create(owner=self.user, name='Outra', city='Chapada', state='MT')
+        unique = self.upload((200, 30, 30))
+        shared = self.upload((30, 30, 200))
+        self.upload((30, 30, 200), property=other)
+        self.prop.soft_delete()
+        Property.objects.filter(pk=self.prop.pk).update(deleted_at=timezone.now() - timedelta(days=40))
+
+        stats = MediaCollector(pause=0, min_age=timedelta(days=365)).run()
+        self.assertEqual(stats['purged_renditions'], 1)
+        unique_files, shared_files = self.files(unique), self.files(shared)
+        unique.refresh_from_db()
+        self.assertEqual(unique.renditions, {})
+        self.assertTrue((self.root / unique_files[0]).exists())
+        for name in unique_files[1:]:
+            self.assertFalse((self.root / name).exists())
+        for name in shared_files:
+            self.assertTrue((self.root / name).exists())
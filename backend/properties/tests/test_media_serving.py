@@ -0,0 +1,70 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+DIGEST = 'ab' * 32
+CONTENT_PATH = f'images/ab/ab/{DIGEST}.jpg'
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SERVE_MODE='django')
+class MediaServingTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        root = Path(MEDIA_ROOT)
+        (root / CONTENT_PATH).parent.mkdir(parents=True)
+        (root / CONTENT_PATH).write_bytes(bytes(range(256)) * 4)
+        (root / 'logos').mkdir()
+        (root / 'logos' / 'logo.png').write_bytes(b'png')
+        (root / '.quarantine').mkdir()
+        (root / '.quarantine' / 'old.jpg').write_bytes(b'old')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_content_addressed_files_are_immutable(self):
+        """Content-hashed files get a one-year immutable Cache-Control; others a short one"""
+        response = self.client.get(f'/media/{CONTENT_PATH}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(len(b''.join(response.streaming_content)), 1024)
+
+        response = self.client.get('/media/logos/logo.png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+
+    def test_range_requests(self):
+        response = self.client.get(f'/media/{CONTENT_PATH}', HTTP_RANGE='bytes=256-259')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 256-259/1024')
+        self.assertEqual(b''.join(response.streaming_content), bytes([0, 1, 2, 3]))
+
+        response = self.client.get(f'/media/{CONTENT_PATH}', HTTP_RANGE='bytes=-2')
+        self.assertEqual(b''.join(response.streaming_content), bytes([254, 255]))
+
+        response = self.client.get(f'/media/{CONTENT_PATH}', HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_offloaded_modes(self):
+        """The web server gets the file location; Django sends no body"""
+        with self.settings(MEDIA_SERVE_MODE='x-accel-redirect'):
+            response = self.client.get(f'/media/{CONTENT_PATH}')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{CONTENT_PATH}')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response.content, b'')
+
+        with self.settings(MEDIA_SERVE_MODE='x-sendfile'):
+            response = self.client.get('/media/logos/logo.png')
+        self.assertEqual(response['X-Sendfile'], str(Path(MEDIA_ROOT) / 'logos' / 'logo.png'))
+
+    def test_hidden_and_missing_paths(self):
+        for path in ['.quarantine/old.jpg', '../settings.py', 'logos/missing.png']:
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f'/media/{path}').status_code, 404)
+        with self.settings(MEDIA_SERVE_MODE='none'):
+            self.assertEqual(self.client.get('/media/logos/logo.png').status_code, 404)
@@ -0,0 +1,151 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.models import Accommodation, AvailabilityBlock, PriceRule, Property
+from properties.pricing import QuoteEngine, quote_many, windows
+
+WEEKEND = 0b1100000
+
+
+class PricingTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Tarifa',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.room = Accommodation.objects.create(
+            property=self.prop, name='Suíte', base_price=100, cleaning_fee=50, max_guests=2
+        )
+        self.chalet = Accommodation.objects.create(
+            property=self.prop, name='Chalé', base_price=200, max_guests=4
+        )
+        # Uma sexta-feira daqui a pelo menos uma semana
+        today = timezone.localdate()
+        self.friday = today + timedelta(days=(4 - today.weekday()) % 7 + 7)
+        self.monday = self.friday + timedelta(days=3)
+        self.check_out = self.friday + timedelta(days=4)
+        self.stay = {'check_in': self.friday.isoformat(), 'check_out': self.check_out.isoformat()}
+        PriceRule.objects.create(property=self.prop, name='Fim de semana', weekdays=WEEKEND, multiplier='1.5')
+        PriceRule.objects.create(
+            property=self.prop,
+            accommodation=self.room,
+            name='Feriado',
+            period=DateRange(self.friday + timedelta(days=2), self.check_out),
+            multiplier='1.333',
+        )
+
+    def test_nightly_rules_multiply(self):
+        """Fri 100 + Sat 150 + Sun 100*1.5*1.333 + Mon 133.30, plus cleaning"""
+        [quote] = quote_many([(self.room.pk, self.friday, self.check_out, 2)])
+        self.assertEqual(quote.nights, 4)
+        self.assertEqual(quote.nightly_total, Decimal('583.25'))
+        self.assertEqual(quote.total, Decimal('633.25'))
+        self.assertTrue(quote.fits)
+
+    def test_batch_matches_single_quotes_in_two_queries(self):
+        start = self.friday
+        requests = [
+            (accommodation.pk, start + timedelta(days=offset), start + timedelta(days=offset + nights), guests)
+            for accommodation in (self.room, self.chalet)
+            for offset in range(30)
+            for nights in (1, 3, 7)
+            for guests in (1, 3)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            quotes = quote_many(requests)
+        self.assertEqual(len(context.captured_queries), 2)
+        self.assertEqual(len(quotes), len(requests))
+        for request in requests[::37]:
+            self.assertEqual(quotes[requests.index(request)], quote_many([request])[0])
+
+    def test_quote_endpoint(self):
+        response = self.client.post(reverse('public-quotes'), {
+            'accommodations': [str(self.room.pk), str(self.chalet.pk)],
+            'stays': [self.stay],
+            'guests': [3],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        room, chalet = response.data['quotes']
+        self.assertEqual(room['total'], '633.25')
+        self.assertFalse(room['fits'])
+        self.assertEqual(chalet['total'], '1000.00')
+        self.assertTrue(chalet['fits'])
+
+        too_many = {
+            'accommodations': [str(self.room.pk)] * 200,
+            'stays': [self.stay] * 10,
+        }
+        response = self.client.post(reverse('public-quotes'), too_many, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_dates_limited_to_horizon(self):
+        """Far-apart stays get separate price tables; dates past the horizon are rejected"""
+        far = self.friday + timedelta(days=700)
+        stays = [(self.friday, self.check_out), (far, far + timedelta(days=2))]
+        self.assertEqual(windows(stays), stays)
+
+        engine = QuoteEngine([self.room])
+        first, second = engine.quote([(self.room.pk, *stays[0], 1), (self.room.pk, *stays[1], 1)])
+        self.assertEqual(first.total, Decimal('633.25'))
+        self.assertEqual(second, quote_many([(self.room.pk, *stays[1], 1)])[0])
+
+        for check_in, check_out in ((date(1, 1, 1), date(1, 1, 2)), (date(9999, 1, 1), date(9999, 1, 2))):
+            response = self.client.post(reverse('public-quotes'), {
+                'accommodations': [str(self.room.pk)],
+                'stays': [self.stay, {'check_in': check_in.isoformat(), 'check_out': check_out.isoformat()}],
+            }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_public_list_quote_from(self):
+        """Cheapest free accommodation that fits the guests; none left filters the property out"""
+        url = reverse('public-property-list')
+        stay = self.stay
+        response = self.client.get(url, stay)
+        self.assertEqual(response.data['results'][0]['quote_from'], '633.25')
+
+        response = self.client.get(url, {**stay, 'guests': 3})
+        self.assertEqual(response.data['results'][0]['quote_from'], '1000.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AvailabilityBlock.objects.create(accommodation=self.chalet, period=DateRange(self.friday, self.check_out))
+        response = self.client.get(url, {**stay, 'guests': 3})
+        self.assertEqual(response.data['results'], [])
+
+        response = self.client.get(url, {'check_in': self.stay['check_in']})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rules_scoped_to_owner(self):
+        other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse('price-rule-list'), {
+            'property': str(self.prop.pk), 'name': 'Alta', 'multiplier': '2'
+        })
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(reverse('price-rule-list')).data['count'], 0)
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse('price-rule-list'), {
+            'property': str(self.prop.pk), 'name': 'Alta', 'multiplier': '2',
+            'start': '2027-01-01', 'end': '2027-02-01',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['end'], '2027-02-01')
@@ -0,0 +1,51 @@
+from decimal import Decimal
+from django.core.management import call_command
+from django.test import TestCase
+from accounts.models import User
+from properties.models import Property, Accommodation, PropertyListing
+
+
+class PropertyListingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Listada',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+
+    def test_listing_tracks_accommodations(self):
+        """Listing should keep active accommodation count and price range up to date"""
+        Accommodation.objects.create(property=self.prop, name='Quarto', base_price=300)
+        suite = Accommodation.objects.create(property=self.prop, name='Suíte', base_price=500)
+
+        listing = PropertyListing.objects.get(pk=self.prop.pk)
+        self.assertEqual(listing.accommodations_count, 2)
+        self.assertEqual(listing.min_price, Decimal('300.00'))
+        self.assertEqual(listing.max_price, Decimal('500.00'))
+
+        suite.soft_delete()
+        listing.refresh_from_db()
+        self.assertEqual(listing.accommodations_count, 1)
+        self.assertEqual(listing.max_price, Decimal('300.00'))
+
+    def test_listing_removed_on_soft_delete(self):
+        self.prop.soft_delete()
+        self.assertFalse(PropertyListing.objects.filter(pk=self.prop.pk).exists())
+
+    def test_rebuild_command(self):
+        PropertyListing.objects.all().delete()
+        Property.objects.filter(pk=self.prop.pk).update(name='Pousada Renomeada')
+
+        call_command('rebuild_property_listings', verbosity=0)
+
+        listing = PropertyListing.objects.get(pk=self.prop.pk)
+        self.assertEqual(listing.name, 'Pousada Renomeada')
+        self.assertEqual(listing.slug, self.prop.slug)
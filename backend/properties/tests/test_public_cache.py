@@ -0,0 +1,118 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.models import Property, Accommodation
+
+
+class PublicPropertiesCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prop = Property.objects.create(
+                owner=self.user,
+                name='Pousada Cache',
+                city='Chapada',
+                state='MT',
+                is_active=True
+            )
+
+    def test_detail_served_from_cache(self):
+        """Second request for the same slug should not hit the database, validators included"""
+        url = reverse('property-public', kwargs={'slug': self.prop.slug})
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Pousada Cache')
+
+    def test_detail_invalidated_on_change(self):
+        """Property and accommodation changes should invalidate the landing page"""
+        url = reverse('property-public', kwargs={'slug': self.prop.slug})
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prop.name = 'Pousada Renomeada'
+            self.prop.save()
+        response = self.client.get(url)
+        self.assertEqual(response.data['name'], 'Pousada Renomeada')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Accommodation.objects.create(property=self.prop, name='Suíte', base_price=300)
+        response = self.client.get(url)
+        self.assertEqual(response.data['accommodations_count'], 1)
+
+    def test_list_invalidated_on_new_property(self):
+        url = reverse('public-property-list')
+        self.assertEqual(len(self.client.get(url).data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Property.objects.create(
+                owner=self.user,
+                name='Pousada Nova',
+                city='Chapada',
+                state='MT',
+                is_active=True
+            )
+        self.assertEqual(len(self.client.get(url).data['results']), 2)
+
+    def test_missing_slug_not_cached(self):
+        url = reverse('property-public', kwargs={'slug': 'nao-existe'})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PublicPropertyConditionalGetTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada ETag',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+        self.url = reverse('property-public', kwargs={'slug': self.prop.slug})
+
+    def test_not_modified_with_matching_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_not_modified_since(self):
+        response = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_with_accommodations(self):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            accommodation = Accommodation.objects.create(property=self.prop, name='Suíte', base_price=300)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            accommodation.delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
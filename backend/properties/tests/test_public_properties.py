@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -14,6 +15,7 @@ class PublicPropertiesTests(APITestCase):
         super().setUpClass()
 
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(
             username='owner', 
             email='test@example.com', 
@@ -91,3 +93,221 @@ class PublicPropertiesTests(APITestCase):
         # Test 4: Combined Case and Unaccent
         response = self.client.get(url, {'search': 'VEU'})
         self.assertEqual(len(response.data['results']), 1)
+
+    def test_search_properties_typo_tolerant(self):
+        """Should find properties despite typos and rank closest match first"""
+        Property.objects.create(
+            owner=self.user,
+            name='Pousada Chapadão',
+            city='Cuiabá',
+            state='MT',
+            is_active=True
+        )
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'search': 'pousda chapda'})
+
+        names = [item['name'] for item in response.data['results']]
+        self.assertIn('Pousada Ativa', names)
+        self.assertNotIn('Pousada Inativa', names)
+
+        for term in ('chapadao', 'chapdao'):
+            response = self.client.get(url, {'search': term})
+            names = [item['name'] for item in response.data['results']]
+            self.assertEqual(names[0], 'Pousada Chapadão')
+
+    def test_fulltext_search_ranked(self):
+        """Should search description and accommodation names, ranking name matches first"""
+        by_description = Property.objects.create(
+            owner=self.user,
+            name='Pousada Sol',
+            city='Nobres',
+            state='MT',
+            description='Trilhas até as cachoeiras do parque.',
+            is_active=True
+        )
+        by_name = Property.objects.create(
+            owner=self.user,
+            name='Recanto da Cachoeira',
+            city='Nobres',
+            state='MT',
+            is_active=True
+        )
+        Accommodation.objects.create(
+            property=self.prop1,
+            name='Chalé Família',
+            base_price=400
+        )
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'q': 'cachoeira'})
+        names = [item['name'] for item in response.data['results']]
+        self.assertEqual(names, [by_name.name, by_description.name])
+
+        response = self.client.get(url, {'q': 'chale'})
+        names = [item['name'] for item in response.data['results']]
+        self.assertEqual(names, ['Pousada Ativa'])
+
+    def test_cursor_pagination(self):
+        """Should walk the list with opaque cursors and only count on request"""
+        for index in range(3):
+            Property.objects.create(
+                owner=self.user,
+                name=f'Pousada Extra {index}',
+                city='Chapada',
+                state='MT',
+                is_active=True
+            )
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        first_page = [item['name'] for item in response.data['results']]
+        self.assertEqual(first_page, ['Pousada Extra 2', 'Pousada Extra 1'])
+
+        response = self.client.get(response.data['next'])
+        second_page = [item['name'] for item in response.data['results']]
+        self.assertEqual(second_page, ['Pousada Extra 0', 'Pousada Ativa'])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([item['name'] for item in response.data['results']], first_page)
+
+        response = self.client.get(url, {'pagination': 'cursor', 'count': 'true'})
+        self.assertEqual(response.data['count'], 4)
+
+    def test_cursor_pagination_invalid_cursor(self):
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'cursor': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_facets(self):
+        """Should return facet counts for the current filter"""
+        Accommodation.objects.create(
+            property=self.prop1, name='Chalé', accommodation_type='cabin',
+            max_guests=4, base_price=350
+        )
+        Accommodation.objects.create(
+            property=self.prop1, name='Chalé Duplo', accommodation_type='cabin',
+            max_guests=2, base_price=250
+        )
+        Property.objects.create(
+            owner=self.user,
+            name='Pousada Sem Quartos',
+            city='Cuiabá',
+            state='MT',
+            is_active=True
+        )
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'facets': 'true'})
+        facets = response.data['facets']
+
+        self.assertEqual(facets['state'], [{'value': 'MT', 'count': 2}])
+        self.assertEqual(len(facets['city']), 2)
+        self.assertEqual(facets['accommodation_type'], [{'value': 'cabin', 'label': 'Chalé', 'count': 1}])
+        self.assertEqual(facets['max_guests'], [
+            {'min': 1, 'max': 2, 'count': 1},
+            {'min': 3, 'max': 4, 'count': 1},
+        ])
+        self.assertEqual(facets['base_price'], [
+            {'min': 200, 'max': 300, 'count': 1},
+            {'min': 300, 'max': 500, 'count': 1},
+        ])
+
+        response = self.client.get(url, {'facets': 'true', 'search': 'Ativa'})
+        self.assertEqual(response.data['facets']['state'], [{'value': 'MT', 'count': 1}])
+
+    def test_geo_filters(self):
+        """Should filter by radius (sorted by distance) and by bounding box"""
+        self.prop1.latitude = -15.4606
+        self.prop1.longitude = -55.7500
+        self.prop1.save()
+        Property.objects.create(
+            owner=self.user,
+            name='Pousada Perto',
+            city='Chapada',
+            state='MT',
+            latitude=-15.3500,
+            longitude=-55.7000,
+            is_active=True
+        )
+        Property.objects.create(
+            owner=self.user,
+            name='Pousada Longe',
+            city='Bonito',
+            state='MS',
+            latitude=-21.1261,
+            longitude=-56.4836,
+            is_active=True
+        )
+
+        url = reverse('public-property-list')
+        response = self.client.get(url, {'near': '-15.4606,-55.7500', 'radius_km': 30})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [item['name'] for item in response.data['results']]
+        self.assertEqual(names, ['Pousada Ativa', 'Pousada Perto'])
+        self.assertEqual(response.data['results'][0]['distance_km'], 0)
+
+        response = self.client.get(url, {'bbox': '-57,-22,-56,-20'})
+        names = [item['name'] for item in response.data['results']]
+        self.assertEqual(names, ['Pousada Longe'])
+
+        response = self.client.get(url, {'near': 'invalido'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_geo_params_validated(self):
+        """Non-finite, out-of-range or inverted coordinates are rejected with 400"""
+        url = reverse('public-property-list')
+        invalid = [
+            ('near', {'near': 'inf,0'}),
+            ('near', {'near': 'nan,0'}),
+            ('near', {'near': '0,-inf'}),
+            ('near', {'near': '91,0'}),
+            ('near', {'near': '0,181'}),
+            ('radius_km', {'near': '0,0', 'radius_km': 'nan'}),
+            ('radius_km', {'near': '0,0', 'radius_km': 'inf'}),
+            ('bbox', {'bbox': '-56,-22,-57,-20'}),
+            ('bbox', {'bbox': '-57,-20,-56,-22'}),
+            ('bbox', {'bbox': '-57,-95,-56,-20'}),
+            ('bbox', {'bbox': '-190,-22,-56,-20'}),
+            ('bbox', {'bbox': 'nan,-22,-56,-20'}),
+        ]
+        for param, query in invalid:
+            with self.subTest(query=query):
+                response = self.client.get(url, query)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn(param, response.data)
+
+        response = self.client.get(url, {'near': '-90,180', 'bbox': '-180,-90,180,90'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_autocomplete(self):
+        """Should suggest active properties by name prefix and distinct cities"""
+        Property.objects.create(
+            owner=self.user,
+            name='Pousada Árvore',
+            city='Chapada dos Guimarães',
+            state='MT',
+            is_active=True
+        )
+        url = reverse('public-autocomplete')
+
+        response = self.client.get(url, {'q': 'pousada a'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['name'] for item in response.data['properties']],
+            ['Pousada Árvore', 'Pousada Ativa'],
+        )
+
+        response = self.client.get(url, {'q': 'guima'})
+        self.assertEqual(response.data['properties'], [])
+        self.assertEqual(response.data['cities'], [{'city': 'Chapada dos Guimarães', 'state': 'MT'}])
+
+        response = self.client.get(url, {'q': 'chap', 'limit': 1})
+        self.assertEqual(response.data['cities'], [{'city': 'Chapada', 'state': 'MT'}])
+
+        response = self.client.get(url, {'q': 'c'})
+        self.assertEqual(response.data, {'properties': [], 'cities': []})
@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.models import Property, Accommodation
+
+
+class QueryOptimizationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def create_properties(self, count):
+        for index in range(count):
+            prop = Property.objects.create(
+                owner=self.user,
+                name=f'Pousada {Property.objects.count()}',
+                city='Chapada',
+                state='MT',
+                is_active=True
+            )
+            Accommodation.objects.create(property=prop, name='Quarto', base_price=300)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_endpoints_constant_queries(self):
+        """List endpoints should not run one query per row"""
+        for url in [reverse('property-list'), reverse('accommodation-list')]:
+            with self.subTest(url=url):
+                self.create_properties(1)
+                baseline = self.count_queries(url)
+                self.create_properties(5)
+                self.assertEqual(self.count_queries(url), baseline)
+
+    def test_counts_are_annotated(self):
+        self.create_properties(1)
+        response = self.client.get(reverse('property-list'))
+        item = response.data['results'][0]
+        self.assertEqual(item['accommodations_count'], 1)
+        self.assertEqual(item['images_count'], 0)
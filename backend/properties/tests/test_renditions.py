@@ -0,0 +1,92 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image as PILImage
+from rest_framework.test import APITestCase
+from accounts.models import User
+from properties.models import Image, Property, PropertyListing
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def jpeg_upload(size=(2400, 1600)):
+    buffer = io.BytesIO()
+    PILImage.new('RGB', size, (30, 120, 200)).save(buffer, 'JPEG')
+    return SimpleUploadedFile('foto.jpg', buffer.getvalue(), content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ImageRenditionsTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada Fotos',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+
+    def test_renditions_generated_on_upload(self):
+        """Uploading an image should produce every size in WebP and JPEG"""
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(property=self.prop, image=jpeg_upload())
+
+        image.refresh_from_db()
+        self.assertEqual(image.renditions['source'], image.image.name)
+        self.assertEqual(
+            (image.renditions['card']['width'], image.renditions['card']['height']), (800, 533)
+        )
+        for size in ('thumb', 'card', 'hero'):
+            for extension in ('webp', 'jpeg'):
+                self.assertTrue(image.image.storage.exists(image.renditions[size][extension]))
+
+        listing = PropertyListing.objects.get(pk=self.prop.pk)
+        self.assertEqual(listing.cover_renditions, image.renditions)
+
+    def test_serializers_return_rendition_urls(self):
+        """Public payloads should expose absolute rendition URLs"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Image.objects.create(property=self.prop, image=jpeg_upload())
+
+        response = self.client.get(reverse('public-property-list'))
+        cover = response.data['results'][0]['cover_renditions']
+        self.assertTrue(cover['card']['webp'].startswith('http://testserver/'))
+        self.assertTrue(cover['card']['webp'].endswith('/card.webp'))
+
+        response = self.client.get(reverse('property-public', kwargs={'slug': self.prop.slug}))
+        self.assertIn('hero', response.data['images'][0]['renditions'])
+
+    def test_metadata_stored(self):
+        """Dimensions and size are read at upload; color and placeholder come with the renditions"""
+        image = Image.objects.create(property=self.prop, image=jpeg_upload())
+        self.assertEqual((image.width, image.height), (2400, 1600))
+        self.assertEqual(image.file_size, image.image.size)
+        self.assertEqual(image.placeholder, '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image = Image.objects.create(property=self.prop, image=jpeg_upload())
+        image.refresh_from_db()
+        self.assertRegex(image.dominant_color, r'^#[0-9a-f]{6}$')
+        self.assertTrue(image.placeholder.startswith('data:image/webp;base64,'))
+
+        response = self.client.get(reverse('property-public', kwargs={'slug': self.prop.slug}))
+        payload = next(item for item in response.data['images'] if item['id'] == str(image.pk))
+        self.assertEqual((payload['width'], payload['height']), (2400, 1600))
+        self.assertEqual(payload['placeholder'], image.placeholder)
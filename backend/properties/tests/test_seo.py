@@ -0,0 +1,52 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase
+from accounts.models import User
+from properties.models import Property
+from properties.seo import SeoGenerator
+
+
+class SeoFilesTests(TestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+        self.prop = Property.objects.create(
+            owner=self.user,
+            name='Pousada SEO',
+            description='Vista para o cânion',
+            city='Chapada',
+            state='MT',
+            is_active=True
+        )
+
+    def test_generates_sitemap_and_snapshots(self):
+        """Should write the sitemap index, one shard and a snapshot per active property"""
+        stats = SeoGenerator(self.root).run()
+        self.assertEqual(stats['snapshots'], 1)
+
+        snapshot = json.loads((self.root / 'properties' / f'{self.prop.slug}.json').read_text())
+        self.assertEqual(snapshot['title'], 'Pousada SEO - Chapada/MT')
+        self.assertEqual(snapshot['description'], 'Vista para o cânion')
+        self.assertIn('sitemaps/sitemap-1.xml', (self.root / 'sitemap.xml').read_text())
+        self.assertIn(f'/public/{self.prop.slug}</loc>', (self.root / 'sitemaps' / 'sitemap-1.xml').read_text())
+
+    def test_incremental_run(self):
+        """Unchanged properties are skipped; deactivated ones lose their snapshot"""
+        generator = SeoGenerator(self.root)
+        generator.run()
+        self.assertEqual(generator.run()['snapshots'], 0)
+
+        self.prop.is_active = False
+        self.prop.save()
+        stats = generator.run()
+        self.assertEqual(stats['removed'], 1)
+        self.assertFalse((self.root / 'properties' / f'{self.prop.slug}.json').exists())
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from properties import models as property_models
+from properties.models import Property
+from properties.slugs import assign_slugs, taken_slugs
+
+
+class PropertySlugTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='owner',
+            email='test@example.com',
+            password='password123',
+            is_owner=True
+        )
+
+    def create(self, name, **kwargs):
+        return Property.objects.create(owner=self.user, name=name, city='Chapada', state='MT', **kwargs)
+
+    def test_sequential_suffixes(self):
+        """Repeated names should get the first free -n suffix"""
+        slugs = [self.create('Pousada do Sol').slug for _ in range(3)]
+        self.assertEqual(slugs, ['pousada-do-sol', 'pousada-do-sol-1', 'pousada-do-sol-2'])
+
+        Property.objects.filter(slug='pousada-do-sol-1').delete()
+        self.create('Pousada do Sol Nascente')
+        self.assertEqual(self.create('Pousada do Sol').slug, 'pousada-do-sol-1')
+
+    def test_taken_slugs_filtered_in_sql(self):
+        """Other slugs sharing the prefix are not fetched"""
+        for name in ['Pousada', 'Pousada', 'Pousada do Sol', 'Pousadas', 'Pousada 7']:
+            self.create(name)
+        with CaptureQueriesContext(connection) as context:
+            taken = taken_slugs(Property, ['pousada'])
+        self.assertEqual(taken, {'pousada': {'pousada', 'pousada-1', 'pousada-7'}})
+        self.assertIn('~', context.captured_queries[0]['sql'])
+
+    def test_retry_on_concurrent_insert(self):
+        """A slug taken between the lookup and the INSERT should be retried"""
+        self.create('Pousada do Sol')
+        real_taken_slugs = property_models.taken_slugs
+        # Primeira consulta "antes" da outra transação gravar o slug
+        lookups = iter([lambda *args, **kwargs: {'pousada-do-sol': set()}, real_taken_slugs])
+        with mock.patch.object(
+            property_models, 'taken_slugs', side_effect=lambda *args, **kwargs: next(lookups)(*args, **kwargs)
+        ) as taken_slugs:
+            prop = self.create('Pousada do Sol')
+
+        self.assertEqual(prop.slug, 'pousada-do-sol-1')
+        self.assertEqual(taken_slugs.call_count, 2)
+
+    def test_assign_slugs_bulk(self):
+        """Bulk allocation should use one query and keep the batch unique"""
+        self.create('Pousada do Sol')
+        new = [
+            Property(owner=self.user, name=name, city='Chapada', state='MT')
+            for name in ['Pousada do Sol', 'Pousada do Sol', 'Hotel Lua', '!!!']
+        ]
+        with self.assertNumQueries(1):
+            assign_slugs(new)
+
+        self.assertEqual(
+            [prop.slug for prop in new],
+            ['pousada-do-sol-1', 'pousada-do-sol-2', 'hotel-lua', 'propriedade'],
+        )
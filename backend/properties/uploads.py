@@ -0,0 +1,224 @@
+"""
+Upload de imagens em partes (retomável).
+
+Protocolo (ver `ImageUploadViewSet`):
+
+1. `POST /image-uploads/` cria a sessão (nome, tamanho, SHA-256 opcional e destino);
+2. `PUT /image-uploads/<id>/` envia cada parte com `Content-Range: bytes início-fim/total`
+   (e `X-Chunk-SHA256` opcional). A parte precisa começar em `received`; depois
+   de uma queda, `GET /image-uploads/<id>/` diz de onde continuar;
+3. `POST /image-uploads/<id>/finalize/` confere tamanho e SHA-256 e cria a `Image`.
+
+As partes são copiadas do corpo da requisição direto para o arquivo temporário,
+em blocos, sem passar pelos parsers do DRF nem ficar inteiras em memória.
+
+`bulk_create_images` cria uma galeria inteira enviada numa requisição multipart.
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+
+from celery import group
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .auditlog import log_bulk_create
+from .cache import invalidate_public_properties
+from .listings import refresh_listings
+from .models import Image, ImageUpload, Property
+from .renditions import read_dimensions
+from .tasks import generate_image_renditions
+
+COPY_BUFFER = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+class UploadError(Exception):
+    """Parte ou sessão inválida; a mensagem vai para o cliente."""
+
+
+class OffsetMismatch(UploadError):
+    """A parte não começa onde o servidor parou (o cliente deve consultar `received`)."""
+
+
+def upload_dir():
+    path = Path(settings.CHUNKED_UPLOAD_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def upload_path(upload):
+    return upload_dir() / f'{upload.pk}.part'
+
+
+def parse_content_range(header, total_size):
+    """(início, tamanho) da parte a partir de `Content-Range`."""
+    match = CONTENT_RANGE.match(header or '')
+    if not match:
+        raise UploadError('Content-Range deve ser "bytes início-fim/total".')
+    start, end, total = (int(group) for group in match.groups())
+    if total != total_size or end < start or end >= total:
+        raise UploadError('Content-Range fora do tamanho declarado.')
+    length = end - start + 1
+    if length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        raise UploadError(f'Parte maior que {settings.CHUNKED_UPLOAD_MAX_CHUNK} bytes.')
+    return start, length
+
+
+def write_chunk(upload, stream, start, length, chunk_sha256=''):
+    """
+    Grava `length` bytes de `stream` a partir de `start` e avança `received`.
+
+    Chamar com a sessão travada (`select_for_update`). Se a parte vier
+    incompleta ou com hash diferente, o arquivo volta ao tamanho anterior.
+    """
+    if upload.status != ImageUpload.Status.PENDING:
+        raise UploadError('Upload já finalizado.')
+    if start != upload.received:
+        raise OffsetMismatch(f'A próxima parte deve começar em {upload.received}.')
+
+    path = upload_path(upload)
+    digest = hashlib.sha256()
+    written = 0
+    with open(path, 'ab') as file:
+        file.truncate(start)
+        while written < length:
+            block = stream.read(min(COPY_BUFFER, length - written))
+            if not block:
+                break
+            file.write(block)
+            digest.update(block)
+            written += len(block)
+
+        if written != length or (chunk_sha256 and digest.hexdigest() != chunk_sha256.lower()):
+            file.truncate(start)
+            raise UploadError('Parte incompleta ou com checksum diferente; envie de novo.')
+
+    upload.received = start + length
+    upload.save(update_fields=['received', 'updated_at'])
+    return upload.received
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(COPY_BUFFER), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize(upload):
+    """Confere o arquivo recebido e cria a `Image`. Chamar com a sessão travada."""
+    if upload.status != ImageUpload.Status.PENDING:
+        raise UploadError('Upload já finalizado.')
+    if upload.received != upload.size:
+        raise UploadError(f'Recebidos {upload.received} de {upload.size} bytes.')
+
+    path = upload_path(upload)
+    if upload.sha256 and file_sha256(path) != upload.sha256.lower():
+        raise UploadError('SHA-256 do arquivo não confere; reinicie o upload.')
+
+    with open(path, 'rb') as file:
+        if read_dimensions(file) == (None, None):
+            raise UploadError('O arquivo enviado não é uma imagem válida.')
+        # Image.save grava o arquivo no caminho do SHA-256 (ver content.py)
+        image = Image.objects.create(
+            property=upload.property,
+            accommodation=upload.accommodation,
+            caption=upload.caption,
+            order=upload.order,
+            image=File(file, name=upload.filename),
+        )
+
+    upload.status = ImageUpload.Status.COMPLETE
+    upload.image = image
+    upload.save(update_fields=['status', 'image', 'updated_at'])
+    transaction.on_commit(lambda: path.unlink(missing_ok=True))
+    return image
+
+
+def bulk_create_images(files, captions=(), actor=None, *, property=None, accommodation=None):
+    """
+    Cria uma `Image` por arquivo, com `order` consecutivo depois das existentes.
+
+    Os arquivos são gravados no storage um a um (em blocos, ver content.py) e
+    as linhas entram num único `bulk_create`. Como ele não dispara signals, a
+    auditoria, a capa da listagem, o cache público e as versões são tratados
+    aqui, com uma chamada para o lote inteiro. Chamar dentro de uma transação.
+    """
+    target = {'property': property} if property else {'accommodation': accommodation}
+    owner_property = property or accommodation.property
+
+    # Trava a propriedade: dois lotes simultâneos não recebem a mesma ordem
+    list(Property.objects.select_for_update().filter(pk=owner_property.pk).values_list('pk'))
+    last = Image.objects.filter(**target).aggregate(last=Max('order'))['last']
+    start = 0 if last is None else last + 1
+
+    images = []
+    for index, file in enumerate(files):
+        image = Image(
+            **target,
+            caption=captions[index] if index < len(captions) else '',
+            order=start + index,
+            image=file,
+        )
+        image.store_upload()
+        images.append(image)
+
+    processed = Image.processed_files(images)
+    for image in images:
+        image.copy_derived(processed.get(image.image.name))
+    Image.objects.bulk_create(images)
+    log_bulk_create(images, actor)
+
+    if property:
+        refresh_listings([property.pk])
+    image_ids = [image.pk for image in images]
+
+    def after_commit():
+        invalidate_public_properties(owner_property.slug)
+        group(generate_image_renditions.s(pk) for pk in image_ids).delay()
+
+    transaction.on_commit(after_commit)
+    return images
+
+
+def cleanup(older_than=None):
+    """
+    Remove sessões pendentes sem atividade há mais de `older_than` (padrão:
+    `CHUNKED_UPLOAD_TTL` horas), sessões concluídas antigas e arquivos
+    temporários sem sessão. Retorna (sessões removidas, arquivos removidos).
+    """
+    if older_than is None:
+        older_than = timedelta(hours=settings.CHUNKED_UPLOAD_TTL)
+    cutoff = timezone.now() - older_than
+
+    expired = ImageUpload.objects.filter(updated_at__lt=cutoff)
+    sessions, _ = expired.delete()
+
+    # Arquivos cuja sessão não existe mais (removida acima, finalizada ou
+    # cancelada). Só os sem escrita desde `cutoff`: uma sessão criada depois
+    # da leitura de `alive` tem o arquivo recente e não pode perdê-lo.
+    files = 0
+    alive = {str(pk) for pk in ImageUpload.objects.filter(
+        status=ImageUpload.Status.PENDING
+    ).values_list('pk', flat=True)}
+    with os.scandir(upload_dir()) as entries:
+        for entry in entries:
+            name, extension = os.path.splitext(entry.name)
+            if extension != '.part' or name in alive:
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff.timestamp():
+                    continue
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                # Finalizada ou cancelada enquanto listávamos
+                continue
+            files += 1
+    return sessions, files
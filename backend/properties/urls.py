@@ -1,15 +1,22 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import PropertyViewSet, PropertyPublicView, AccommodationViewSet, ImageViewSet, PropertyPublicListView
+from .views import PropertyViewSet, PropertyPublicView, AccommodationViewSet, AvailabilityBlockViewSet, BookingViewSet, PublicBookingViewSet, PriceRuleViewSet, ImageViewSet, ImageUploadViewSet, PropertyPublicListView, PropertyAutocompleteView, PropertyQuoteView
 
 router = DefaultRouter()
 router.register(r'properties', PropertyViewSet, basename='property')
 router.register(r'accommodations', AccommodationViewSet, basename='accommodation')
+router.register(r'availability-blocks', AvailabilityBlockViewSet, basename='availability-block')
+router.register(r'bookings', BookingViewSet, basename='booking')
+router.register(r'public/bookings', PublicBookingViewSet, basename='public-booking')
+router.register(r'price-rules', PriceRuleViewSet, basename='price-rule')
 router.register(r'images', ImageViewSet, basename='image')
+router.register(r'image-uploads', ImageUploadViewSet, basename='image-upload')
 
 urlpatterns = [
     path('', include(router.urls)),
     path('public/properties/', PropertyPublicListView.as_view(), name='public-property-list'),
+    path('public/autocomplete/', PropertyAutocompleteView.as_view(), name='public-autocomplete'),
+    path('public/quotes/', PropertyQuoteView.as_view(), name='public-quotes'),
     path('public/properties/<slug:slug>/', PropertyPublicView.as_view(), name='property-public'),
 ]
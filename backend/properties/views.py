@@ -1,25 +1,64 @@
-from rest_framework import viewsets, generics, permissions, status, filters
+from rest_framework import viewsets, generics, mixins, permissions, status, filters
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.response import Response
-from django.db import models
-from django.db.models import Func
+from rest_framework.views import APIView
+import hashlib
+import math
+from django.db import models, transaction
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Case, Exists, F, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import JSONObject
 from django.utils import timezone
-from django.db.models.functions import Lower
-from .models import Property, Accommodation, Image
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from . import bookings, uploads
+from .autocomplete import autocomplete
+from .availability import busy_periods, free_filter, matching_accommodations
+from .cache import (
+    get_or_compute,
+    invalidate_public_properties,
+    public_autocomplete_key,
+    public_facets_key,
+    public_list_key,
+    public_property_key,
+    public_property_validators_key,
+)
+from .facets import compute_facets
+from .geo import near, within_bbox
+from .listings import refresh_listings
+from .models import Property, Accommodation, AvailabilityBlock, Booking, Image, ImageUpload, PriceRule, PropertyListing
+from .optimization import QueryOptimizationMixin
+from .pagination import KeysetPagination
+from .pricing import quote_listings, quote_many
+from .search import fulltext_search, trigram_search
 from .serializers import (
     PropertyListSerializer,
     PropertyDetailSerializer,
     PropertyCreateSerializer,
     PropertyPublicSerializer,
+    PropertyListingSerializer,
     AccommodationListSerializer,
     AccommodationDetailSerializer,
     AccommodationCreateSerializer,
-    ImageSerializer
+    AvailabilityBlockSerializer,
+    CalendarSerializer,
+    StaySerializer,
+    BookingSerializer,
+    BookingHoldSerializer,
+    PriceRuleSerializer,
+    QuoteRequestSerializer,
+    QuoteSerializer,
+    ImageSerializer,
+    ImageFromHashSerializer,
+    ImageBulkUploadSerializer,
+    ImageReorderSerializer,
+    ImageUploadSerializer,
 )
 
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(QueryOptimizationMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD de propriedades.
     
@@ -56,7 +95,7 @@ class PropertyViewSet(viewsets.ModelViewSet):
         # Filtra propriedades onde o usuário tem registro em PropertyAccess
         return Property.objects.filter(
             accesses__user=user
-        ).distinct().prefetch_related('images')
+        ).distinct()
     
     def perform_create(self, serializer):
         """Associa a propriedade ao usuário autenticado"""
@@ -67,10 +106,6 @@ class PropertyViewSet(viewsets.ModelViewSet):
         instance.soft_delete()
 
 
-
-class Unaccent(Func):
-    function = 'UNACCENT'
-
 class PropertyPublicListView(generics.ListAPIView):
     """
     Lista pública de todas as propriedades ativas no marketplace.
@@ -78,30 +113,286 @@ class PropertyPublicListView(generics.ListAPIView):
     **Permissões:** Nenhuma (Público)
     
     **Filtros:**
-    - `search`: Busca por nome ou cidade
+    - `search`: Busca por nome ou cidade, sem acento e tolerante a erros de
+      digitação (ex: "pousda chapda"). Resultados ordenados por similaridade.
+    - `q`: Busca textual em português sobre nome, cidade, descrição e nomes
+      das acomodações. Resultados ordenados por relevância (`ts_rank`).
+    
+    **Geográficos:**
+    - `near=lat,lng` e `radius_km` (padrão 30, máximo 500): propriedades no
+      raio, da mais próxima para a mais distante (`distance_km` na resposta).
+    - `bbox=oeste,sul,leste,norte`: propriedades dentro do retângulo do mapa
+      (oeste ≤ leste, sul ≤ norte).
+    
+    **Paginação:**
+    - Padrão: por número de página (`page`), com `count`.
+    - `pagination=cursor`: keyset sobre `(created_at, id)` para o scroll infinito.
+      Segue os links `next`/`previous`; o total só vem com `count=true`.
+      Neste modo a ordem é sempre a mais recente primeiro, mesmo com busca.
+    
+    **Facetas:** Com `facets=true`, a resposta traz `facets` com as contagens
+    de propriedades por estado, cidade, tipo de acomodação, faixa de hóspedes e
+    faixa de preço para o filtro atual, calculadas em uma única query.
+    
+    **Hóspedes e datas:**
+    - `guests`: só propriedades com alguma acomodação ativa para esse número de
+      hóspedes.
+    - `check_in` e `check_out` (YYYY-MM-DD, saída exclusiva): e que esteja
+      livre na estadia (sem bloqueio nem reserva ativa; ver
+      `properties/availability.py`).
+    
+    Com qualquer um deles, cada propriedade traz `accommodations`: as que
+    atendem, da mais barata à mais cara. O filtro é um `EXISTS` com anti-join
+    nos índices GiST das ocupações, e as acomodações vêm na mesma query da
+    página. Com as datas, cada acomodação traz `quote` (total da estadia) e a
+    propriedade, `quote_from` (o menor deles).
+    
+    **Cache:** Respostas cacheadas por URL e invalidadas quando qualquer
+    propriedade, acomodação, imagem, bloqueio ou regra de preço muda (ver
+    `properties/cache.py`). Reservas não invalidam: uma acomodação recém
+    reservada pode aparecer livre por até `PUBLIC_CACHE_TIMEOUT`.
+    
+    Lê do read model `PropertyListing` (capa, contagem de acomodações e faixa
+    de preço já calculadas): cada página é uma única query indexada.
     """
-    serializer_class = PropertyPublicSerializer
+    serializer_class = PropertyListingSerializer
     permission_classes = [AllowAny]
-    # filter_backends = [filters.SearchFilter] # Removido para usar lógica customizada com Unaccent
-    # search_fields = ['name', 'city']
+    DEFAULT_RADIUS_KM = 30
+    MAX_RADIUS_KM = 500
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
     
     def get_queryset(self):
-        queryset = Property.objects.filter(is_active=True).select_related('owner').prefetch_related('images').order_by('-created_at')
+        queryset = PropertyListing.objects.defer('search_vector').order_by('-created_at')
         
-        search_term = self.request.query_params.get('search', None)
+        search_term = self.request.query_params.get('search', '').strip()
         if search_term:
-            queryset = queryset.annotate(
-                name_unaccent=Unaccent(Lower('name')),
-                city_unaccent=Unaccent(Lower('city'))
-            ).filter(
-                models.Q(name_unaccent__icontains=Unaccent(Lower(models.Value(search_term)))) |
-                models.Q(city_unaccent__icontains=Unaccent(Lower(models.Value(search_term))))
-            )
+            queryset = trigram_search(queryset, search_term)
+        
+        text_query = self.request.query_params.get('q', '').strip()
+        if text_query:
+            queryset = fulltext_search(queryset, text_query)
+        
+        bbox = self.request.query_params.get('bbox')
+        if bbox:
+            west, south, east, north = self.parse_coordinates('bbox', bbox, 4)
+            if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+                raise ValidationError({
+                    'bbox': 'Longitudes entre -180 e 180 e latitudes entre -90 e 90, com oeste ≤ leste e sul ≤ norte'
+                })
+            queryset = within_bbox(queryset, west, south, east, north)
+        
+        center = self.request.query_params.get('near')
+        if center:
+            latitude, longitude = self.parse_coordinates('near', center, 2)
+            if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                raise ValidationError({'near': 'Latitude deve estar entre -90 e 90 e longitude entre -180 e 180'})
+            radius_km = self.parse_coordinates(
+                'radius_km', self.request.query_params.get('radius_km', self.DEFAULT_RADIUS_KM), 1
+            )[0]
+            if not 0 < radius_km <= self.MAX_RADIUS_KM:
+                raise ValidationError({'radius_km': f'Raio deve estar entre 0 e {self.MAX_RADIUS_KM} km'})
+            queryset = near(queryset, latitude, longitude, radius_km)
+        
+        if self.stay_filter:
+            queryset = queryset.filter(Exists(matching_accommodations(**self.stay_filter)))
             
         return queryset
+    
+    def parse_coordinates(self, param, value, count):
+        try:
+            numbers = [float(part) for part in str(value).split(',')]
+        except ValueError:
+            numbers = []
+        # float() também aceita "inf" e "nan", que quebram o cálculo do raio e o SQL
+        if len(numbers) != count or not all(map(math.isfinite, numbers)):
+            raise ValidationError({param: f'Informe {count} número(s) separados por vírgula'})
+        return numbers
+    
+    def list(self, request, *args, **kwargs):
+        data = get_or_compute(public_list_key(request), lambda: self.build_list(request, *args, **kwargs))
+        return Response(data)
+    
+    @property
+    def stay_filter(self):
+        """`matching_accommodations` pedido (`guests`, `check_in`, `check_out`), ou None"""
+        if not hasattr(self, '_stay_filter'):
+            params = self.request.query_params
+            self._stay_filter = None
+            if {'guests', 'check_in', 'check_out'} & set(params):
+                self._stay_filter = {'guests': self.parse_guests(), 'check_in': None, 'check_out': None}
+                if 'check_in' in params or 'check_out' in params:
+                    stay = StaySerializer(data=params)
+                    stay.is_valid(raise_exception=True)
+                    self._stay_filter.update(stay.validated_data)
+        return self._stay_filter
+    
+    def parse_guests(self):
+        try:
+            guests = int(self.request.query_params.get('guests', 1))
+        except ValueError:
+            guests = 0
+        if guests < 1:
+            raise ValidationError({'guests': 'Informe um número inteiro maior que zero'})
+        return guests
+    
+    def paginate_queryset(self, queryset):
+        # As acomodações que atendem vêm na mesma query da página (só para ela)
+        if self.stay_filter:
+            matching = matching_accommodations(**self.stay_filter).order_by('base_price', 'pk')
+            queryset = queryset.annotate(matching_accommodations=ArraySubquery(matching.values(json=JSONObject(
+                id='pk',
+                name='name',
+                accommodation_type='accommodation_type',
+                max_guests='max_guests',
+                base_price='base_price',
+                cleaning_fee='cleaning_fee',
+            ))))
+        return super().paginate_queryset(queryset)
+    
+    def get_serializer(self, *args, **kwargs):
+        # Cotação das acomodações da página: só as regras de preço são consultadas
+        stay = self.stay_filter
+        if args and stay and stay['check_in']:
+            kwargs['context'] = {
+                **self.get_serializer_context(),
+                'quotes': quote_listings(args[0], stay['check_in'], stay['check_out'], stay['guests']),
+            }
+        return super().get_serializer(*args, **kwargs)
+    
+    def build_list(self, request, *args, **kwargs):
+        data = super().list(request, *args, **kwargs).data
+        if request.query_params.get('facets') in ('1', 'true'):
+            queryset = self.filter_queryset(self.get_queryset())
+            data['facets'] = get_or_compute(public_facets_key(request), lambda: compute_facets(queryset))
+        return data
 
 
-class PropertyPublicView(generics.RetrieveAPIView):
+class PropertyAutocompleteView(APIView):
+    """
+    Sugestões para a caixa de busca pública.
+    
+    **Permissões:** Nenhuma (Público)
+    
+    **Parâmetros:**
+    - `q`: Texto digitado (mínimo 2 caracteres, sem diferenciar acentos).
+    - `limit`: Máximo de sugestões por grupo (padrão 8, máximo 20).
+    
+    **Resposta:** `properties` (id, slug, nome, cidade e UF das propriedades
+    cujo nome começa com `q`) e `cities` (cidades distintas com alguma palavra
+    começando com `q`).
+    
+    **Exemplo:** `/api/v1/public/autocomplete/?q=chap`
+    """
+    permission_classes = [AllowAny]
+    DEFAULT_LIMIT = 8
+    MAX_LIMIT = 20
+    
+    def get(self, request):
+        term = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit', self.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Informe um número inteiro'})
+        limit = min(max(limit, 1), self.MAX_LIMIT)
+        
+        data = get_or_compute(public_autocomplete_key(term, limit), lambda: autocomplete(term, limit))
+        return Response(data)
+
+
+def _latest_update(model, **filters):
+    """Subquery com o maior `updated_at` dos registros de `model` da propriedade externa."""
+    return Subquery(
+        model.objects.filter(**filters).order_by().values(*filters).annotate(
+            last=Max('updated_at')
+        ).values('last')
+    )
+
+
+def _public_property_last_modified(request, slug):
+    """
+    Última modificação da landing page: propriedade, suas imagens e acomodações.
+
+    Uma única query sobre chaves indexadas, cacheada com a mesma versão do
+    payload (as invalidações de `signals.py` valem para os dois) e memorizada
+    no request para ser compartilhada entre o cálculo do ETag e do
+    Last-Modified. Com o cache quente, a landing page não consulta o banco.
+    """
+    if not hasattr(request, '_public_property_last_modified'):
+        request._public_property_last_modified = get_or_compute(
+            public_property_validators_key(slug), lambda: _query_last_modified(slug)
+        )
+    return request._public_property_last_modified
+
+
+def _query_last_modified(slug):
+    row = Property.objects.filter(is_active=True, slug=slug).annotate(
+        images_updated_at=_latest_update(Image, property=OuterRef('pk')),
+        accommodations_updated_at=_latest_update(Accommodation, property=OuterRef('pk')),
+    ).values_list('id', 'updated_at', 'images_updated_at', 'accommodations_updated_at')[:1]
+    row = next(iter(row), None)
+    return row and (row[0], max(filter(None, row[1:])))
+
+
+def public_property_last_modified(request, slug):
+    version = _public_property_last_modified(request, slug)
+    return version and version[1]
+
+
+def public_property_etag(request, slug):
+    version = _public_property_last_modified(request, slug)
+    if not version:
+        return None
+    # O host entra no ETag: o payload tem URLs absolutas
+    pk, last_modified = version
+    raw = f'{pk}:{last_modified.isoformat()}:{request.get_host()}'
+    return f'"{hashlib.md5(raw.encode("utf-8")).hexdigest()}"'
+
+
+class PropertyQuoteView(APIView):
+    """
+    Cotação de estadias em lote.
+    
+    **Permissões:** Nenhuma (Público)
+    
+    **Body:** `accommodations` (ids), `stays` (`[{"check_in", "check_out"}]`)
+    e `guests` (lista, padrão `[1]`), com datas de hoje até
+    `availability.MAX_DAYS_AHEAD` dias à frente. Cota cada combinação, até
+    `QuoteRequestSerializer.MAX_QUOTES` por requisição, com duas consultas ao
+    banco qualquer que seja o número de combinações (ver properties/pricing.py).
+    
+    **Resposta:** `{"quotes": [...]}` na ordem acomodação x estadia x hóspedes;
+    acomodações inexistentes ou inativas ficam de fora. `fits` indica se a
+    acomodação comporta os hóspedes. Não verifica disponibilidade.
+    """
+    permission_classes = [AllowAny]
+    
+    def post(self, request):
+        serializer = QuoteRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        quotes = quote_many(
+            (accommodation, stay['check_in'], stay['check_out'], guests)
+            for accommodation in data['accommodations']
+            for stay in data['stays']
+            for guests in data['guests']
+        )
+        return Response({"quotes": QuoteSerializer([quote for quote in quotes if quote], many=True).data})
+
+
+@method_decorator(
+    condition(etag_func=public_property_etag, last_modified_func=public_property_last_modified),
+    name='get',
+)
+class PropertyPublicView(QueryOptimizationMixin, generics.RetrieveAPIView):
     """
     Visualização pública de propriedade (sem autenticação).
     
@@ -113,6 +404,12 @@ class PropertyPublicView(generics.RetrieveAPIView):
     **Lookup:** Por slug (SEO-friendly)
     
     **Exemplo:** `/api/v1/public/properties/pousada-vista-linda/`
+    
+    **Cache:** Resposta cacheada por slug e invalidada quando a propriedade,
+    suas acomodações ou imagens mudam.
+    
+    **GET condicional:** Envia `ETag` e `Last-Modified`; `If-None-Match` e
+    `If-Modified-Since` atualizados recebem 304 sem serializar a propriedade.
     """
     serializer_class = PropertyPublicSerializer
     permission_classes = []  # No authentication required
@@ -120,10 +417,17 @@ class PropertyPublicView(generics.RetrieveAPIView):
     
     def get_queryset(self):
         """Return only active properties"""
-        return Property.objects.filter(is_active=True).select_related('owner').prefetch_related('images')
+        return Property.objects.filter(is_active=True)
+    
+    def retrieve(self, request, *args, **kwargs):
+        data = get_or_compute(
+            public_property_key(kwargs[self.lookup_field], request),
+            lambda: super(PropertyPublicView, self).retrieve(request, *args, **kwargs).data,
+        )
+        return Response(data)
 
 
-class AccommodationViewSet(viewsets.ModelViewSet):
+class AccommodationViewSet(QueryOptimizationMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD de acomodações.
     
@@ -156,7 +460,7 @@ class AccommodationViewSet(viewsets.ModelViewSet):
         return Accommodation.objects.filter(
             property__owner=self.request.user,
             is_active=True
-        ).select_related('property').prefetch_related('images').order_by('-created_at')
+        ).order_by('-created_at')
     
     def perform_destroy(self, instance):
         """Soft delete da acomodação"""
@@ -174,12 +478,202 @@ class AccommodationViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        accommodations = self.get_queryset().filter(property_id=property_id)
+        accommodations = self.filter_queryset(self.get_queryset()).filter(property_id=property_id)
         serializer = self.get_serializer(accommodations, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def availability(self, request, pk=None):
+        """
+        Calendário: noites ocupadas de uma acomodação.
+        
+        **Query params:** `start` e `end` (YYYY-MM-DD; padrão: hoje e 90 dias
+        depois).
+        
+        **Resposta:** `{"busy": [{"start": ..., "end": ...}]}`, com `end` sendo
+        a data de saída (a noite de `end` está livre).
+        """
+        accommodation = self.get_object()
+        calendar = CalendarSerializer(data=request.query_params)
+        calendar.is_valid(raise_exception=True)
+        
+        periods = busy_periods(accommodation.pk, calendar.validated_data['start'], calendar.validated_data['end'])
+        return Response({"busy": [{"start": lower, "end": upper} for lower, upper in periods]})
+    
+    @action(detail=False, methods=['get'])
+    def available(self, request):
+        """
+        Acomodações do usuário livres numa estadia, numa única consulta.
+        
+        **Query params:** `check_in`, `check_out` e `property_id` opcional.
+        """
+        stay = StaySerializer(data=request.query_params)
+        stay.is_valid(raise_exception=True)
+        
+        accommodations = self.get_queryset().filter(
+            free_filter(stay.validated_data['check_in'], stay.validated_data['check_out'])
+        )
+        property_id = request.query_params.get('property_id')
+        if property_id:
+            accommodations = accommodations.filter(property_id=property_id)
+        return Response({"available": list(accommodations.values_list('pk', flat=True))})
 
 
-class ImageViewSet(viewsets.ModelViewSet):
+class AvailabilityBlockViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para bloqueios de agenda das acomodações.
+    
+    **Permissões:** Requer autenticação JWT.
+    
+    **Filtros:** Apenas bloqueios das acomodações do usuário; `accommodation`
+    na query string restringe a uma acomodação.
+    
+    **Body:** `accommodation`, `start`, `end` (data de saída, exclusiva),
+    `reason` e `note`. Bloqueios da mesma acomodação não podem se sobrepor.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = AvailabilityBlockSerializer
+    
+    def get_queryset(self):
+        queryset = AvailabilityBlock.objects.filter(accommodation__property__owner=self.request.user)
+        accommodation = self.request.query_params.get('accommodation')
+        if accommodation:
+            queryset = queryset.filter(accommodation=accommodation)
+        return queryset.order_by('accommodation', 'period')
+    
+    def perform_create(self, serializer):
+        self._check_owner(serializer.validated_data['accommodation'])
+        serializer.save()
+    
+    def perform_update(self, serializer):
+        self._check_owner(serializer.validated_data.get('accommodation', serializer.instance.accommodation))
+        serializer.save()
+    
+    def _check_owner(self, accommodation):
+        if accommodation.property.owner_id != self.request.user.pk:
+            raise PermissionDenied('Sem acesso a esta propriedade.')
+
+
+class BookingViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Reservas das acomodações do usuário.
+    
+    **Permissões:** Requer autenticação JWT.
+    
+    **Filtros:** `accommodation` e `status` na query string.
+    
+    **Operações:**
+    - `list` / `retrieve`: Reservas das propriedades do usuário
+    - `cancel`: Cancela a reserva e libera as noites
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BookingSerializer
+    
+    def get_queryset(self):
+        queryset = Booking.objects.filter(accommodation__property__owner=self.request.user)
+        for param in ('accommodation', 'status'):
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        return queryset
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        booking = self.get_object()
+        bookings.cancel(booking.pk)
+        booking.refresh_from_db()
+        return Response(self.get_serializer(booking).data)
+
+
+class PublicBookingViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Checkout público.
+    
+    **Permissões:** Nenhuma (Público). O id da reserva (UUID) é a credencial
+    do hóspede para consultá-la, confirmá-la ou cancelá-la.
+    
+    **Operações:**
+    - `create`: Pré-reserva (`accommodation`, `check_in`, `check_out`,
+      `guests`, `guest_name`, `guest_email`, `guest_phone`), válida por
+      `BOOKING_HOLD_MINUTES`. 409 se as noites já estão ocupadas.
+    - `retrieve`: Situação da reserva
+    - `confirm`: Efetiva a pré-reserva ainda no prazo (409 se expirou)
+    - `cancel`: Cancela e libera as noites
+    
+    Reservas concorrentes nas mesmas noites são resolvidas pela exclusion
+    constraint do banco, sem lock na acomodação (ver properties/bookings.py).
+    A busca pública é cacheada e pode mostrar como livre, por até
+    `PUBLIC_CACHE_TIMEOUT`, uma acomodação que acabou de ser reservada.
+    """
+    permission_classes = [AllowAny]
+    serializer_class = BookingSerializer
+    queryset = Booking.objects.all()
+    
+    def create(self, request, *args, **kwargs):
+        serializer = BookingHoldSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            booking = bookings.hold(**serializer.validated_data)
+        except bookings.Unavailable as error:
+            return Response({"detail": str(error)}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(booking).data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        booking = self.get_object()
+        try:
+            bookings.confirm(booking.pk)
+        except bookings.HoldExpired as error:
+            return Response({"detail": str(error)}, status=status.HTTP_409_CONFLICT)
+        booking.refresh_from_db()
+        return Response(self.get_serializer(booking).data)
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        booking = self.get_object()
+        bookings.cancel(booking.pk)
+        booking.refresh_from_db()
+        return Response(self.get_serializer(booking).data)
+
+
+class PriceRuleViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet para regras de preço (temporadas, feriados, fins de semana).
+    
+    **Permissões:** Requer autenticação JWT.
+    
+    **Filtros:** Apenas regras das propriedades do usuário; `property` e
+    `accommodation` na query string restringem o resultado.
+    
+    **Body:** `property`, `accommodation` (opcional: sem ela vale para todas),
+    `name`, `start`/`end` (opcionais), `weekdays` (bits, segunda = 1) e
+    `multiplier` aplicado ao preço base das noites em que a regra vale.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = PriceRuleSerializer
+    
+    def get_queryset(self):
+        queryset = PriceRule.objects.filter(property__owner=self.request.user)
+        for param in ('property', 'accommodation'):
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{param: value})
+        return queryset
+    
+    def perform_create(self, serializer):
+        self._check_owner(serializer.validated_data['property'])
+        serializer.save()
+    
+    def perform_update(self, serializer):
+        self._check_owner(serializer.validated_data.get('property', serializer.instance.property))
+        serializer.save()
+    
+    def _check_owner(self, property):
+        if property.owner_id != self.request.user.pk:
+            raise PermissionDenied('Sem acesso a esta propriedade.')
+
+
+class ImageViewSet(QueryOptimizationMixin, viewsets.ModelViewSet):
     """
     ViewSet para gerenciar imagens.
     
@@ -196,6 +690,8 @@ class ImageViewSet(viewsets.ModelViewSet):
     - `update`: Atualizar imagem (caption, order)
     - `destroy`: Deletar imagem
     - `reorder`: Reordenar múltiplas imagens
+    - `from_hash`: Criar imagem reaproveitando um arquivo já enviado
+    - `bulk`: Enviar várias imagens numa requisição
     """
     permission_classes = [IsAuthenticated]
     serializer_class = ImageSerializer
@@ -205,23 +701,232 @@ class ImageViewSet(viewsets.ModelViewSet):
         return Image.objects.filter(
             models.Q(property__owner=self.request.user) |
             models.Q(accommodation__property__owner=self.request.user)
-        ).select_related('property', 'accommodation').order_by('order', '-created_at')
+        ).order_by('order', '-created_at')
     
     @action(detail=False, methods=['post'])
     def reorder(self, request):
         """
         Reordenar imagens.
         
-        **Body:** `{"image_ids": ["uuid1", "uuid2", "uuid3"]}`
+        **Body:** `{"image_ids": ["uuid1", "uuid2", "uuid3"]}` para gravar a
+        ordem completa, ou `{"image": "uuid", "order": 3}` para mover uma
+        imagem dentro da galeria dela (só as imagens entre a posição antiga e
+        a nova são deslocadas).
+        
+        Um único UPDATE, restrito às imagens do usuário: se algum id não for
+        encontrado nada é alterado (404).
         """
-        image_ids = request.data.get('image_ids', [])
-        if not image_ids:
-            return Response(
-                {"error": "image_ids é obrigatório"},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = ImageReorderSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
         
-        for index, image_id in enumerate(image_ids):
-            Image.objects.filter(id=image_id).update(order=index)
+        with transaction.atomic():
+            if 'image_ids' in data:
+                image_ids = data['image_ids']
+                self._set_order(image_ids)
+                affected = Property.objects.filter(
+                    models.Q(images__id__in=image_ids) |
+                    models.Q(accommodations__images__id__in=image_ids)
+                ).values_list('pk', 'slug').distinct()
+                affected = list(affected)
+            else:
+                image = self._move(data['image'], data['order'])
+                image_ids = [image.pk]
+                prop = image.property or image.accommodation.property
+                affected = [(prop.pk, prop.slug)]
+            
+            # update() não dispara signals: a capa e o cache público dependem da ordem
+            refresh_listings(pk for pk, slug in affected)
+        invalidate_public_properties(*(slug for pk, slug in affected))
         
         return Response({"status": "success", "message": f"{len(image_ids)} imagens reordenadas"})
+    
+    @staticmethod
+    def _order_case(positions):
+        """CASE que grava `order` = `positions[pk]`."""
+        return Case(
+            *(When(pk=image_id, then=Value(index)) for image_id, index in positions.items()),
+            default=F('order'),
+            output_field=models.PositiveIntegerField(),
+        )
+    
+    def _set_order(self, image_ids):
+        """`order` = posição em `image_ids`, num único UPDATE ... CASE."""
+        updated = self.get_queryset().filter(pk__in=image_ids).update(
+            order=self._order_case({image_id: index for index, image_id in enumerate(image_ids)}),
+            updated_at=timezone.now(),
+        )
+        if updated != len(image_ids):
+            raise NotFound('Imagem não encontrada.')
+    
+    def _move(self, image_id, position):
+        """
+        Move uma imagem para `position` (0 = primeira) dentro da galeria dela.
+        
+        A galeria é renumerada 0..n-1 pela ordem atual `(order, id)`: imagens
+        enviadas sem ordem ficam todas com 0, e deslocar em 1 só as do
+        caminho daria empates ou ordem negativa. Um UPDATE ... CASE grava só
+        as posições que mudaram.
+        """
+        image = self.get_queryset().select_related(
+            'property', 'accommodation__property'
+        ).select_for_update(of=('self',)).filter(pk=image_id).first()
+        if image is None:
+            raise NotFound('Imagem não encontrada.')
+        
+        gallery = Image.objects.filter(
+            property_id=image.property_id, accommodation_id=image.accommodation_id
+        )
+        current = dict(gallery.select_for_update().order_by('order', 'pk').values_list('pk', 'order'))
+        image_ids = [pk for pk in current if pk != image.pk]
+        image_ids.insert(min(position, len(image_ids)), image.pk)
+        
+        changed = {pk: index for index, pk in enumerate(image_ids) if current[pk] != index}
+        if changed:
+            gallery.filter(pk__in=changed).update(order=self._order_case(changed), updated_at=timezone.now())
+        image.order = image_ids.index(image.pk)
+        return image
+    
+    @action(detail=False, methods=['post'], url_path='from-hash')
+    def from_hash(self, request):
+        """
+        Criar imagem a partir de um arquivo que o usuário já enviou.
+        
+        O cliente calcula o SHA-256 do arquivo antes do upload; se ele já
+        existe entre as imagens do usuário, a nova imagem aponta para o mesmo
+        arquivo (com as mesmas versões) e os bytes não precisam ser enviados.
+        
+        **Body:** `{"sha256": "...", "property": "uuid"}` (ou `accommodation`),
+        `caption` e `order` opcionais.
+        
+        **Respostas:** 201 com a imagem criada; 404 se o hash é desconhecido
+        (fazer o upload normal).
+        """
+        serializer = ImageFromHashSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        target = data.get('property') or data.get('accommodation').property
+        if target.owner_id != request.user.pk:
+            raise PermissionDenied('Sem acesso a esta propriedade.')
+        
+        # Só arquivos do próprio usuário: conhecer o hash não dá acesso ao arquivo
+        existing = self.get_queryset().filter(sha256=data.pop('sha256')).first()
+        if existing is None:
+            raise NotFound('Arquivo não encontrado; envie a imagem.')
+        
+        copied = {
+            field: getattr(existing, field)
+            for field in ['sha256', 'width', 'height', 'file_size', *Image.DERIVED_FIELDS]
+        }
+        image = serializer.save(image=existing.image.name, **copied)
+        return Response(
+            ImageSerializer(image, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Enviar várias imagens de uma vez (multipart).
+        
+        **Body:** `property` (ou `accommodation`), `images` repetido uma vez por
+        arquivo e `captions` opcional na mesma ordem. As imagens entram depois
+        das existentes, com `order` consecutivo.
+        
+        **Respostas:** 201 com a lista de imagens criadas.
+        """
+        serializer = ImageBulkUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        target = data.get('property') or data['accommodation'].property
+        if target.owner_id != request.user.pk:
+            raise PermissionDenied('Sem acesso a esta propriedade.')
+        
+        with transaction.atomic():
+            images = uploads.bulk_create_images(
+                data['images'],
+                data['captions'],
+                actor=request.user,
+                property=data.get('property'),
+                accommodation=data.get('accommodation'),
+            )
+        return Response(
+            ImageSerializer(images, many=True, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+
+
+class ImageUploadViewSet(mixins.RetrieveModelMixin, mixins.DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Upload de imagens grandes em partes, retomável (ver properties/uploads.py).
+    
+    **Permissões:** Requer autenticação JWT; cada usuário só vê as próprias sessões.
+    
+    **Operações:**
+    - `create`: Iniciar sessão (`filename`, `size`, `sha256` opcional e o destino,
+      como em `images`)
+    - `retrieve`: Estado da sessão; `received` é o offset para continuar
+    - `update` (PUT): Enviar uma parte. Corpo binário com
+      `Content-Range: bytes início-fim/total` e `X-Chunk-SHA256` opcional.
+      409 se a parte não começa em `received`
+    - `finalize`: Conferir o arquivo e criar a imagem (201 com a imagem)
+    - `destroy`: Cancelar a sessão e apagar o arquivo temporário
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = ImageUploadSerializer
+    
+    def get_queryset(self):
+        return ImageUpload.objects.filter(owner=self.request.user)
+    
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        target = data.get('property') or data.get('accommodation').property
+        if target.owner_id != self.request.user.pk:
+            raise PermissionDenied('Sem acesso a esta propriedade.')
+        serializer.save(owner=self.request.user)
+    
+    def _locked(self):
+        """Sessão do usuário travada até o fim da transação (uma parte por vez)."""
+        queryset = self.get_queryset().select_for_update()
+        return generics.get_object_or_404(queryset, pk=self.kwargs['pk'])
+    
+    def update(self, request, *args, **kwargs):
+        # O corpo é lido direto do stream: request.data não pode ser acessado
+        try:
+            with transaction.atomic():
+                upload = self._locked()
+                start, length = uploads.parse_content_range(
+                    request.headers.get('Content-Range'), upload.size
+                )
+                received = uploads.write_chunk(
+                    upload, request.stream, start, length,
+                    request.headers.get('X-Chunk-SHA256', '')
+                )
+        except uploads.OffsetMismatch as error:
+            return Response(
+                {"error": str(error), "received": upload.received},
+                status=status.HTTP_409_CONFLICT
+            )
+        except uploads.UploadError as error:
+            raise ValidationError({"error": str(error)})
+        return Response({"received": received, "size": upload.size})
+    
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, pk=None):
+        """Criar a imagem a partir das partes recebidas."""
+        try:
+            with transaction.atomic():
+                image = uploads.finalize(self._locked())
+        except uploads.UploadError as error:
+            raise ValidationError({"error": str(error)})
+        return Response(
+            ImageSerializer(image, context=self.get_serializer_context()).data,
+            status=status.HTTP_201_CREATED
+        )
+    
+    def perform_destroy(self, instance):
+        path = uploads.upload_path(instance)
+        instance.delete()
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
@@ -11,7 +11,7 @@ interface Property {
     name: string;
     city: string;
     state: string;
-    images: { image: string }[];
+    cover_image: string | null;
     description: string;
     accommodations_count: number;
 }
@@ -4,33 +4,45 @@ import Image from 'next/image';
 import Link from 'next/link';
 import { MapPinIcon } from '@heroicons/react/24/solid';
 
+interface Rendition {
+    webp: string;
+    jpeg: string;
+    width: number;
+    height: number;
+}
+
 interface Property {
     id: string;
     slug: string;
     name: string;
     city: string;
     state: string;
-    images: { image: string }[];
+    cover_image: string | null;
+    cover_renditions?: Record<string, Rendition>;
     description: string;
     accommodations_count: number;
 }
 
 export default function PropertyCard({ property }: { property: Property }) {
-    // Definir imagem de capa (primeira da lista ou placeholder)
-    const coverImage = property.images && property.images.length > 0
-        ? property.images[0].image
-        : '/placeholder-property.jpg';
+    // Imagem de capa (primeira da galeria, calculada no backend) ou placeholder
+    // Versão "card" (WebP/JPEG redimensionada) quando já gerada; senão o original
+    const card = property.cover_renditions?.card;
+    const coverImage = card?.jpeg || property.cover_image || '/placeholder-property.jpg';
 
     return (
         <Link href={`/public/${property.slug}`} className="group block h-full">
             <div className="bg-white rounded-xl overflow-hidden shadow-sm hover:shadow-md transition-shadow duration-300 h-full flex flex-col border border-gray-100">
                 <div className="relative h-48 w-full bg-gray-200 overflow-hidden">
-                    {property.images && property.images.length > 0 ? (
-                        <img
-                            src={coverImage}
-                            alt={property.name}
-                            className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500"
-                        />
+                    {property.cover_image ? (
+                        <picture className="block w-full h-full">
+                            {card && <source srcSet={card.webp} type="image/webp" />}
+                            <img
+                                src={coverImage}
+                                alt={property.name}
+                                loading="lazy"
+                                className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500"
+                            />
+                        </picture>
                     ) : (
                         <div className="w-full h-full flex items-center justify-center text-gray-400 bg-gray-50">
                             <span className="text-sm">Sem foto</span>